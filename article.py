@@ -0,0 +1,137 @@
+"""
+X Article 본문을 Playwright로 가져옵니다.
+
+브라우저는 실행(또는 데몬 수명) 동안 한 번만 띄우고, 쿠키로 인증된 컨텍스트 하나에서
+제한된 수의 페이지를 돌려 씁니다. innerText 추출에 필요 없는 이미지/폰트/미디어 요청은 차단합니다.
+"""
+
+import asyncio
+import time
+
+# innerText 스크랩에 쓰이지 않는 리소스 유형
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+EXTRACT_SCRIPT = """() => {
+    const selectors = [
+        '[data-testid="tweetText"]',
+        '[data-testid="article"]',
+        'article [data-testid="tweetText"]',
+    ];
+    for (const selector of selectors) {
+        const elements = document.querySelectorAll(selector);
+        if (elements.length > 0) {
+            return Array.from(elements).map(el => el.innerText).join('\\n\\n');
+        }
+    }
+    return null;
+}"""
+
+
+class ArticleExtractor:
+    """
+    X Article 추출기.
+
+    사용 예:
+        async with ArticleExtractor(cookies) as extractor:
+            text = await extractor.extract("https://x.com/i/article/...")
+
+    브라우저는 첫 extract 호출 시점에 띄우므로 Article이 없는 실행에서는 비용이 들지 않습니다.
+    """
+
+    def __init__(self, cookies: dict, pool_size: int = 2):
+        self.cookies = cookies
+        self.pool_size = max(1, pool_size)
+        self.timings: list[float] = []  # 기사별 추출 시간(초)
+        self.launch_time: float | None = None  # 브라우저 기동 시간(초)
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages: asyncio.Queue | None = None
+        self._start_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "ArticleExtractor":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _start(self):
+        """브라우저, 인증 컨텍스트, 페이지 풀을 준비합니다."""
+        async with self._start_lock:
+            if self._context is not None:
+                return
+
+            from playwright.async_api import async_playwright
+
+            started = time.perf_counter()
+            playwright = await async_playwright().start()
+            browser = None
+            try:
+                browser = await playwright.chromium.launch(headless=True)
+                context = await browser.new_context(
+                    storage_state={
+                        "cookies": [
+                            {"name": "auth_token", "value": self.cookies.get("auth_token", ""), "domain": ".x.com", "path": "/"},
+                            {"name": "ct0", "value": self.cookies.get("ct0", ""), "domain": ".x.com", "path": "/"},
+                        ]
+                    }
+                )
+                await context.route("**/*", self._block_heavy_resources)
+                pages = asyncio.Queue()
+                for _ in range(self.pool_size):
+                    pages.put_nowait(await context.new_page())
+            except BaseException:
+                # 기동 도중 실패 — 브라우저와 Playwright 드라이버를 남기지 않음
+                if browser is not None:
+                    await browser.close()
+                await playwright.stop()
+                raise
+            self._playwright, self._browser, self._context, self._pages = playwright, browser, context, pages
+
+            self.launch_time = time.perf_counter() - started
+            print(f"    ✓ Article용 브라우저 준비 ({self.launch_time:.1f}s, 페이지 {self.pool_size}개)")
+
+    @staticmethod
+    async def _block_heavy_resources(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def extract(self, article_url: str) -> str | None:
+        """
+        Article 본문 텍스트를 반환합니다. 내용을 찾지 못하면 None.
+
+        Raises:
+            ImportError: Playwright가 설치되지 않은 경우
+        """
+        await self._start()
+
+        page = await self._pages.get()
+        started = time.perf_counter()
+        try:
+            try:
+                await page.goto(article_url, wait_until="domcontentloaded", timeout=60000)
+                await page.wait_for_selector('[data-testid="tweetText"]', timeout=10000)
+            except Exception:
+                pass  # 요소 대기 실패해도 계속 진행
+
+            return await page.evaluate(EXTRACT_SCRIPT)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings.append(elapsed)
+            self._pages.put_nowait(page)
+
+    async def close(self):
+        """브라우저를 종료합니다. 아직 띄우지 않았다면 아무 일도 하지 않습니다."""
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = self._browser = self._context = self._pages = None
+
+        if self.timings:
+            avg = sum(self.timings) / len(self.timings)
+            print(f"  Article {len(self.timings)}개 추출 (평균 {avg:.1f}s, 브라우저 기동 {self.launch_time or 0:.1f}s)")
+        self.timings = []
@@ -0,0 +1,358 @@
+"""
+백필(backfill) 모드: 북마크 전체 이력을 커서로 끝까지 넘기며 노트로 만듭니다.
+
+평소 동기화는 최근 북마크만 확인하므로, 새로 설치하면 그동안 쌓인 북마크를 따라잡지 못합니다.
+백필은 페이지 하나를 끝까지 처리할 때마다 다음 커서와 진행 상황을 BACKFILL_FILE에 기록하고,
+중단(크래시, Ctrl-C)된 뒤 다시 실행하면 그 페이지부터 이어서 진행합니다. 페이지 안에서 이미
+처리된 북마크는 상태 파일로 건너뛰므로 같은 노트를 두 번 만들지 않습니다.
+
+페이지마다 일반 동기화와 같은 파이프라인(상세 조회 → 분석 → 저장)을 거치고, 분석하는 동안
+다음 페이지를 미리 받아 둡니다. 메모리에는 많아야 두 페이지만 올라갑니다.
+
+페이지 조회가 실패하면(요청 한도 등) 대기 시간을 두 배씩 늘리며 다시 시도하고, 그래도 안 되면
+체크포인트를 남긴 채 끝냅니다. 페이지 안에서 처리하지 못한 북마크가 남아도 커서를 넘기지 않고 같은
+방식으로 다시 처리하며, 인증이 실패하면 체크포인트를 남기고 멈춥니다. 예상 북마크 수를 주면 처리 속도로 남은 시간을 알려줍니다.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config import (
+    BACKFILL_FILE, BACKFILL_PAGE_SIZE, BACKFILL_RETRIES,
+    FETCH_CONCURRENCY, VERIFY_SSL, STATE_FILE, ARTICLE_PAGE_POOL,
+    ENRICH_CONCURRENCY, WRITE_CONCURRENCY, PIPELINE_QUEUE_SIZE, ENRICH_BATCH_MAX_ITEMS,
+    ENRICH_CACHE_ENABLED, ENRICH_CACHE_FILE, ENRICH_CACHE_MAX_ENTRIES, ENRICH_CACHE_MAX_AGE_DAYS,
+    VAULT_INDEX_FILE, UPDATE_EXISTING_NOTES,
+    MEDIA_DOWNLOAD, MEDIA_DIR, MEDIA_CONCURRENCY, MEDIA_MAX_DIMENSION, MEDIA_MANIFEST_FILE,
+    PAYLOAD_STORE_ENABLED, PAYLOAD_STORE_FILE, PAYLOAD_STORE_MAX_AGE_DAYS,
+    DEDUP_ENABLED, DEDUP_FILE, DEDUP_MAX_DISTANCE, DEDUP_MIN_CHARS,
+    LINK_RESOLVE, VAULT_DIR, LINK_FUZZY_THRESHOLD, LINK_UNRESOLVED, TITLE_INDEX_FILE,
+)
+import metrics
+from article import ArticleExtractor
+from auth import get_x_cookies
+from cache import EnrichmentCache
+from dedup import NearDuplicateIndex
+from enricher import AsyncEnricher
+from fetcher import AuthError, RateLimited, build_tweets, get_bookmark_page, make_client
+from media import MediaDownloader
+from payload_store import PayloadStore
+from pipeline import run_pipeline
+from state import State
+from title_index import TitleIndex, find_vault_root
+from vault_index import VaultIndex
+
+
+class Backfill:
+    """
+    북마크 전체 이력을 가져오는 작업. 체크포인트가 있으면 이어서 진행합니다.
+
+    Args:
+        output_dir: 노트를 저장할 디렉토리
+        page_size: 한 페이지의 북마크 수
+        expected_total: 예상 북마크 수 (남은 시간 추정용, 0이면 추정하지 않음)
+        checkpoint_file: 커서/진행 상황을 기록할 파일
+    """
+
+    # 첫 재시도 전 대기 시간(초) — 이후 두 배씩
+    RETRY_DELAY = 30.0
+
+    def __init__(
+        self,
+        output_dir: Path,
+        page_size: int = BACKFILL_PAGE_SIZE,
+        expected_total: int = 0,
+        checkpoint_file: Path = BACKFILL_FILE,
+    ):
+        self.output_dir = output_dir
+        self.page_size = max(1, page_size)
+        self.expected_total = expected_total
+        self.checkpoint_file = checkpoint_file
+        self.stop = asyncio.Event()
+        self.checkpoint = self._load()
+        self._session_items = 0
+        self._session_started = 0.0
+
+    async def run(self) -> int:
+        """백필을 진행하고 이번 실행에서 만든 노트 수를 반환합니다."""
+        self._install_signal_handlers()
+        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        cp = self.checkpoint
+        if cp.get("done"):
+            print(f"\n[{ts}] 백필이 이미 끝났습니다 ({cp['items']}개, 노트 {cp['notes']}개)")
+            print(f"  처음부터 다시 하려면 {self.checkpoint_file.name}을 지우세요")
+            return 0
+        if cp.get("pages"):
+            print(f"\n[{ts}] 백필 이어서 진행: {cp['pages']}페이지 / {cp['items']}개 처리됨")
+        else:
+            print(f"\n[{ts}] 백필 시작 (페이지당 {self.page_size}개)")
+        print(f"저장 경로: {self.output_dir}")
+
+        try:
+            with metrics.timer("cookies"):
+                cookies = get_x_cookies()
+        except RuntimeError as e:
+            print(f"✗ {e}")
+            return 0
+
+        client = make_client(cookies, VERIFY_SSL)
+        state = State(STATE_FILE)
+        index = VaultIndex.load(self.output_dir, VAULT_INDEX_FILE)
+        titles = None
+        if LINK_RESOLVE:
+            titles = TitleIndex.load(
+                VAULT_DIR or find_vault_root(self.output_dir),
+                TITLE_INDEX_FILE,
+                fuzzy_threshold=LINK_FUZZY_THRESHOLD,
+                unresolved=LINK_UNRESOLVED,
+            )
+        cache = None
+        if ENRICH_CACHE_ENABLED:
+            cache = EnrichmentCache(
+                ENRICH_CACHE_FILE,
+                max_entries=ENRICH_CACHE_MAX_ENTRIES,
+                max_age_days=ENRICH_CACHE_MAX_AGE_DAYS,
+            )
+        dedup = None
+        if DEDUP_ENABLED:
+            dedup = NearDuplicateIndex(DEDUP_FILE, max_distance=DEDUP_MAX_DISTANCE, min_chars=DEDUP_MIN_CHARS)
+        media = None
+        if MEDIA_DOWNLOAD:
+            media = MediaDownloader(
+                self.output_dir / MEDIA_DIR,
+                MEDIA_MANIFEST_FILE,
+                max_connections=MEDIA_CONCURRENCY,
+                max_dimension=MEDIA_MAX_DIMENSION,
+                verify_ssl=VERIFY_SSL,
+            )
+        payloads = None
+        if PAYLOAD_STORE_ENABLED:
+            payloads = PayloadStore(PAYLOAD_STORE_FILE, max_age_days=PAYLOAD_STORE_MAX_AGE_DAYS)
+        extractor = ArticleExtractor(cookies, pool_size=ARTICLE_PAGE_POOL)
+
+        metrics.start_run()
+        notes = 0
+        try:
+            async with AsyncEnricher(cache=cache) as enricher:
+                notes = await self._walk(client, enricher, extractor, state, index, media, payloads, dedup, titles)
+        finally:
+            metrics.finish_run(notes=notes, backfill=True)
+            index.save()
+            if titles is not None:
+                print(f"  {titles.summary()}")
+                titles.save()
+            await extractor.close()
+            if media is not None:
+                await media.close()
+            if payloads is not None:
+                payloads.close()
+            if cache is not None:
+                print(f"  {cache.summary()}")
+                cache.close()
+            if dedup is not None:
+                print(f"  {dedup.summary()}")
+                dedup.close()
+            state.update_last_run()
+            state.close()
+            http = getattr(client, "http", None)
+            if http is not None and hasattr(http, "aclose"):
+                await http.aclose()
+
+        cp = self.checkpoint
+        if cp.get("done"):
+            print(f"\n✓ 백필 완료: {cp['items']}개 확인, 노트 {cp['notes']}개 (실패 {cp['failed']}개)")
+        else:
+            print(f"\n백필 중단: {cp['pages']}페이지 / {cp['items']}개까지 기록 — 다시 실행하면 이어서 진행합니다")
+        return notes
+
+    # ── 페이지 순회 ───────────────────────────────────
+
+    async def _walk(self, client, enricher, extractor, state, index, media, payloads, dedup, titles) -> int:
+        cp = self.checkpoint
+        notes_before = cp["notes"]
+        self._session_started = time.monotonic()
+        next_page = asyncio.create_task(self._fetch_page(client, cp["cursor"]))
+        try:
+            while not self.stop.is_set():
+                page = await next_page
+                next_page = None
+                if page is None:
+                    break
+                following = page.next_cursor if len(page) else None
+                # 이 페이지를 분석하는 동안 다음 페이지를 미리 받아 둠
+                if following:
+                    next_page = asyncio.create_task(self._fetch_page(client, following))
+
+                started = time.perf_counter()
+                try:
+                    written, unfinished = await self._run_page(
+                        page, client, enricher, extractor, state, index, media, payloads, dedup, titles,
+                    )
+                except AuthError as e:
+                    # 쿠키 만료 — 커서는 이 페이지에 그대로 두고 다시 로그인한 뒤 이어서 진행
+                    print(f"✗ {e}")
+                    self._save()
+                    break
+                if self.stop.is_set() and unfinished:
+                    self._save()  # 페이지를 다 못 끝냄 — 커서는 이 페이지에 그대로
+                    break
+
+                cp["cursor"] = following
+                cp["pages"] += 1
+                cp["items"] += len(page)
+                cp["failed"] += unfinished
+                cp["done"] = not following
+                self._save()
+                self._session_items += len(page)
+                metrics.record(
+                    "backfill_page", seconds=time.perf_counter() - started,
+                    page=cp["pages"], items=len(page), notes=written,
+                )
+                self._report(index, titles)
+                if cp["done"]:
+                    break
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+                await asyncio.gather(next_page, return_exceptions=True)
+        return cp["notes"] - notes_before
+
+    async def _run_page(self, page, client, enricher, extractor, state, index, media, payloads, dedup, titles):
+        """
+        페이지의 미처리 북마크를 파이프라인으로 처리합니다. 반환값: (만든 노트 수, 남은 미처리 수)
+
+        실패하거나 요청 한도에 걸려 남은 북마크가 있으면 커서를 넘기지 않고 BACKFILL_RETRIES번까지
+        대기 시간을 늘려 가며 다시 처리합니다. AuthError는 그대로 올려 보냅니다.
+        """
+        cp = self.checkpoint
+        written = 0
+        delay = self.RETRY_DELAY
+        for attempt in range(BACKFILL_RETRIES + 1):
+            items = [item for item in page if not state.is_processed(item.id)]
+            limited = None
+            try:
+                count = await run_pipeline(
+                    build_tweets(client, _aiter(items), extractor, FETCH_CONCURRENCY, payloads),
+                    state,
+                    self.output_dir,
+                    enricher,
+                    enrich_workers=ENRICH_CONCURRENCY,
+                    write_workers=WRITE_CONCURRENCY,
+                    queue_size=PIPELINE_QUEUE_SIZE,
+                    batch_size=ENRICH_BATCH_MAX_ITEMS,
+                    stop=self.stop,
+                    index=index,
+                    update_existing=UPDATE_EXISTING_NOTES,
+                    media=media,
+                    dedup=dedup,
+                    titles=titles,
+                )
+            except (AuthError, RateLimited) as e:
+                # 스트림이 멈추기 전에 쓴 노트는 State에 남아 있음
+                count = sum(1 for item in items if state.is_processed(item.id))
+                if isinstance(e, AuthError):
+                    cp["notes"] += count
+                    raise
+                limited = e
+            written += count
+            cp["notes"] += count
+
+            unfinished = sum(1 for item in page if not state.is_processed(item.id))
+            if not unfinished or self.stop.is_set():
+                return written, unfinished
+            if attempt == BACKFILL_RETRIES:
+                print(f"  ↳ {unfinished}개를 처리하지 못하고 다음 페이지로 넘어갑니다: 재시도 횟수 초과")
+                return written, unfinished
+            if limited is not None:
+                delay = max(delay, limited.wait)  # 한도 재설정까지 기다림
+            reason = f": {limited}" if limited is not None else ""
+            print(f"  ↳ 이 페이지의 {unfinished}개 미처리 ({attempt + 1}/{BACKFILL_RETRIES}), {delay:.0f}초 후 재시도{reason}")
+            self._save()  # 기다리는 동안 중단돼도 이 페이지부터 이어서 진행
+            if await self._sleep(delay):
+                return written, unfinished
+            delay *= 2
+        return written, unfinished
+
+    async def _fetch_page(self, client, cursor: str | None):
+        """페이지 하나를 가져옵니다. 실패하면 대기 시간을 늘려 가며 재시도하고, 끝내 실패하면 None."""
+        delay = self.RETRY_DELAY
+        for attempt in range(BACKFILL_RETRIES + 1):
+            try:
+                return await get_bookmark_page(client, self.page_size, cursor)
+            except AuthError as e:
+                print(f"✗ {e}")
+                return None
+            except RuntimeError as e:
+                if attempt == BACKFILL_RETRIES:
+                    print(f"✗ 북마크 페이지 조회 실패, 재시도 횟수 초과: {e}")
+                    return None
+                if isinstance(e, RateLimited):
+                    delay = max(delay, e.wait)  # 한도 재설정까지 기다림
+                print(f"  ↳ 북마크 페이지 조회 실패 ({attempt + 1}/{BACKFILL_RETRIES}), {delay:.0f}초 후 재시도: {e}")
+                if await self._sleep(delay):
+                    return None  # 기다리는 동안 종료 요청
+                delay *= 2
+        return None
+
+    async def _sleep(self, seconds: float) -> bool:
+        """seconds만큼 기다립니다. 그 사이 종료 요청이 오면 바로 True."""
+        try:
+            await asyncio.wait_for(self.stop.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _report(self, index: VaultIndex, titles: TitleIndex | None):
+        cp = self.checkpoint
+        elapsed = time.monotonic() - self._session_started
+        rate = self._session_items / elapsed if elapsed > 0 else 0.0
+        line = f"  [{cp['pages']}페이지] 누적 {cp['items']}개 · 노트 {cp['notes']}개 · {rate:.2f}개/s"
+        if self.expected_total and rate > 0:
+            remaining = max(self.expected_total - cp["items"], 0)
+            line += f" · {cp['items'] / self.expected_total * 100:.0f}% · 남은 시간 약 {metrics.duration(remaining / rate)}"
+        print(line)
+        index.save()  # 크래시 후에도 색인을 다시 만들지 않도록
+        if titles is not None:
+            titles.save()
+
+    # ── 체크포인트 ────────────────────────────────────
+
+    def _load(self) -> dict:
+        checkpoint = {"cursor": None, "pages": 0, "items": 0, "notes": 0, "failed": 0, "done": False}
+        if self.checkpoint_file.exists():
+            try:
+                checkpoint.update(json.loads(self.checkpoint_file.read_text(encoding="utf-8")))
+            except (OSError, json.JSONDecodeError):
+                pass
+        return checkpoint
+
+    def _save(self):
+        self.checkpoint["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        tmp = self.checkpoint_file.with_name(self.checkpoint_file.name + ".tmp")
+        tmp.write_text(json.dumps(self.checkpoint, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_file)
+
+    # ── 종료 ─────────────────────────────────────────
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self._request_stop, sig)
+            except (NotImplementedError, RuntimeError):
+                pass  # 시그널 핸들러를 지원하지 않는 환경
+
+    def _request_stop(self, sig: signal.Signals):
+        if not self.stop.is_set():
+            print(f"\n{sig.name} 수신 — 진행 중인 작업을 마치고 체크포인트를 남긴 뒤 종료합니다")
+        self.stop.set()
+
+
+async def _aiter(items: list):
+    for item in items:
+        yield item
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+오프라인 종단간(end-to-end) 처리량 벤치마크.
+
+실제 X 쿠키나 Ollama 없이 main.run → fetch_bookmarks → 분석 → write_note 경로 전체를 돌립니다.
+  - X.com: bench/fake_x.py 의 가짜 twikit Client (기록된 트윗 + 페이지/상세 조회 지연)
+  - Ollama: bench/fake_ollama.py 의 가짜 HTTP 서버 (TTFT + 초당 토큰 수)
+  - 노트와 상태 파일은 임시 디렉토리에 쓰고, 분석 캐시는 끕니다.
+
+북마크 수마다 별도 프로세스에서 실행해 notes/sec, 단계별(상세 조회/분석/저장) p50·p95 지연,
+최대 메모리(RSS)를 표로 보여줍니다.
+
+실행:
+    python3 bench/e2e_bench.py                                  # 5, 50, 500, 5000개
+    python3 bench/e2e_bench.py --sizes 5,50 --ttft 0.3 --tokens-per-sec 40
+    python3 bench/e2e_bench.py --json bench_result.json         # 결과를 파일로도 저장
+    python3 bench/e2e_bench.py --ollama-servers 3 --enrich-workers 6  # 가짜 Ollama 3대에 나눠 보냄
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+from metrics import percentile  # noqa: E402
+
+STAGES = ("fetch", "enrich", "write")
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ── 자식 프로세스: 한 크기로 main.run 실행 ─────────────────
+
+def _timed(func, samples: list[float]):
+    if asyncio.iscoroutinefunction(func):
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+    else:
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - started)
+    return wrapper
+
+
+def run_child(args) -> dict:
+    import fake_x
+    import enricher
+    import fetcher
+    import main
+    import metrics
+    import pipeline
+    from state import State
+
+    tmp = Path(tempfile.mkdtemp(prefix="xto-bench-"))
+    vault = tmp / "vault"
+    vault.mkdir()
+
+    fake_x.install(args.size, page_latency=args.page_latency, detail_latency=args.detail_latency)
+    enricher.OLLAMA_URLS = args.ollama_url.split(",")
+    enricher.ENRICH_OUTPUT_FORMAT = args.format
+    enricher.RECORD_RESPONSES = False
+
+    main.STATE_FILE = tmp / ".state.json"
+    main.VAULT_INDEX_FILE = tmp / ".vault_index.json"
+    main.TITLE_INDEX_FILE = tmp / ".title_index.json"
+    main.PAYLOAD_STORE_FILE = tmp / ".payloads.sqlite"
+    metrics.METRICS_FILE = tmp / "metrics.jsonl"
+    main.ENRICH_CACHE_ENABLED = False  # 기록된 트윗을 돌려 쓰므로 캐시를 켜면 분석이 측정되지 않음
+    main.DEDUP_ENABLED = False  # 같은 이유로 거의 같은 글 재사용도 끔
+    main.get_x_cookies = lambda: {"auth_token": "bench", "ct0": "bench"}
+    # 첫 실행은 한 페이지만 가져오므로, 스트림에 없는 ID 하나를 미리 넣어 증분 동기화(페이지 넘김)로 실행
+    seed = State(main.STATE_FILE)
+    seed.mark_processed("1")
+    seed.close()
+    main.SYNC_MAX_PAGES = math.ceil(args.size / args.page_size) + 1
+    if args.enrich_workers:
+        main.ENRICH_CONCURRENCY = args.enrich_workers
+    if args.batch_items:
+        main.ENRICH_BATCH_MAX_ITEMS = args.batch_items
+
+    samples = {stage: [] for stage in STAGES}
+    fetcher._build_tweet = _timed(fetcher._build_tweet, samples["fetch"])
+    enricher.AsyncEnricher.enrich = _timed(enricher.AsyncEnricher.enrich, samples["enrich"])
+    enricher.AsyncEnricher.enrich_batch = _timed(enricher.AsyncEnricher.enrich_batch, samples["enrich"])
+    pipeline.write_note = _timed(pipeline.write_note, samples["write"])
+
+    log = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        asyncio.run(main.run(output_dir=vault, fetch_count=args.page_size))
+    elapsed = time.perf_counter() - started
+
+    notes = sum(1 for _ in vault.glob("*.md"))
+    result = {
+        "size": args.size,
+        "notes": notes,
+        "elapsed": elapsed,
+        "notes_per_sec": notes / elapsed if elapsed else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "x_calls": dict(fake_x.FakeXClient.calls),
+        "failures": log.getvalue().count("✗"),
+    }
+    for stage, values in samples.items():
+        result[stage] = {"n": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95)}
+    return result
+
+
+# ── 부모 프로세스: 가짜 Ollama 서버 + 크기별 실행 ─────────────
+
+def run_size(size: int, url: str, args) -> dict:
+    cmd = [
+        sys.executable, __file__, "--child", str(size),
+        "--ollama-url", url,
+        "--page-size", str(args.page_size),
+        "--page-latency", str(args.page_latency),
+        "--detail-latency", str(args.detail_latency),
+        "--format", args.format,
+        "--enrich-workers", str(args.enrich_workers),
+        "--batch-items", str(args.batch_items),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{size}개 실행 실패:\n{proc.stderr or proc.stdout}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def print_table(results: list[dict]):
+    header = f"{'bookmarks':>9}{'notes':>7}{'sec':>9}{'notes/s':>9}{'RSS MB':>8}"
+    for stage in STAGES:
+        header += f"{stage + ' p50':>12}{'p95':>8}"
+    print(header)
+    print("─" * len(header))
+    for r in results:
+        line = (
+            f"{r['size']:>9}{r['notes']:>7}{r['elapsed']:>9.2f}"
+            f"{r['notes_per_sec']:>9.1f}{r['peak_rss_mb']:>8.1f}"
+        )
+        for stage in STAGES:
+            line += f"{r[stage]['p50'] * 1000:>10.1f}ms{r[stage]['p95'] * 1000:>6.0f}ms"
+        print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="오프라인 종단간 처리량 벤치마크")
+    ap.add_argument("--sizes", default="5,50,500,5000", help="북마크 수 목록 (쉼표 구분)")
+    ap.add_argument("--page-size", type=int, default=20, help="북마크 페이지당 개수")
+    ap.add_argument("--page-latency", type=float, default=0.3, help="북마크 페이지 조회 지연(초)")
+    ap.add_argument("--detail-latency", type=float, default=0.1, help="트윗 상세 조회 지연(초)")
+    ap.add_argument("--ttft", type=float, default=0.05, help="가짜 Ollama 첫 토큰까지 지연(초)")
+    ap.add_argument("--tokens-per-sec", type=float, default=2000, help="가짜 Ollama 초당 토큰 수")
+    ap.add_argument("--think-tokens", type=int, default=0, help="응답 전 추론 토큰 수")
+    ap.add_argument("--format", choices=("json", "lines"), default="json", help="분석 답변 형식")
+    ap.add_argument("--enrich-workers", type=int, default=0, help="분석 워커 수 (0=settings.json 값)")
+    ap.add_argument("--batch-items", type=int, default=0, help="배치 최대 트윗 수 (0=settings.json 값)")
+    ap.add_argument("--ollama-servers", type=int, default=1, help="가짜 Ollama 서버 수 (여러 대면 풀로 나눠 보냄)")
+    ap.add_argument("--json", type=Path, help="결과를 JSON 파일로도 저장")
+    ap.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--ollama-url", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child is not None:
+        args.size = args.child
+        print(json.dumps(run_child(args)))
+        return
+
+    from fake_ollama import FakeOllamaServer
+
+    servers = [
+        FakeOllamaServer(ttft=args.ttft, tokens_per_sec=args.tokens_per_sec, think_tokens=args.think_tokens).start()
+        for _ in range(max(1, args.ollama_servers))
+    ]
+    print(
+        f"X 지연: 페이지 {args.page_latency}s / 상세 {args.detail_latency}s, "
+        f"Ollama {len(servers)}대: TTFT {args.ttft}s, {args.tokens_per_sec:g} tok/s, 형식 {args.format}\n"
+    )
+    results = []
+    try:
+        for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+            results.append(run_size(size, ",".join(s.url for s in servers), args))
+            print(f"  ✓ {size}개 완료 ({results[-1]['elapsed']:.1f}s)", file=sys.stderr)
+    finally:
+        for server in servers:
+            server.stop()
+
+    print()
+    print_table(results)
+    failures = sum(r["failures"] for r in results)
+    if failures:
+        print(f"\n✗ 실패 메시지 {failures}건 — 결과를 확인하세요")
+    if args.json:
+        args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
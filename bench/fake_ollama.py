@@ -0,0 +1,260 @@
+"""
+벤치마크용 가짜 Ollama 서버.
+
+/api/chat(과 예전 /api/generate) 요청에 정해진 분석 결과를 돌려주며, 첫 토큰까지의 지연(TTFT)과
+초당 토큰 수를 흉내 냅니다. stream / 비스트리밍, JSON 스키마(format) / 줄 형식, 배치 프롬프트, 긴
+글의 조각 요약 프롬프트를 모두 지원합니다.
+
+--prompt-tokens-per-sec를 주면 프롬프트 평가도 흉내 냅니다. 실제 Ollama처럼 직전 요청과 앞부분이
+같은 만큼은 KV 캐시를 재사용한 것으로 보고, 달라진 뒷부분만 평가 토큰(prompt_eval_count)으로 셉니다.
+
+단독 실행:
+    python3 bench/fake_ollama.py --port 11435 --ttft 0.2 --tokens-per-sec 40
+"""
+
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_BATCH_COUNT = re.compile(r"아래 트윗 (\d+)개")
+_CHUNK_PROMPT = "긴 글의 한 부분입니다"
+
+# 토큰 하나를 이 글자 수로 근사 (한국어 기준 대략치)
+CHARS_PER_TOKEN = 3
+
+ANSWER = {
+    "title": "작은 실험을 자주 하는 조직이 더 빨리 배운다",
+    "claim": "글쓴이는 학습 속도가 실험 횟수에 비례한다고 전제한다. 이 전제가 참이라면 실패 비용을 낮추는 구조가 전략보다 중요하다.",
+    "questions": [
+        "실험 횟수를 늘리면 품질이 떨어지는 지점은 어디인가?",
+        "실패 비용을 낮추는 구조는 조직 규모에 따라 어떻게 달라지는가?",
+        "개인의 학습에도 같은 원리가 성립하는가?",
+    ],
+    "links": ["실험 문화", "학습 곡선", "린 스타트업"],
+    "tags": ["조직", "학습"],
+}
+
+
+def _answer(seq: int) -> dict:
+    # 제목이 같으면 노트 파일 이름이 겹치므로 요청마다 번호를 붙임
+    return {**ANSWER, "title": f"{ANSWER['title']} {seq}"}
+
+
+def _lines_answer(answer: dict) -> str:
+    return (
+        f"TITLE: {answer['title']}\n"
+        f"CLAIM: {answer['claim']}\n"
+        + "".join(f"Q{i}: {q}\n" for i, q in enumerate(answer["questions"], 1))
+        + "LINKS: " + ", ".join(f"[{l}]" for l in answer["links"]) + "\n"
+        + "TAGS: " + ", ".join(f"[{t}]" for t in answer["tags"])
+    )
+
+
+def prompt_of(body: dict) -> str:
+    """요청의 프롬프트 전체 (/api/chat이면 메시지를 순서대로 이어 붙임)."""
+    if "messages" in body:
+        return "".join(f"<{m.get('role')}>{m.get('content', '')}" for m in body["messages"])
+    return f"<system>{body['system']}<user>{body['prompt']}" if body.get("system") else body.get("prompt", "")
+
+
+def answer_for(body: dict, next_seq) -> str:
+    """요청 본문(프롬프트, format)에 맞는 응답 텍스트를 만듭니다. next_seq()는 제목 번호."""
+    as_json = isinstance(body.get("format"), dict)
+    prompt = prompt_of(body)
+    if _CHUNK_PROMPT in prompt:
+        return f"이 부분은 {ANSWER['claim']} (요약 {next_seq()})"
+    m = _BATCH_COUNT.search(prompt)
+    if m:
+        answers = [_answer(next_seq()) for _ in range(int(m.group(1)))]
+        if as_json:
+            return json.dumps({"items": answers}, ensure_ascii=False)
+        return "\n\n".join(f"=== ITEM {i} ===\n{_lines_answer(a)}" for i, a in enumerate(answers, 1))
+    answer = _answer(next_seq())
+    return json.dumps(answer, ensure_ascii=False) if as_json else _lines_answer(answer)
+
+
+def _tokens(text: str) -> list[str]:
+    return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """
+    Args:
+        port: 0이면 빈 포트를 고름
+        ttft: 요청부터 첫 응답 토큰까지의 지연(초)
+        tokens_per_sec: 응답 토큰 생성 속도 (0이면 지연 없음)
+        think_tokens: think가 false가 아닐 때 먼저 보낼 추론 토큰 수
+        prompt_tokens_per_sec: 프롬프트 평가 속도 (0이면 평가 시간 없음, TTFT만 적용)
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, port: int = 0, ttft: float = 0.05, tokens_per_sec: float = 2000, think_tokens: int = 0,
+        prompt_tokens_per_sec: float = 0,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.think_tokens = think_tokens
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._last_prompt = ""
+
+    def next_seq(self) -> int:
+        with self._lock:
+            return next(self._seq)
+
+    def evaluate(self, prompt: str) -> tuple[int, float]:
+        """(새로 평가할 프롬프트 토큰 수, 평가 시간). 직전 프롬프트와 같은 앞부분은 캐시로 봄."""
+        with self._lock:
+            last, self._last_prompt = self._last_prompt, prompt
+        shared = 0
+        for a, b in zip(last, prompt):
+            if a != b:
+                break
+            shared += 1
+        tokens = (len(prompt) - shared) // CHARS_PER_TOKEN + 1
+        rate = self.prompt_tokens_per_sec
+        return tokens, (tokens / rate if rate else 0.0)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeOllamaServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeOllamaServer
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        # 상태 확인용 (OllamaPool은 /api/version을 부름)
+        if self.path.endswith("/api/version"):
+            self._send_json({"version": "0.0.0-fake"})
+        elif self.path.endswith("/api/tags"):
+            self._send_json({"models": [{"name": "fake"}]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self.server._lock:
+            self.server.requests += 1
+
+        started = time.perf_counter()
+        chat = self.path.endswith("/api/chat")
+        thinking = _tokens("추론 " * self.server.think_tokens) if body.get("think") is not False else []
+        tokens = _tokens(answer_for(body, self.server.next_seq))
+        prompt_tokens, prompt_seconds = self.server.evaluate(prompt_of(body))
+        self._first = self.server.ttft + prompt_seconds
+
+        if not body.get("stream", True):
+            self._pace(started, len(thinking) + len(tokens))
+            self._send_json({
+                "model": body.get("model", ""),
+                **self._content("".join(tokens), chat),
+                "done": True,
+                **self._stats(started, prompt_tokens, len(thinking) + len(tokens)),
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            sent = 0
+            for token in thinking:
+                sent += 1
+                self._pace(started, sent)
+                self._write_chunk({**self._content("", chat, thinking=token), "done": False})
+            for token in tokens:
+                sent += 1
+                self._pace(started, sent)
+                self._write_chunk({**self._content(token, chat), "done": False})
+            self._write_chunk({**self._content("", chat), "done": True, **self._stats(started, prompt_tokens, sent)})
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트가 TAGS까지 받고 조기 종료한 경우
+
+    @staticmethod
+    def _content(text: str, chat: bool, thinking: str | None = None) -> dict:
+        """응답 텍스트 필드 (/api/chat은 message 안, /api/generate는 최상위)."""
+        fields = {"content" if chat else "response": text}
+        if thinking is not None:
+            fields["thinking"] = thinking
+        return {"message": {"role": "assistant", **fields}} if chat else fields
+
+    def _pace(self, started: float, emitted: int):
+        """TTFT(+ 프롬프트 평가) + emitted / tokens_per_sec 시점까지 기다립니다."""
+        rate = self.server.tokens_per_sec
+        due = started + self._first + (emitted - 1) / rate if rate else started + self._first
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _stats(self, started: float, prompt_tokens: int, eval_tokens: int) -> dict:
+        """Ollama 마지막 청크의 토큰 수/소요 시간 필드 (나노초)."""
+        total = time.perf_counter() - started
+        return {
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(self._first * 1e9),
+            "eval_count": eval_tokens,
+            "eval_duration": int(max(total - self._first, 0) * 1e9),
+            "total_duration": int(total * 1e9),
+        }
+
+    def _write_chunk(self, obj: dict):
+        data = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send_json(self, obj: dict):
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="벤치마크용 가짜 Ollama 서버")
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--ttft", type=float, default=0.05, help="첫 토큰까지 지연(초)")
+    ap.add_argument("--tokens-per-sec", type=float, default=2000, help="초당 응답 토큰 수 (0=지연 없음)")
+    ap.add_argument("--think-tokens", type=int, default=0, help="응답 전에 보낼 추론 토큰 수")
+    ap.add_argument("--prompt-tokens-per-sec", type=float, default=0, help="프롬프트 평가 속도 (0=평가 시간 없음)")
+    args = ap.parse_args()
+
+    server = FakeOllamaServer(
+        args.port, args.ttft, args.tokens_per_sec, args.think_tokens, args.prompt_tokens_per_sec
+    )
+    print(f"가짜 Ollama 서버: {server.url} (TTFT {args.ttft}s, {args.tokens_per_sec} tok/s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
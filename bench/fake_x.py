@@ -0,0 +1,100 @@
+"""
+벤치마크용 가짜 twikit Client.
+
+bench/tweets.jsonl 에 기록된 트윗을 돌려 가며 북마크 N개를 만들어 내고, 북마크 페이지 조회와
+트윗 상세 조회마다 지정한 지연을 줍니다. install()을 부르면 twikit.Client를 이 클래스로 바꿔서
+fetcher.make_client가 그대로 가짜 클라이언트를 만듭니다.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+DEFAULT_TWEETS = Path(__file__).resolve().parent / "tweets.jsonl"
+
+# 첫 번째 북마크 ID (최신 북마크가 가장 큰 ID)
+FIRST_ID = 1_900_000_000_000_000_000
+
+
+class FakeXClient:
+    """twikit.Client 중 fetcher가 쓰는 부분(set_cookies, get_bookmarks, get_tweet_by_id)만 흉내 냅니다."""
+
+    total = 0
+    page_latency = 0.0
+    detail_latency = 0.0
+    records: list[dict] = []
+    calls = {"page": 0, "detail": 0}
+
+    def __init__(self, *args, **kwargs):
+        self.http = None
+
+    def set_cookies(self, cookies: dict):
+        pass
+
+    async def get_bookmarks(self, count: int = 20, cursor: str | None = None):
+        FakeXClient.calls["page"] += 1
+        await asyncio.sleep(self.page_latency)
+        start = int(cursor or 0)
+        end = min(start + count, self.total)
+        page = _Page(_tweet(i, self.records) for i in range(start, end))
+        page.next_cursor = str(end) if end < self.total else None
+        return page
+
+    async def get_tweet_by_id(self, tweet_id: str):
+        FakeXClient.calls["detail"] += 1
+        await asyncio.sleep(self.detail_latency)
+        return _tweet(FIRST_ID - int(tweet_id), self.records)
+
+
+class _Page(list):
+    next_cursor: str | None = None
+
+
+def _tweet(index: int, records: list[dict]) -> SimpleNamespace:
+    rec = records[index % len(records)]
+    user = SimpleNamespace(screen_name=rec["screen_name"], name=rec["name"])
+    note = rec.get("note_tweet")
+    return SimpleNamespace(
+        id=str(FIRST_ID - index),
+        text=rec["text"],
+        full_text=rec["text"],
+        note_tweet={"note_tweet_results": {"result": {"text": note}}} if note else None,
+        user=user,
+        created_at="Wed Oct 15 09:00:00 +0000 2026",
+        urls=[],
+        media=[SimpleNamespace(media_url_https=u) for u in rec.get("media", [])],
+        in_reply_to=None,
+        replies=_thread(str(FIRST_ID - index), rec.get("replies", []), user),
+    )
+
+
+def _thread(root_id: str, texts: list[str], user: SimpleNamespace) -> _Page:
+    """작성자 답글 체인을 상세 응답의 모양(첫 답글 항목 + 같은 대화 모듈의 나머지)으로 만듭니다."""
+    chain, parent = [], root_id
+    for k, text in enumerate(texts, 1):
+        reply = SimpleNamespace(
+            id=f"{root_id}{k:03d}", text=text, full_text=text, note_tweet=None, user=user, in_reply_to=parent
+        )
+        chain.append(reply)
+        parent = reply.id
+    if not chain:
+        return _Page()
+    chain[0].replies = _Page(chain[1:])
+    return _Page(chain[:1])
+
+
+def load_records(path: Path = DEFAULT_TWEETS) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def install(total: int, page_latency: float = 0.0, detail_latency: float = 0.0, tweets: Path = DEFAULT_TWEETS):
+    """twikit.Client를 FakeXClient로 바꿉니다. 북마크는 total개."""
+    import twikit
+
+    FakeXClient.total = total
+    FakeXClient.page_latency = page_latency
+    FakeXClient.detail_latency = detail_latency
+    FakeXClient.records = load_records(tweets)
+    FakeXClient.calls = {"page": 0, "detail": 0}
+    twikit.Client = FakeXClient
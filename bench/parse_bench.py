@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+LLM 응답 파싱 마이크로 벤치마크.
+
+줄 형식(TITLE: ...) 파서와 JSON 모드 단일 패스 디코더의 파싱 시간과 실패율을
+기록된 응답 말뭉치로 비교합니다.
+
+실행:
+    python3 bench/parse_bench.py                      # 기본 말뭉치 (bench/responses.jsonl)
+    python3 bench/parse_bench.py --corpus recorded_responses.jsonl --repeat 2000
+
+실제 응답 말뭉치는 settings.json에 "record_responses": true 를 켜고 main.py를 돌리면
+recorded_responses.jsonl 에 쌓입니다.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from enricher import _decode_json, _parse, _result_from_json  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "responses.jsonl"
+
+
+def parse_lines(raw: str) -> dict:
+    return _parse(raw)
+
+
+def parse_json(raw: str) -> dict:
+    return _result_from_json(_decode_json(raw)) or {"title": ""}
+
+
+PARSERS = {"lines": parse_lines, "json": parse_json}
+
+
+def load_corpus(path: Path) -> list[dict]:
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            entries.append(json.loads(line))
+    return entries
+
+
+def bench(entries: list[dict], parser, repeat: int) -> tuple[float, int]:
+    """(응답 1건당 평균 파싱 시간 µs, TITLE을 못 얻은 응답 수)"""
+    failures = sum(1 for e in entries if not parser(e["response"])["title"])
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for e in entries:
+            parser(e["response"])
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(entries)) * 1e6, failures
+
+
+def main():
+    ap = argparse.ArgumentParser(description="LLM 응답 파싱 벤치마크")
+    ap.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="응답 말뭉치 (JSON lines)")
+    ap.add_argument("--repeat", type=int, default=500, help="말뭉치 반복 횟수")
+    args = ap.parse_args()
+
+    entries = load_corpus(args.corpus)
+    print(f"말뭉치: {args.corpus} ({len(entries)}건)\n")
+    print(f"{'format':<10}{'parser':<8}{'n':>6}{'avg µs':>12}{'fail':>8}{'fail%':>9}")
+    print("─" * 53)
+
+    for fmt in ("lines", "json"):
+        group = [e for e in entries if e.get("format") == fmt]
+        if not group:
+            continue
+        for name, parser in PARSERS.items():
+            per_item, failures = bench(group, parser, args.repeat)
+            print(
+                f"{fmt:<10}{name:<8}{len(group):>6}{per_item:>12.1f}"
+                f"{failures:>8}{failures / len(group) * 100:>8.0f}%"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+프롬프트 배치별 프롬프트 평가 시간 비교 벤치마크.
+
+같은 트윗들을 두 가지 배치로 분석 요청하고, Ollama가 응답에 돌려주는 prompt_eval_count /
+prompt_eval_duration으로 노트 하나당 프롬프트 평가 토큰 수와 시간을 비교합니다.
+  - generate: 예전 배치 — /api/generate 한 문자열, 트윗이 지침보다 앞에 있어 매번 전체를 평가
+  - chat:     지금 배치 — /api/chat, 고정 지침(system)이 앞이라 트윗(user)만 새로 평가
+
+숫자는 --ollama-url로 실제 Ollama 서버를 가리킬 때만 의미가 있습니다. 주소 없이 돌리면 가짜 서버
+(bench/fake_ollama.py)가 접두어 캐시 재사용을 흉내 내어 평가 시간을 계산하므로, 두 배치의 차이는
+측정값이 아니라 그 흉내의 결과입니다 (벤치마크 코드 경로 확인용).
+
+실행:
+    python3 bench/prompt_bench.py --ollama-url http://localhost:11434 --notes 10
+    python3 bench/prompt_bench.py                                   # 가짜 Ollama — 모의 실행 (측정 아님)
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+import enricher  # noqa: E402
+
+# 예전 /api/generate 프롬프트 배치 (트윗 → 지침 → 답변 형식)
+LEGACY_HEAD = """당신은 텍스트 분석 전문가입니다. 아래 트윗을 깊이 있게 분석하세요.
+
+## 작성자
+@{author_handle}
+
+## 트윗 내용
+{text}
+
+---
+
+"""
+
+
+def legacy_payload(text: str, handle: str) -> dict:
+    """예전 배치의 /api/generate 요청 본문 (지금 배치와 같은 모델·옵션)."""
+    payload = enricher._build_payload(text, handle)
+    system = payload["messages"][0]["content"]
+    guide = system.split("\n\n", 1)[1]  # 첫 줄(역할 소개)은 LEGACY_HEAD에 있음
+    prompt = LEGACY_HEAD.format(author_handle=handle, text=enricher._truncate_text(text)) + guide
+    legacy = {k: v for k, v in payload.items() if k != "messages"}
+    return {**legacy, "prompt": prompt, "stream": False}
+
+
+def chat_payload(text: str, handle: str) -> dict:
+    return {**enricher._build_payload(text, handle), "stream": False}
+
+
+LAYOUTS = {
+    "generate": ("/api/generate", legacy_payload),
+    "chat": ("/api/chat", chat_payload),
+}
+
+
+def load_tweets(path: Path, count: int) -> list[tuple[str, str]]:
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    tweets = [(r.get("note_tweet") or r["text"], r["screen_name"]) for r in rows]
+    return [tweets[i % len(tweets)] for i in range(count)]
+
+
+def run_layout(client: httpx.Client, name: str, tweets: list[tuple[str, str]]) -> dict:
+    path, build = LAYOUTS[name]
+    prompt_tokens = prompt_seconds = total = 0.0
+    for text, handle in tweets:
+        started = time.perf_counter()
+        response = client.post(path, json=build(text, handle))
+        response.raise_for_status()
+        stats = response.json()
+        total += time.perf_counter() - started
+        prompt_tokens += stats.get("prompt_eval_count", 0)
+        prompt_seconds += stats.get("prompt_eval_duration", 0) / 1e9
+    n = len(tweets)
+    return {
+        "layout": name,
+        "notes": n,
+        "prompt_tokens": prompt_tokens / n,
+        "prompt_ms": prompt_seconds / n * 1000,
+        "total_ms": total / n * 1000,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="프롬프트 배치별 프롬프트 평가 시간 비교")
+    ap.add_argument("--ollama-url", help="실제 Ollama 주소 (없으면 가짜 서버)")
+    ap.add_argument("--notes", type=int, default=20, help="배치마다 분석할 트윗 수")
+    ap.add_argument("--tweets", type=Path, default=BENCH_DIR / "tweets.jsonl", help="트윗 말뭉치 (JSON lines)")
+    ap.add_argument("--prompt-tokens-per-sec", type=float, default=400, help="가짜 서버의 프롬프트 평가 속도")
+    args = ap.parse_args()
+
+    server = None
+    url = args.ollama_url
+    if url is None:
+        from fake_ollama import FakeOllamaServer
+        server = FakeOllamaServer(ttft=0.01, tokens_per_sec=0, prompt_tokens_per_sec=args.prompt_tokens_per_sec)
+        url = server.start().url
+    mode = " — 가짜 서버, 모의 실행" if server is not None else ""
+    print(f"Ollama: {url} (모델 {enricher.OLLAMA_MODEL}){mode}, 배치마다 {args.notes}개\n")
+
+    tweets = load_tweets(args.tweets, args.notes)
+    try:
+        with httpx.Client(base_url=url, timeout=enricher.OLLAMA_READ_TIMEOUT) as client:
+            results = [run_layout(client, name, tweets) for name in LAYOUTS]
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(f"{'layout':<10}{'notes':>6}{'prompt tok/note':>17}{'prompt ms/note':>16}{'total ms/note':>15}")
+    print("─" * 64)
+    for r in results:
+        print(
+            f"{r['layout']:<10}{r['notes']:>6}{r['prompt_tokens']:>17.0f}"
+            f"{r['prompt_ms']:>16.1f}{r['total_ms']:>15.1f}"
+        )
+    if server is not None:
+        print("\n※ 가짜 Ollama의 접두어 캐시 흉내로 계산한 값입니다 — 실제 절약량은 --ollama-url로 측정하세요")
+        return
+    base, new = results[0]["prompt_ms"], results[1]["prompt_ms"]
+    if base:
+        print(f"\n노트당 프롬프트 평가 시간 {base - new:.1f}ms 절약 ({(1 - new / base) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+LLM 분석 결과를 디스크에 캐시합니다.
+
+키는 (모델, 프롬프트 템플릿, 입력 텍스트, 옵션)의 해시라서, 같은 입력을 다시 분석하는 경우
+(크래시 후 재실행, .state.json 유실, 같은 글을 두 번 북마크) LLM을 부르지 않고 바로 돌려줍니다.
+크기/기간 제한을 넘으면 가장 오래 쓰지 않은 항목부터 지웁니다 (LRU).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+def make_key(*parts) -> str:
+    """JSON 직렬화 가능한 값들로 캐시 키(sha256)를 만듭니다."""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class EnrichmentCache:
+    """
+    SQLite 기반 LRU 캐시.
+
+    Args:
+        path: 캐시 파일 경로
+        max_entries: 최대 항목 수 (넘으면 오래 안 쓴 것부터 삭제)
+        max_age_days: 저장 후 이 기간이 지난 항목은 삭제 (0이면 무제한)
+    """
+
+    # put 몇 번마다 정리할지
+    EVICT_EVERY = 50
+
+    def __init__(self, path: Path, max_entries: int = 5000, max_age_days: float = 90):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self.evict()
+
+    def get(self, key: str) -> dict | None:
+        return self.get_any([key])
+
+    def get_any(self, keys: list[str]) -> dict | None:
+        """keys 중 앞에서부터 처음 있는 항목. 키가 여러 개여도 적중/미스는 한 번만 셉니다."""
+        with self._lock:
+            for key in keys:
+                row = self._db.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    break
+            else:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._db.commit()
+            self._puts += 1
+        if self._puts % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        """기간이 지난 항목과 max_entries를 넘는 오래된 항목을 삭제합니다."""
+        with self._lock:
+            if self.max_age_days:
+                cutoff = time.time() - self.max_age_days * 86400
+                self._db.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,))
+            if self.max_entries:
+                self._db.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    " SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"분석 캐시: 적중 {self.hits} / 미스 {self.misses} ({rate:.0f}%)"
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.max_age_days) and created_at < time.time() - self.max_age_days * 86400
@@ -34,13 +34,104 @@ DEFAULT_OUTPUT_DIR = _expand_path(
 )
 
 # Ollama settings
-OLLAMA_URL = _settings.get("ollama_url", "http://localhost:11434")
+OLLAMA_URL = _settings.get("ollama_url", "http://localhost:11434")  # 주소 하나 또는 목록 (여러 대면 나눠 보냄)
+OLLAMA_URLS = [OLLAMA_URL] if isinstance(OLLAMA_URL, str) else list(OLLAMA_URL)
 OLLAMA_MODEL = _settings.get("ollama_model", "glm-5:cloud")
+MODEL_ROUTES = _settings.get("model_routes", [])  # 입력별 모델 경로 (위에서부터 첫 일치, 없으면 ollama_model)
+OLLAMA_NUM_CTX = _settings.get("ollama_num_ctx", _settings.get("ollama_max_ctx", 16384))  # 모든 요청에 같은 num_ctx (바뀌면 모델을 다시 올림)
+ENRICH_OUTPUT_FORMAT = _settings.get("enrich_output_format", "json")  # "json"(스키마 강제) 또는 "lines"(TITLE: ... 형식)
+RECORD_RESPONSES = _settings.get("record_responses", False)  # 응답 원문을 파싱 벤치마크용으로 기록
+OLLAMA_STREAM = _settings.get("ollama_stream", True)  # 스트리밍 + TAGS 수신 시 조기 종료
+OLLAMA_THINK = _settings.get("ollama_think")  # thinking 모델 추론 여부 (None이면 모델 기본값)
+OLLAMA_KEEP_ALIVE = _settings.get("ollama_keep_alive", "30m")  # 마지막 요청 뒤 모델을 메모리에 둘 시간 ("30m", 초 단위 숫자, -1=계속)
+THINK_TOKEN_BUDGET = _settings.get("think_token_budget", 2000)  # 초과 시 추론 없이 재요청 (0=무제한)
+OLLAMA_CONNECT_TIMEOUT = _settings.get("ollama_connect_timeout", 10.0)  # 연결 타임아웃(초)
+OLLAMA_READ_TIMEOUT = _settings.get("ollama_read_timeout", 300.0)  # 응답 청크 사이 최대 대기(초)
+OLLAMA_MAX_CONNECTIONS = _settings.get("ollama_max_connections", 4)  # 유지할 연결 수
+OLLAMA_ENDPOINT_CONCURRENCY = _settings.get("ollama_endpoint_concurrency", 2)  # 엔드포인트 하나에 동시에 보낼 요청 수
+OLLAMA_HEALTH_INTERVAL = _settings.get("ollama_health_interval", 15.0)  # 오류 난 엔드포인트를 다시 확인할 간격(초, 실패할수록 두 배)
 
 # Sync settings
 BOOKMARK_FETCH_COUNT = _settings.get("bookmark_fetch_count", 5)
+SYNC_STOP_AFTER_KNOWN = _settings.get("sync_stop_after_known", 3)  # 처리된 북마크가 이만큼 연속되면 페이지 넘김 중단
+SYNC_MAX_PAGES = _settings.get("sync_max_pages", 50)  # 한 실행에서 넘길 최대 북마크 페이지 수
+FETCH_CONCURRENCY = _settings.get("fetch_concurrency", 4)  # 동시에 상세 조회할 북마크 수
+THREAD_MAX_TWEETS = _settings.get("thread_max_tweets", 100)  # 쓰레드로 이어 붙일 최대 답글 수
+X_RATE_LIMITS = {
+    "bookmarks": 500,
+    "tweet_detail": 150,
+    **_settings.get("x_rate_limits", {}),
+}  # X 엔드포인트별 15분당 요청 수 (응답 헤더를 받으면 서버 값으로 맞춤)
+X_RATE_LIMIT_MAX_WAIT = _settings.get("x_rate_limit_max_wait", 900)  # 한도 재설정까지 이보다 오래 남으면 기다리지 않고 실패(초)
+ENRICH_CONCURRENCY = _settings.get("enrich_concurrency", 1)  # 동시에 진행할 LLM 요청 수
+WRITE_CONCURRENCY = _settings.get("write_concurrency", 2)  # 노트 저장 스레드 수
+PIPELINE_QUEUE_SIZE = _settings.get("pipeline_queue_size", 8)  # 단계 사이 대기열 크기
+ARTICLE_PAGE_POOL = _settings.get("article_page_pool", 2)  # Article 추출용 브라우저 페이지 수
 VERIFY_SSL = _settings.get("verify_ssl", True)  # VPN/프록시 환경에서 false로 설정
+UPDATE_EXISTING_NOTES = _settings.get("update_existing_notes", False)  # 이미 노트가 있는 트윗을 다시 분석해 갱신
+
+# Backfill (main.py --backfill: 북마크 전체 이력을 이어 받기 가능하게 가져오기)
+BACKFILL_PAGE_SIZE = _settings.get("backfill_page_size", 50)  # 백필 한 페이지의 북마크 수
+BACKFILL_RETRIES = _settings.get("backfill_retries", 5)  # 페이지 조회·페이지 안 북마크 처리 실패 시 재시도 횟수 (대기 시간은 두 배씩)
+
+# Media download (첨부 미디어를 저장 경로 아래로 내려받아 로컬 링크)
+MEDIA_DOWNLOAD = _settings.get("media_download", False)
+MEDIA_DIR = _settings.get("media_dir", "attachments")  # 저장 경로 기준 상대 폴더
+MEDIA_CONCURRENCY = _settings.get("media_concurrency", 8)  # 동시에 받을 파일 수
+MEDIA_MAX_DIMENSION = _settings.get("media_max_dimension", 0)  # 이미지 긴 변 최대 픽셀 (0=원본, Pillow 필요)
+
+# Batch enrichment (짧은 트윗 여러 개를 한 요청으로)
+ENRICH_BATCH_MAX_ITEMS = _settings.get("enrich_batch_max_items", 1)  # 1이면 배치 사용 안 함
+ENRICH_BATCH_TOKEN_BUDGET = _settings.get("enrich_batch_token_budget", 4000)  # 배치 한 요청의 입력+답변 예상 토큰 상한
+ENRICH_BATCH_SHORT_CHARS = _settings.get("enrich_batch_short_chars", 600)  # 이보다 긴 트윗은 단건 요청
+
+# Long text enrichment (긴 Article/쓰레드는 나눠 요약한 뒤 종합)
+ENRICH_CHUNK_CHARS = _settings.get("enrich_chunk_chars", 6000)  # 이보다 긴 글은 이 길이 이하 조각으로 나눠 요약
+ENRICH_MAP_CONCURRENCY = _settings.get("enrich_map_concurrency", 2)  # 동시에 보낼 조각 요약 요청 수
+
+# Enrichment cache
+ENRICH_CACHE_ENABLED = _settings.get("enrich_cache", True)
+ENRICH_CACHE_MAX_ENTRIES = _settings.get("enrich_cache_max_entries", 5000)
+ENRICH_CACHE_MAX_AGE_DAYS = _settings.get("enrich_cache_max_age_days", 90)
+
+# Near-duplicate detection (거의 같은 글은 LLM을 부르지 않고 기존 분석 재사용)
+DEDUP_ENABLED = _settings.get("dedup", True)  # 정규화한 본문의 SimHash로 거의 같은 글을 찾아 기존 노트의 분석 재사용
+DEDUP_MAX_DISTANCE = _settings.get("dedup_max_distance", 5)  # 64비트 지문 중 이 비트 수 이하로 다르면 거의 같은 글
+DEDUP_MIN_CHARS = _settings.get("dedup_min_chars", 50)  # 정규화한 본문이 이보다 짧으면 비교하지 않음
+
+# Wiki link resolution (LLM 연결 후보를 볼트의 실제 노트로)
+LINK_RESOLVE = _settings.get("link_resolve", True)  # 연결 후보를 볼트 노트의 제목·별칭과 맞춰 가장 가까운 노트로 링크
+VAULT_DIR = (
+    _expand_path(_settings["vault_dir"]) if _settings.get("vault_dir") else None
+)  # 볼트 루트 (없으면 저장 경로에서 위로 .obsidian 폴더가 있는 곳)
+LINK_FUZZY_THRESHOLD = _settings.get("link_fuzzy_threshold", 0.8)  # 이름의 글자 3-gram 유사도가 이 이상이면 같은 노트로 봄 (1=유사 연결 안 함)
+LINK_UNRESOLVED = _settings.get("link_unresolved", "keep")  # 맞는 노트가 없을 때: "keep"(링크 그대로) 또는 "text"(링크 없이 글자만)
+
+# Raw payload store (main.py --replay로 X 요청 없이 재처리)
+PAYLOAD_STORE_ENABLED = _settings.get("payload_store", True)  # 상세/쓰레드/Article 원본을 압축 보관
+PAYLOAD_STORE_MAX_AGE_DAYS = _settings.get("payload_store_max_age_days", 180)  # 이 기간이 지난 원본은 삭제 (0=무제한)
+
+# Daemon mode (main.py --daemon)
+DAEMON_MIN_INTERVAL = _settings.get("daemon_min_interval", 60)  # 폴링 최소 간격(초)
+DAEMON_MAX_INTERVAL = _settings.get("daemon_max_interval", 1800)  # 폴링 최대 간격(초)
+DAEMON_BACKOFF = _settings.get("daemon_backoff", 2.0)  # 새 북마크가 없을 때 간격에 곱할 배수
+
+# Metrics & logging
+VERBOSITY = _settings.get("verbosity", 1)  # 0=요약만, 1=기본, 2=Ollama 응답 원문까지 출력
+METRICS_ENABLED = _settings.get("metrics", True)  # 단계별 소요 시간/LLM 토큰 처리량을 METRICS_FILE에 기록
+PROMETHEUS_TEXTFILE = (
+    _expand_path(_settings["prometheus_textfile"]) if _settings.get("prometheus_textfile") else None
+)  # node_exporter textfile 수집기용 .prom 경로
 
 # State & log
 STATE_FILE = Path(__file__).parent / ".state.json"
-LOG_FILE = Path(__file__).parent / "sync.log"
\ No newline at end of file
+RESPONSES_FILE = Path(__file__).parent / "recorded_responses.jsonl"  # record_responses 설정 시 LLM 응답 원문 기록
+ENRICH_CACHE_FILE = Path(__file__).parent / ".enrich_cache.sqlite"
+DEDUP_FILE = Path(__file__).parent / ".dedup.sqlite"  # 노트로 저장한 트윗의 SimHash 지문과 분석 결과
+PAYLOAD_STORE_FILE = Path(__file__).parent / ".payloads.sqlite"  # X 원본 응답 (zlib 압축)
+BACKFILL_FILE = Path(__file__).parent / ".backfill.json"  # 백필 커서/진행 상황 체크포인트
+VAULT_INDEX_FILE = Path(__file__).parent / ".vault_index.json"  # 저장 경로의 tweet_id → 노트 파일 색인
+TITLE_INDEX_FILE = Path(__file__).parent / ".title_index.json"  # 볼트 노트 제목·별칭 색인 (디렉토리 mtime 기반 증분 갱신)
+MEDIA_MANIFEST_FILE = Path(__file__).parent / ".media_manifest.json"  # 미디어 URL → 파일/ETag 기록
+LOG_FILE = Path(__file__).parent / "sync.log"
+METRICS_FILE = LOG_FILE.with_name("metrics.jsonl")
\ No newline at end of file
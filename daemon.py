@@ -0,0 +1,309 @@
+"""
+상주(daemon) 모드: 프로세스를 띄워둔 채로 북마크를 주기적으로 동기화합니다.
+
+launchd/cron으로 매번 새로 띄우면 쿠키 추출, twikit/httpx 클라이언트, 브라우저, 상태 파일,
+분석 캐시를 실행마다 다시 준비해야 합니다. 상주 모드는 이것들을 한 번만 준비해 두고 재사용하며,
+인증이 실패했을 때만 쿠키를 다시 읽습니다.
+
+폴링 간격은 결과에 따라 조정됩니다.
+  - 새 북마크 없음 → 간격 × DAEMON_BACKOFF (최대 DAEMON_MAX_INTERVAL)
+  - 한 페이지를 꽉 채울 만큼 몰림 → 바로 최소 간격(DAEMON_MIN_INTERVAL)으로
+  - 그 밖 → 간격을 절반으로
+
+SIGTERM/SIGINT를 받으면 새 북마크는 더 받지 않고, 진행 중인 분석/저장을 마친 뒤 종료합니다.
+"""
+
+import asyncio
+import signal
+from datetime import datetime
+from pathlib import Path
+
+from config import (
+    BOOKMARK_FETCH_COUNT, FETCH_CONCURRENCY, VERIFY_SSL, STATE_FILE,
+    SYNC_STOP_AFTER_KNOWN, SYNC_MAX_PAGES, ARTICLE_PAGE_POOL,
+    ENRICH_CONCURRENCY, WRITE_CONCURRENCY, PIPELINE_QUEUE_SIZE, ENRICH_BATCH_MAX_ITEMS,
+    ENRICH_CACHE_ENABLED, ENRICH_CACHE_FILE, ENRICH_CACHE_MAX_ENTRIES, ENRICH_CACHE_MAX_AGE_DAYS,
+    DAEMON_MIN_INTERVAL, DAEMON_MAX_INTERVAL, DAEMON_BACKOFF,
+    VAULT_INDEX_FILE, UPDATE_EXISTING_NOTES,
+    MEDIA_DOWNLOAD, MEDIA_DIR, MEDIA_CONCURRENCY, MEDIA_MAX_DIMENSION, MEDIA_MANIFEST_FILE,
+    PAYLOAD_STORE_ENABLED, PAYLOAD_STORE_FILE, PAYLOAD_STORE_MAX_AGE_DAYS,
+    DEDUP_ENABLED, DEDUP_FILE, DEDUP_MAX_DISTANCE, DEDUP_MIN_CHARS,
+    LINK_RESOLVE, VAULT_DIR, LINK_FUZZY_THRESHOLD, LINK_UNRESOLVED, TITLE_INDEX_FILE,
+)
+import metrics
+from article import ArticleExtractor
+from auth import get_x_cookies
+from cache import EnrichmentCache
+from dedup import NearDuplicateIndex
+from enricher import AsyncEnricher
+from fetcher import AuthError, RateLimited, fetch_bookmarks, make_client
+from media import MediaDownloader
+from payload_store import PayloadStore
+from pipeline import run_pipeline
+from state import State
+from title_index import TitleIndex, find_vault_root
+from vault_index import VaultIndex
+
+
+class Daemon:
+    """
+    북마크 동기화를 반복 실행하는 상주 프로세스.
+
+    Args:
+        output_dir: 노트를 저장할 디렉토리
+        fetch_count: 북마크 페이지당 개수
+        min_interval / max_interval: 폴링 간격 범위(초)
+        backoff: 새 북마크가 없을 때 간격에 곱할 배수
+    """
+
+    # 인증 실패 후 쿠키를 다시 읽어 재시도하는 횟수
+    AUTH_RETRIES = 1
+
+    def __init__(
+        self,
+        output_dir: Path,
+        fetch_count: int = BOOKMARK_FETCH_COUNT,
+        min_interval: float = DAEMON_MIN_INTERVAL,
+        max_interval: float = DAEMON_MAX_INTERVAL,
+        backoff: float = DAEMON_BACKOFF,
+    ):
+        self.output_dir = output_dir
+        self.fetch_count = fetch_count
+        self.min_interval = max(1.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.backoff = max(1.0, backoff)
+        self.interval = self.min_interval
+        self.limited_for = 0.0  # 요청 한도에 걸린 경우 재설정까지 남은 시간(초)
+
+        self.stop = asyncio.Event()
+        self.state: State | None = None
+        self.index: VaultIndex | None = None
+        self.titles: TitleIndex | None = None
+        self.cache: EnrichmentCache | None = None
+        self.dedup: NearDuplicateIndex | None = None
+        self.media: MediaDownloader | None = None
+        self.payloads: PayloadStore | None = None
+        self.cookies: dict | None = None
+        self.client = None
+        self.extractor: ArticleExtractor | None = None
+        self.cycles = 0
+        self.total_new = 0
+
+    async def run(self):
+        """종료 신호를 받을 때까지 동기화를 반복합니다."""
+        self._install_signal_handlers()
+        print(f"\n[{_now()}] 상주 모드 시작 (간격 {self.min_interval:.0f}~{self.max_interval:.0f}초)")
+        print(f"저장 경로: {self.output_dir}")
+
+        self.state = State(STATE_FILE)
+        self.index = VaultIndex.load(self.output_dir, VAULT_INDEX_FILE)
+        if LINK_RESOLVE:
+            self.titles = TitleIndex.load(
+                VAULT_DIR or find_vault_root(self.output_dir),
+                TITLE_INDEX_FILE,
+                fuzzy_threshold=LINK_FUZZY_THRESHOLD,
+                unresolved=LINK_UNRESOLVED,
+            )
+        if ENRICH_CACHE_ENABLED:
+            self.cache = EnrichmentCache(
+                ENRICH_CACHE_FILE,
+                max_entries=ENRICH_CACHE_MAX_ENTRIES,
+                max_age_days=ENRICH_CACHE_MAX_AGE_DAYS,
+            )
+        if DEDUP_ENABLED:
+            self.dedup = NearDuplicateIndex(DEDUP_FILE, max_distance=DEDUP_MAX_DISTANCE, min_chars=DEDUP_MIN_CHARS)
+        if MEDIA_DOWNLOAD:
+            self.media = MediaDownloader(
+                self.output_dir / MEDIA_DIR,
+                MEDIA_MANIFEST_FILE,
+                max_connections=MEDIA_CONCURRENCY,
+                max_dimension=MEDIA_MAX_DIMENSION,
+                verify_ssl=VERIFY_SSL,
+            )
+        if PAYLOAD_STORE_ENABLED:
+            self.payloads = PayloadStore(PAYLOAD_STORE_FILE, max_age_days=PAYLOAD_STORE_MAX_AGE_DAYS)
+        self._authenticate()
+
+        try:
+            async with AsyncEnricher(cache=self.cache) as enricher:
+                while not self.stop.is_set():
+                    new_count = await self._cycle(enricher)
+                    if new_count is not None:
+                        self._adapt_interval(new_count)
+                    if self.stop.is_set():
+                        break
+                    # 요청 한도에 걸렸으면 재설정 전에는 다시 확인하지 않음
+                    wait, self.limited_for = max(self.interval, self.limited_for), 0.0
+                    print(f"  다음 확인까지 {wait:.0f}초")
+                    try:
+                        await asyncio.wait_for(self.stop.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            await self._close()
+
+    # ── 한 번의 동기화 ────────────────────────────────
+
+    async def _cycle(self, enricher: AsyncEnricher) -> int | None:
+        """동기화를 한 번 실행하고 새 노트 수를 반환합니다. 실패하면 None."""
+        self.cycles += 1
+        print(f"\n[{_now()}] 동기화 #{self.cycles}")
+        if self.client is None:
+            self._authenticate()  # 지난번 쿠키 추출 실패 → 다시 시도
+            if self.client is None:
+                return None
+
+        self.index.refresh()  # 그사이 사용자가 옮기거나 지운 노트 반영
+        if self.titles is not None:
+            self.titles.refresh()  # 그사이 사용자가 만든 노트도 연결 대상으로
+        metrics.start_run()
+        new_count = None
+        try:
+            new_count = await self._sync_with_reauth(enricher)
+        finally:
+            metrics.finish_run(notes=new_count or 0, cycle=self.cycles)
+            self.index.save()
+            if self.titles is not None:
+                self.titles.save()
+            if self.media is not None:
+                self.media.save()
+        if new_count is None:
+            return None
+
+        self.state.update_last_run()
+        self.total_new += new_count
+        if new_count == 0:
+            print("  새 북마크 없음")
+        else:
+            print(f"✓ {new_count}개 노트 생성 (누적 {self.state.total_notes}개)")
+        if self.cache is not None:
+            print(f"  {self.cache.summary()}")
+        if self.dedup is not None and self.dedup.hits:
+            print(f"  {self.dedup.summary()}")
+        if self.titles is not None and self.titles.resolved:
+            print(f"  {self.titles.summary()}")
+        return new_count
+
+    async def _sync_with_reauth(self, enricher: AsyncEnricher) -> int | None:
+        """인증이 실패하면 쿠키를 다시 읽어 재시도합니다. 실패하면 None."""
+        for attempt in range(self.AUTH_RETRIES + 1):
+            try:
+                return await self._sync(enricher)
+            except AuthError as e:
+                if attempt == self.AUTH_RETRIES:
+                    print(f"✗ {e}")
+                    return None
+                print("  ↳ 인증 실패 — 쿠키를 다시 읽습니다")
+                await self._reauthenticate()
+                if self.client is None:
+                    return None
+            except RateLimited as e:
+                print(f"✗ {e}")
+                self.limited_for = e.wait
+                return None
+            except RuntimeError as e:
+                print(f"✗ {e}")
+                return None
+        return None
+
+    async def _sync(self, enricher: AsyncEnricher) -> int:
+        tweets = fetch_bookmarks(
+            self.cookies,
+            count=self.fetch_count,
+            verify_ssl=VERIFY_SSL,
+            concurrency=FETCH_CONCURRENCY,
+            extractor=self.extractor,
+            state=self.state,
+            stop_after_known=SYNC_STOP_AFTER_KNOWN,
+            max_pages=SYNC_MAX_PAGES,
+            client=self.client,
+            payloads=self.payloads,
+        )
+        return await run_pipeline(
+            tweets,
+            self.state,
+            self.output_dir,
+            enricher,
+            enrich_workers=ENRICH_CONCURRENCY,
+            write_workers=WRITE_CONCURRENCY,
+            queue_size=PIPELINE_QUEUE_SIZE,
+            batch_size=ENRICH_BATCH_MAX_ITEMS,
+            stop=self.stop,
+            index=self.index,
+            update_existing=UPDATE_EXISTING_NOTES,
+            media=self.media,
+            dedup=self.dedup,
+            titles=self.titles,
+        )
+
+    def _adapt_interval(self, new_count: int):
+        if new_count == 0:
+            self.interval *= self.backoff
+        elif new_count >= self.fetch_count:
+            self.interval = self.min_interval
+        else:
+            self.interval /= 2
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+    # ── 인증 ─────────────────────────────────────────
+
+    def _authenticate(self):
+        """쿠키를 읽어 twikit 클라이언트와 Article 추출기를 만듭니다."""
+        try:
+            with metrics.timer("cookies"):
+                self.cookies = get_x_cookies()
+        except RuntimeError as e:
+            print(f"✗ {e}")
+            self.cookies, self.client, self.extractor = None, None, None
+            return
+        self.client = make_client(self.cookies, VERIFY_SSL)
+        self.extractor = ArticleExtractor(self.cookies, pool_size=ARTICLE_PAGE_POOL)
+
+    async def _reauthenticate(self):
+        # 이전 쿠키로 띄운 브라우저 컨텍스트는 버리고 새로 만듦
+        await self._close_clients()
+        self._authenticate()
+
+    async def _close_clients(self):
+        if self.extractor is not None:
+            await self.extractor.close()
+            self.extractor = None
+        if self.client is not None:
+            http = getattr(self.client, "http", None)
+            if http is not None and hasattr(http, "aclose"):
+                await http.aclose()
+            self.client = None
+
+    # ── 종료 ─────────────────────────────────────────
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, self._request_stop, sig)
+            except (NotImplementedError, RuntimeError):
+                pass  # 시그널 핸들러를 지원하지 않는 환경
+
+    def _request_stop(self, sig: signal.Signals):
+        if not self.stop.is_set():
+            print(f"\n[{_now()}] {sig.name} 수신 — 진행 중인 작업을 마치고 종료합니다")
+        self.stop.set()
+
+    async def _close(self):
+        await self._close_clients()
+        if self.media is not None:
+            await self.media.close()
+        if self.cache is not None:
+            self.cache.close()
+        if self.dedup is not None:
+            self.dedup.close()
+        if self.payloads is not None:
+            self.payloads.close()
+        if self.state is not None:
+            self.state.update_last_run()
+            self.state.close()
+        print(f"\n[{_now()}] 상주 모드 종료: {self.cycles}회 동기화, {self.total_new}개 노트 생성")
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
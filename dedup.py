@@ -0,0 +1,205 @@
+"""
+거의 같은 글을 찾아 분석 결과를 재사용하는 유사도 색인.
+
+같은 내용을 여러 번 북마크하는 일이 흔합니다 (리포스트, 같은 쓰레드의 인용, 여러 계정이 공유한
+같은 Article). State는 트윗 ID로만 중복을 막고 분석 캐시는 입력이 한 글자만 달라도 빗나가므로,
+지금까지는 사본마다 LLM을 다시 불렀습니다.
+
+NearDuplicateIndex는 정규화한 본문(소문자, URL·RT 머리·문장부호 제거)의 글자 5-gram으로 64비트
+SimHash를 만들어 노트를 쓸 때마다 저장하고, 새 트윗의 지문과 해밍 거리 max_distance 이하인
+기존 트윗을 찾습니다.
+  - 조회: 지문을 max_distance + 1개 구간으로 나눠 구간 값마다 색인해 둠. 거리가 max_distance
+    이하인 두 지문은 적어도 한 구간이 똑같으므로 (비둘기집 원리) 그 구간이 같은 후보만 비교 —
+    전체를 훑지 않고 B-tree 조회 몇 번으로 끝남
+  - 저장: SQLite 파일 하나 (지문, 구간, 분석 결과). 실행이 바뀌어도 유지
+  - 너무 짧은 글(min_chars 미만)은 지문이 불안정해 색인하지 않음
+
+찾은 트윗의 분석 결과는 pipeline이 그대로 재사용하고, 새 노트에 원래 노트 링크를 붙입니다.
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+_BITS = 64
+_SHINGLE = 5  # 글자 n-gram 길이
+_URL = re.compile(r"https?://\S+")
+_RETWEET = re.compile(r"^rt @\w+:?\s*")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """비교용 본문: 소문자, URL·RT 머리·문장부호 제거, 공백 하나로."""
+    text = _URL.sub(" ", text.casefold())
+    text = _RETWEET.sub("", text.strip())
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def simhash(normalized: str) -> int:
+    """정규화한 본문의 64비트 SimHash (글자 n-gram, 등장 횟수로 가중)."""
+    grams = (normalized[i:i + _SHINGLE] for i in range(max(1, len(normalized) - _SHINGLE + 1)))
+    # n-gram 해시를 64자리 비트 문자열로 두고 자리별 1의 개수를 셈 (비트마다 파이썬 반복을 돌지 않게)
+    rows = [
+        format(int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+        for gram in grams
+    ]
+    half = len(rows) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in zip(*rows)), 2)
+
+
+def _bands(fingerprint: int, count: int) -> list[int]:
+    """지문을 count개 구간으로 나눈 값 (앞 구간이 한 비트씩 더 길 수 있음)."""
+    width, extra = divmod(_BITS, count)
+    values = []
+    shift = 0
+    for i in range(count):
+        size = width + (1 if i < extra else 0)
+        values.append(fingerprint >> shift & ((1 << size) - 1))
+        shift += size
+    return values
+
+
+def _signed(value: int) -> int:
+    """SQLite INTEGER(부호 있는 64비트)에 넣을 수 있게 변환."""
+    return value - (1 << _BITS) if value >= 1 << (_BITS - 1) else value
+
+
+class NearDuplicateIndex:
+    """
+    SQLite 기반 SimHash 색인.
+
+    사용 예:
+        dedup = NearDuplicateIndex(DEDUP_FILE, max_distance=5)
+        match = dedup.find(tweet.id, tweet.text)   # {"tweet_id", "distance", "enrichment"} 또는 None
+        dedup.add(tweet.id, tweet.text, enrichment)
+
+    Args:
+        path: 색인 파일 경로
+        max_distance: 이 해밍 거리(64비트 중) 이하면 거의 같은 글로 봄
+        min_chars: 정규화한 본문이 이보다 짧으면 색인·조회하지 않음
+    """
+
+    def __init__(self, path: Path, max_distance: int = 5, min_chars: int = 50):
+        self.path = path
+        self.max_distance = max(0, min(max_distance, 15))
+        self.min_chars = min_chars
+        self.bands = self.max_distance + 1
+        self.hits = 0
+        self.lookups = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " tweet_id TEXT PRIMARY KEY,"
+            " simhash INTEGER NOT NULL,"
+            " enrichment TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " band INTEGER NOT NULL,"
+            " value INTEGER NOT NULL,"
+            " tweet_id TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS bands_value ON bands (band, value)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS bands_tweet ON bands (tweet_id)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._rebuild_bands()
+
+    def fingerprint(self, text: str) -> int | None:
+        """색인할 만큼 긴 글이면 SimHash, 아니면 None."""
+        normalized = normalize(text)
+        if len(normalized) < self.min_chars:
+            return None
+        return simhash(normalized)
+
+    def find(self, tweet_id: str, text: str, exists: Callable[[str], bool] | None = None) -> dict | None:
+        """
+        tweet_id가 아닌 트윗 중 가장 가까운 거의 같은 글 ({"tweet_id", "distance", "enrichment"}).
+
+        exists가 주어지면 False를 돌려주는 후보(원래 노트가 지워진 트윗)는 색인에서 빼고 다음 후보를 봅니다.
+        """
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return None
+        bands = _bands(fingerprint, self.bands)
+        where = " OR ".join("(b.band = ? AND b.value = ?)" for _ in bands)
+        params = [v for pair in enumerate(bands) for v in pair]
+        with self._lock:
+            self.lookups += 1
+            rows = self._db.execute(
+                "SELECT DISTINCT e.tweet_id, e.simhash, e.enrichment FROM bands b"
+                f" JOIN entries e ON e.tweet_id = b.tweet_id WHERE ({where}) AND e.tweet_id != ?",
+                (*params, str(tweet_id)),
+            ).fetchall()
+        candidates = sorted(
+            (bin(fingerprint ^ (other % (1 << _BITS))).count("1"), other_id, enrichment)
+            for other_id, other, enrichment in rows
+        )
+        for distance, other_id, enrichment in candidates:
+            if distance > self.max_distance:
+                break
+            if exists is not None and not exists(other_id):
+                self.remove(other_id)
+                continue
+            self.hits += 1
+            return {"tweet_id": other_id, "distance": distance, "enrichment": json.loads(enrichment)}
+        return None
+
+    def add(self, tweet_id: str, text: str, enrichment: dict):
+        """노트로 저장한 트윗의 지문과 분석 결과를 색인에 넣습니다 (짧은 글은 무시)."""
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return
+        tweet_id = str(tweet_id)
+        with self._lock:
+            self._db.execute("DELETE FROM bands WHERE tweet_id = ?", (tweet_id,))
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (tweet_id, simhash, enrichment, created_at) VALUES (?, ?, ?, ?)",
+                (tweet_id, _signed(fingerprint), json.dumps(enrichment, ensure_ascii=False), time.time()),
+            )
+            self._db.executemany(
+                "INSERT INTO bands (band, value, tweet_id) VALUES (?, ?, ?)",
+                [(band, value, tweet_id) for band, value in enumerate(_bands(fingerprint, self.bands))],
+            )
+            self._db.commit()
+
+    def remove(self, tweet_id: str):
+        """색인에서 뺍니다 (원래 노트가 지워진 경우)."""
+        with self._lock:
+            self._db.execute("DELETE FROM bands WHERE tweet_id = ?", (str(tweet_id),))
+            self._db.execute("DELETE FROM entries WHERE tweet_id = ?", (str(tweet_id),))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def summary(self) -> str:
+        return f"유사 글 색인: 조회 {self.lookups} / 재사용 {self.hits}"
+
+    def _rebuild_bands(self):
+        """max_distance가 바뀌어 구간 수가 달라졌으면 저장된 지문으로 구간 색인을 다시 만듭니다."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = 'bands'").fetchone()
+            if row is not None and int(row[0]) == self.bands:
+                return
+            self._db.execute("DELETE FROM bands")
+            rows = self._db.execute("SELECT tweet_id, simhash FROM entries").fetchall()
+            self._db.executemany(
+                "INSERT INTO bands (band, value, tweet_id) VALUES (?, ?, ?)",
+                [
+                    (band, value, tweet_id)
+                    for tweet_id, fingerprint in rows
+                    for band, value in enumerate(_bands(fingerprint % (1 << _BITS), self.bands))
+                ],
+            )
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('bands', ?)", (str(self.bands),))
+            self._db.commit()
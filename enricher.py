@@ -1,22 +1,42 @@
 """
 트윗을 분석해서 씨앗 노트용 메타데이터를 생성합니다.
-"""
 
-import re
-import httpx
-from config import OLLAMA_URL, OLLAMA_MODEL
+enrich_chunk_chars보다 긴 글(X Article, 긴 쓰레드)은 잘라 버리지 않고 map-reduce로 분석합니다.
+문단/쓰레드 경계에서 조각으로 나눠 조각마다 요약(map)한 뒤, 요약을 모아 평소와 같은 형식의
+분석(reduce)을 받습니다. 조각 요약은 조각 내용의 해시로 캐시하므로, 글이 일부만 바뀌면 바뀐
+조각만 다시 요약합니다.
 
-PROMPT_TEMPLATE = """당신은 텍스트 분석 전문가입니다. 아래 트윗을 깊이 있게 분석하세요.
+요청은 /api/chat으로 보내며, 매번 같은 분석 지침은 system 메시지, 트윗은 user 메시지로 나눕니다.
+요청의 앞부분이 늘 같으므로 Ollama가 직전 요청에서 평가해 둔 지침의 KV 캐시를 재사용하고
+트윗 부분만 새로 평가합니다. keep_alive로 실행 사이에도 모델을 메모리에 올려 둡니다.
 
-## 작성자
-@{author_handle}
+ollama_url에 주소를 여러 개 주면 AsyncEnricher는 ollama_pool.OllamaPool로 요청을 나눠 보냅니다.
 
-## 트윗 내용
-{text}
+model_routes를 설정하면 입력 길이(와 쓰레드 여부)로 모델을 고릅니다. 짧은 트윗은 작은 모델로,
+긴 Article/쓰레드는 큰 모델로 보내고, 작은 모델이 실패하면 기본 모델로 한 번 더 시도합니다.
+num_ctx는 경로마다 고정하고 (바뀌면 모델을 다시 올리므로) num_predict만 프롬프트 길이로 정합니다.
+"""
 
----
+import asyncio
+import hashlib
+import importlib.util
+import json
+import re
+import time
+import httpx
+import metrics
+from cache import EnrichmentCache, make_key
+from ollama_pool import OllamaPool
+from config import (
+    OLLAMA_URLS, OLLAMA_ENDPOINT_CONCURRENCY, OLLAMA_HEALTH_INTERVAL,
+    OLLAMA_MODEL, OLLAMA_STREAM, OLLAMA_THINK, OLLAMA_KEEP_ALIVE, THINK_TOKEN_BUDGET,
+    OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT, OLLAMA_MAX_CONNECTIONS,
+    ENRICH_BATCH_MAX_ITEMS, ENRICH_BATCH_TOKEN_BUDGET, ENRICH_BATCH_SHORT_CHARS,
+    ENRICH_CHUNK_CHARS, ENRICH_MAP_CONCURRENCY, MODEL_ROUTES, OLLAMA_NUM_CTX,
+    ENRICH_OUTPUT_FORMAT, RECORD_RESPONSES, RESPONSES_FILE, VERBOSITY,
+)
 
-## 분석 지침
+ANALYSIS_GUIDE = """## 분석 지침
 
 1. **TITLE**: 이 트윗이 핵심적으로 주장하는 명제를 간결한 한 문장으로 작성하세요.
    - 내용을 보고 대략적인 본문을 상상할 수 있도록 구체적으로 작성하세요.
@@ -37,9 +57,9 @@ PROMPT_TEMPLATE = """당신은 텍스트 분석 전문가입니다. 아래 트
 
 ---
 
-반드시 아래 형식으로만 답변하세요:
+"""
 
-TITLE: [핵심 명제 한 문장]
+ANSWER_FORMAT = """TITLE: [핵심 명제 한 문장]
 CLAIM: [함의된 주장 2-3문장]
 Q1: [씨앗 질문 1]
 Q2: [씨앗 질문 2]
@@ -47,86 +67,1210 @@ Q3: [씨앗 질문 3]
 LINKS: [개념1], [개념2], [개념3]
 TAGS: [태그1], [태그2]"""
 
+JSON_ANSWER_FORMAT = """{"title": "핵심 명제 한 문장", "claim": "함의된 주장 2-3문장", \
+"questions": ["씨앗 질문 1", "씨앗 질문 2", "씨앗 질문 3"], \
+"links": ["개념1", "개념2", "개념3"], "tags": ["태그1", "태그2"]}"""
+
+_JSON_FIELD_NAMES = "(TITLE→title, CLAIM→claim, Q1~Q3→questions, LINKS→links, TAGS→tags)"
+
+# 지침과 답변 형식은 system 메시지 — 모든 요청에서 글자 하나까지 같아야 KV 캐시가 재사용됨
+SYSTEM_PROMPT = """당신은 텍스트 분석 전문가입니다. 사용자가 보내는 트윗을 깊이 있게 분석하세요.
+
+""" + ANALYSIS_GUIDE + """반드시 아래 형식으로만 답변하세요:
+
+""" + ANSWER_FORMAT
+
+JSON_SYSTEM_PROMPT = """당신은 텍스트 분석 전문가입니다. 사용자가 보내는 트윗을 깊이 있게 분석하세요.
+
+""" + ANALYSIS_GUIDE + """반드시 아래 JSON 형식으로만 답변하세요 """ + _JSON_FIELD_NAMES + """:
+
+""" + JSON_ANSWER_FORMAT
+
+USER_TEMPLATE = """## 작성자
+@{author_handle}
+
+## 트윗 내용
+{text}"""
+
+# Ollama format 파라미터로 넘기는 JSON 스키마
+ENRICH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "claim": {"type": "string"},
+        "questions": {"type": "array", "items": {"type": "string"}, "minItems": 3, "maxItems": 3},
+        "links": {"type": "array", "items": {"type": "string"}},
+        "tags": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["title", "claim", "questions", "links", "tags"],
+}
+
+# 짧은 트윗 여러 개를 한 요청으로 분석할 때 사용 (지침은 한 번만 보냄)
+BATCH_SYSTEM_PROMPT = """당신은 텍스트 분석 전문가입니다. 사용자가 보내는 트윗 여러 개를 각각 따로 깊이 있게 분석하세요.
+
+""" + ANALYSIS_GUIDE + """트윗마다 번호 구분선을 쓰고, 순서대로 아래 형식으로만 답변하세요:
+
+=== ITEM 1 ===
+""" + ANSWER_FORMAT + """
+=== ITEM 2 ===
+...
+
+받은 트윗 모두에 대해 답변하세요."""
+
+BATCH_JSON_SYSTEM_PROMPT = """당신은 텍스트 분석 전문가입니다. 사용자가 보내는 트윗 여러 개를 각각 따로 깊이 있게 분석하세요.
+
+""" + ANALYSIS_GUIDE + """트윗 순서대로 items 배열에 하나씩 담아 아래 JSON 형식으로만 답변하세요 \
+""" + _JSON_FIELD_NAMES + """:
+
+{"items": [""" + JSON_ANSWER_FORMAT + """, ...]}
+
+받은 트윗 모두에 대해 답변하세요."""
+
+BATCH_USER_TEMPLATE = """아래 트윗 {count}개를 분석하세요.
+
+{items}"""
+
+BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {"items": {"type": "array", "items": ENRICH_SCHEMA}},
+    "required": ["items"],
+}
+
+BATCH_ITEM_TEMPLATE = """## 트윗 {index}
+작성자: @{author_handle}
+
+{text}"""
+
+# 긴 글의 조각 요약 (map 단계). 조각 위치는 넣지 않음 — 앞부분이 바뀌어도 같은 조각은 캐시 적중
+CHUNK_SYSTEM_PROMPT = """당신은 텍스트 분석 전문가입니다. 사용자가 보내는 글은 긴 글의 한 부분입니다.
+
+이 부분의 핵심 주장, 근거, 인상적인 사례를 한국어 5문장 이내로 요약하세요. 요약만 답변하세요."""
+
+CHUNK_USER_TEMPLATE = """작성자: @{author_handle}
+
+{text}"""
+
+# 종합(reduce) 단계에서 원문 대신 분석할 텍스트
+REDUCE_TEXT_TEMPLATE = """(긴 글이라 원문 대신 부분별 요약을 순서대로 싣습니다. 전체를 하나의 글로 보고 분석하세요.)
+
+{summaries}"""
+
+
+FIELDS = ("TITLE", "CLAIM", "Q1", "Q2", "Q3", "LINKS", "TAGS")
+
+
+_THINK_BLOCK = re.compile(r"<think>.*?</think>", re.DOTALL)
+
+# 필드별 (여러 줄 패턴, 한 줄 패턴) — 호출마다 컴파일하지 않도록 미리 준비
+_FIELD_PATTERNS = {
+    key: (
+        re.compile(rf"^{key}:\s*(.+?)(?=^(?:TITLE|CLAIM|Q[123]|LINKS|TAGS):|\Z)", re.MULTILINE | re.DOTALL | re.IGNORECASE),
+        re.compile(rf"^{key}:\s*(.+)", re.MULTILINE | re.IGNORECASE),
+    )
+    for key in FIELDS
+}
+_BRACKETS = re.compile(r"[\[\]]")
+_JSON_DECODER = json.JSONDecoder()
+
 
 def _parse(text: str) -> dict:
-    """LLM 응답을 파싱합니다."""
+    """줄 형식(TITLE: ...) LLM 응답을 파싱합니다."""
+    text = _THINK_BLOCK.sub("", text)
+
     def get(key: str) -> str:
         # 대소문자 구분 없이 매칭
-        pattern = rf"^{key}:\s*(.+?)(?=^(?:TITLE|CLAIM|Q[123]|LINKS|TAGS):|\Z)"
-        m = re.search(pattern, text, re.MULTILINE | re.DOTALL | re.IGNORECASE)
+        multiline, single = _FIELD_PATTERNS[key]
+        m = multiline.search(text)
         if m:
             return m.group(1).strip()
         # 단순 패턴으로 재시도
-        m = re.search(rf"^{key}:\s*(.+)", text, re.MULTILINE | re.IGNORECASE)
+        m = single.search(text)
         return m.group(1).strip() if m else ""
 
-    links_raw = get("LINKS")
+    return _build_result({key: get(key) for key in FIELDS})
+
+
+def _split_list(raw: str) -> list[str]:
     # 대괄호 제거하고 콤마로 분리
-    links_raw = re.sub(r'[\[\]]', '', links_raw)
-    links = [x.strip() for x in links_raw.split(",") if x.strip()]
+    raw = _BRACKETS.sub("", raw)
+    return [x.strip() for x in raw.split(",") if x.strip()]
+
+
+def _build_result(values: dict) -> dict:
+    """필드별 원문 값으로 enrichment dict를 만듭니다."""
+    return {
+        "title":          values.get("TITLE", ""),
+        "core_claim":     values.get("CLAIM", ""),
+        "seed_questions": [values.get("Q1", ""), values.get("Q2", ""), values.get("Q3", "")],
+        "wiki_links":     _split_list(values.get("LINKS", "")),
+        "tags":           _split_list(values.get("TAGS", "")),
+    }
+
+
+def _decode_json(text: str):
+    """응답에서 첫 JSON 값을 한 번에 디코딩합니다. 없거나 깨졌으면 None."""
+    text = _THINK_BLOCK.sub("", text)
+    start = text.find("{")
+    if start < 0:
+        return None
+    try:
+        value, _ = _JSON_DECODER.raw_decode(text, start)
+    except ValueError:
+        return None
+    return value
+
+
+def _result_from_json(obj) -> dict | None:
+    """JSON 모드 응답 객체를 enrichment dict로 바꿉니다. 형식이 맞지 않으면 None."""
+    if not isinstance(obj, dict):
+        return None
 
-    tags_raw = get("TAGS")
-    tags_raw = re.sub(r'[\[\]]', '', tags_raw)
-    tags = [x.strip() for x in tags_raw.split(",") if x.strip()]
+    def as_list(value) -> list[str]:
+        if isinstance(value, list):
+            return [str(x).strip() for x in value if str(x).strip()]
+        return _split_list(str(value or ""))
 
+    questions = (as_list(obj.get("questions")) + ["", "", ""])[:3]
     return {
-        "title":          get("TITLE"),
-        "core_claim":     get("CLAIM"),
-        "seed_questions": [get("Q1"), get("Q2"), get("Q3")],
-        "wiki_links":     links,
-        "tags":           tags,
+        "title":          str(obj.get("title") or "").strip(),
+        "core_claim":     str(obj.get("claim") or "").strip(),
+        "seed_questions": questions,
+        "wiki_links":     as_list(obj.get("links")),
+        "tags":           as_list(obj.get("tags")),
     }
 
 
-def _truncate_text(text: str, max_chars: int = 6000) -> str:
+def _parse_response(text: str) -> dict:
+    """
+    설정된 출력 형식에 맞춰 파싱합니다.
+    JSON 모드에서 디코딩에 실패하면 같은 응답을 줄 형식으로 한 번 더 파싱합니다.
+    """
+    if ENRICH_OUTPUT_FORMAT == "json":
+        result = _result_from_json(_decode_json(text))
+        if result is not None and result["title"]:
+            return result
+        print("  JSON 파싱 실패 — 줄 형식으로 재시도")
+    return _parse(text)
+
+
+_FIELD_LINE = re.compile(rf"^({'|'.join(FIELDS)}):\s*(.*)$", re.IGNORECASE)
+
+
+class _StreamParser:
+    """
+    스트리밍 응답을 줄 단위로 받아 필드를 채워 나갑니다.
+
+    TAGS 줄이 끝나면(개행 도착) done이 True가 되어 나머지 생성을 기다릴 필요가 없습니다.
+    응답 본문에 섞여 나오는 <think>...</think> 블록은 건너뜁니다.
+
+    추론 토큰 수(thinking_tokens)는 feed_chunk 한 곳에서만 셉니다. Ollama는 스트림 청크 하나에
+    토큰 하나를 보내므로, thinking 필드가 있거나 본문의 <think> 블록에 걸친 청크마다 1을 더합니다.
+    """
+
+    def __init__(self):
+        self.values: dict[str, list[str]] = {}
+        self.done = False
+        self.thinking_tokens = 0
+        self.chunks = 0
+        self.first_token_at: float | None = None
+        self.stats: dict = {}  # 마지막(done) 청크의 토큰 수/소요 시간
+        self._raw: list[str] = []
+        self._current: str | None = None
+        self._partial = ""
+        self._in_think = False
+        self._think_open = False  # 추론 토큰 계산용 — 본문의 <think> 블록 안인지
+        self._think_tail = ""  # 청크 경계에 걸친 태그를 찾기 위해 남겨 둔 앞 청크의 끝
+
+    def feed(self, chunk: str):
+        lines = (self._partial + chunk).split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            if self.done:
+                return
+            self._feed_line(line)
+            if self._current == "TAGS" and self.values.get("TAGS", [""])[0]:
+                self.done = True
+
+    def feed_chunk(self, chunk: dict) -> bool:
+        """
+        Ollama 스트림 청크(JSON 한 줄) 하나를 반영합니다. 더 읽을 필요가 없으면 True.
+
+        Raises:
+            _ThinkingBudgetExceeded: 추론 토큰이 THINK_TOKEN_BUDGET을 넘은 경우
+        """
+        if chunk.get("error"):
+            raise RuntimeError(chunk["error"])
+        self.chunks += 1
+        message = chunk.get("message") or {}
+        text = message.get("content", "")
+        if self.first_token_at is None and (message.get("thinking") or text):
+            self.first_token_at = time.perf_counter()
+        if chunk.get("done"):
+            self.stats = chunk
+        if message.get("thinking") or self._inline_thinking(text):
+            self.thinking_tokens += 1
+        self._raw.append(text)
+        self.feed(text)
+        if THINK_TOKEN_BUDGET and self.thinking_tokens > THINK_TOKEN_BUDGET:
+            raise _ThinkingBudgetExceeded()
+        if self.done:
+            _log("  답변 완료 — 스트림 조기 종료")
+            return True
+        return bool(chunk.get("done"))
+
+    @property
+    def raw(self) -> str:
+        """지금까지 받은 응답 원문."""
+        return "".join(self._raw)
+
+    def _inline_thinking(self, text: str) -> bool:
+        """본문 청크가 <think> 블록에 걸쳐 있는지 (블록을 여는·닫는 청크 포함)."""
+        if not text:
+            return False
+        was_open = self._think_open
+        tail = self._think_tail + text
+        opened, closed = tail.rfind("<think>"), tail.rfind("</think>")
+        if opened > closed:
+            self._think_open = True
+        elif closed >= 0:
+            self._think_open = False
+        # 앞 청크에서 이미 본 태그가 아니라 이 청크에서 끝나는 태그로 블록이 열렸는지
+        opened_here = opened >= 0 and opened + len("<think>") > len(self._think_tail)
+        self._think_tail = tail[-len("</think>"):]
+        return was_open or self._think_open or opened_here
+
+    def finish(self) -> dict:
+        """남은 부분 줄까지 반영해 결과를 반환합니다."""
+        if self._partial and not self.done:
+            self._feed_line(self._partial)
+            self._partial = ""
+        return _build_result({k: "\n".join(v).strip() for k, v in self.values.items()})
+
+    def _feed_line(self, line: str):
+        if "<think>" in line:
+            self._in_think = True
+            line = line.split("<think>", 1)[1]
+        if self._in_think:
+            if "</think>" not in line:
+                return
+            self._in_think = False
+            line = line.split("</think>", 1)[1]
+
+        m = _FIELD_LINE.match(line.strip())
+        if m:
+            key = m.group(1).upper()
+            # 같은 필드가 다시 나오면 첫 값 유지 (정규식 파서와 동일)
+            self._current = key if key not in self.values else None
+            if self._current:
+                self.values[key] = [m.group(2)]
+        elif self._current:
+            self.values[self._current].append(line)
+
+
+class _JsonStreamParser(_StreamParser):
+    """
+    JSON 모드 스트림 파서. 최상위 객체의 닫는 중괄호가 오면 done이 됩니다.
+
+    문자열 안의 중괄호와 이스케이프를 구분하며, 받은 만큼만 이어서 훑으므로 전체 비용은
+    응답 길이에 비례합니다. <think> 블록이 끝나기 전의 중괄호는 무시합니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._text = ""
+        self._scan = -1  # JSON 시작 전이면 -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str):
+        if self.done:
+            return
+        self._text += chunk
+        if self._scan < 0:
+            think_end = self._text.rfind("</think>")
+            if think_end < 0 and "<think>" in self._text:
+                return
+            start = self._text.find("{", think_end + len("</think>") if think_end >= 0 else 0)
+            if start < 0:
+                return
+            self._scan = start
+
+        text = self._text
+        for i in range(self._scan, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+                    break
+        self._scan = len(text)
+
+    def finish(self) -> dict:
+        return _parse_response(self._text)
+
+
+class _ThinkingBudgetExceeded(Exception):
+    pass
+
+
+_ITEM_MARKER = re.compile(r"^\s*=+\s*ITEM\s+(\d+)\s*=+\s*$", re.MULTILINE | re.IGNORECASE)
+
+# 배치 크기 계산용: 항목당 답변 토큰 예상치, 지침·형식 안내 토큰 예상치
+_ANSWER_TOKENS = 300
+_BATCH_OVERHEAD_TOKENS = 600
+
+# num_predict 계산용: 답변 토큰 상한 (예상치의 두 배 여유), 추론 예산이 무제한일 때의 상한
+_ENRICH_ANSWER_TOKENS = 2 * _ANSWER_TOKENS
+_SUMMARY_ANSWER_TOKENS = 500
+_MAX_PREDICT_TOKENS = 8000
+
+
+def _parse_batch(text: str, count: int) -> list[dict | None]:
+    """배치 응답을 === ITEM n === 구분선으로 나눠 항목별로 파싱합니다. 실패한 항목은 None."""
+    text = _THINK_BLOCK.sub("", text)
+    results: list[dict | None] = [None] * count
+    markers = list(_ITEM_MARKER.finditer(text))
+    for i, m in enumerate(markers):
+        index = int(m.group(1)) - 1
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        if 0 <= index < count and results[index] is None:
+            parsed = _parse(text[m.end():end])
+            if parsed["title"]:
+                results[index] = parsed
+    return results
+
+
+def _parse_batch_response(text: str, count: int) -> list[dict | None]:
+    """출력 형식에 맞춰 배치 응답을 파싱합니다. JSON이 깨졌으면 구분선 형식으로 재시도."""
+    if ENRICH_OUTPUT_FORMAT == "json":
+        obj = _decode_json(text)
+        items = obj.get("items") if isinstance(obj, dict) else None
+        if isinstance(items, list):
+            results = [_result_from_json(item) for item in items[:count]]
+            results += [None] * (count - len(results))
+            return [r if r is not None and r["title"] else None for r in results]
+        print("  배치 JSON 파싱 실패 — 구분선 형식으로 재시도")
+    return _parse_batch(text, count)
+
+
+def _estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (한글 1자 ≈ 1토큰, 영문 3~4자 ≈ 1토큰)."""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def plan_batches(texts: list[str], token_budget: int, max_items: int, short_chars: int) -> list[list[int]]:
+    """
+    텍스트 목록을 요청 단위로 묶어 인덱스 그룹을 반환합니다.
+
+    short_chars보다 긴 텍스트는 혼자 보내고, 짧은 것들은 (입력 + 예상 답변) 토큰 합이
+    token_budget을 넘지 않는 선에서 최대 max_items개까지 묶습니다.
+    """
+    groups: list[list[int]] = []
+    current: list[int] = []
+    used = _BATCH_OVERHEAD_TOKENS
+    for i, text in enumerate(texts):
+        if len(text) > short_chars or max_items <= 1:
+            groups.append([i])
+            continue
+        cost = _estimate_tokens(text) + _ANSWER_TOKENS
+        if current and (used + cost > token_budget or len(current) >= max_items):
+            groups.append(current)
+            current, used = [], _BATCH_OVERHEAD_TOKENS
+        current.append(i)
+        used += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+_THREAD_SEPARATOR = "\n\n---\n\n"  # fetcher가 쓰레드 트윗 사이에 넣는 구분선
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n")
+_MAX_REDUCE_LEVELS = 3  # 요약을 모아도 너무 길면 요약을 다시 요약하는 최대 단계 수
+_CUT_EVERY = 4  # 조각 경계로 삼을 문단 비율 (평균 몇 문단마다)
+
+
+def split_text(text: str, max_chars: int) -> list[str]:
+    """
+    긴 텍스트를 max_chars 이하 조각으로 나눕니다.
+
+    쓰레드 구분선과 문단 경계에서만 자르고, 이웃한 문단은 한 조각으로 모읍니다. 조각이 max_chars의
+    1/4을 넘은 뒤에는 문단 내용의 해시로 정한 문단에서 끊으므로, 앞쪽 문단을 고쳐도 뒤쪽 조각
+    경계가 그대로 유지되어 조각 요약 캐시를 다시 쓸 수 있습니다. 문단 하나가 max_chars보다 길면
+    문장/줄 경계, 그것도 없으면 글자 수로 자릅니다.
+    """
+    units: list[tuple[str, str]] = []  # (앞 구분자, 문단)
+    for t, part in enumerate(text.split(_THREAD_SEPARATOR)):
+        for p, para in enumerate(_PARAGRAPH_BREAK.split(part)):
+            para = para.strip()
+            if not para:
+                continue
+            sep = _THREAD_SEPARATOR if t and not p else "\n\n"
+            units.extend((sep if i == 0 else "\n", piece) for i, piece in enumerate(_split_long(para, max_chars)))
+
+    chunks: list[str] = []
+    current = ""
+    for sep, unit in units:
+        if current and len(current) + len(sep) + len(unit) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = current + sep + unit if current else unit
+        if len(current) >= max_chars // 4 and _is_cut(unit):
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_long(para: str, max_chars: int) -> list[str]:
+    """max_chars보다 긴 문단을 문장/줄 경계에서 나눕니다."""
+    if len(para) <= max_chars:
+        return [para]
+    pieces: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_END.split(para):
+        while len(sentence) > max_chars:  # 경계 없는 긴 문장
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def _is_cut(unit: str) -> bool:
+    digest = hashlib.blake2b(unit.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "big") % _CUT_EVERY == 0
+
+
+def _chunk_payload(chunk: str, author_handle: str) -> tuple[dict, str]:
+    """조각 요약 요청 본문과 캐시 키 (조각 내용·모델·옵션이 같으면 같은 키)."""
+    payload = _chat_payload(
+        CHUNK_SYSTEM_PROMPT,
+        CHUNK_USER_TEMPLATE.format(author_handle=author_handle, text=chunk),
+        stream=False,
+        route=_route_for(chunk),
+        answer_tokens=_SUMMARY_ANSWER_TOKENS,
+    )
+    key = make_key(
+        "chunk", payload["model"], CHUNK_SYSTEM_PROMPT, CHUNK_USER_TEMPLATE, chunk, author_handle,
+        payload["options"], payload.get("think"),
+    )
+    return payload, key
+
+
+def _summary_from(json_response: dict) -> str:
+    return _THINK_BLOCK.sub("", _response_text(json_response)).strip()
+
+
+def _reduce_text(summaries: list[str]) -> str:
+    total = len(summaries)
+    return "\n\n".join(f"[{i}/{total}] {s}" for i, s in enumerate(summaries, 1))
+
+
+def _report_map(text: str, summaries: list[tuple[str, bool, bool]]):
+    cached = sum(hit for _, hit, _ in summaries)
+    failed = sum(not ok for _, _, ok in summaries)
+    print(
+        f"  긴 글 {len(text)}자 → {len(summaries)}개 조각 요약"
+        + (f" (캐시 {cached}개)" if cached else "")
+        + (f" (실패 {failed}개 — 결과를 캐시하지 않음)" if failed else "")
+    )
+    metrics.record("enrich_map", chars=len(text), chunks=len(summaries), cached=cached, failed=failed)
+
+
+def _truncate_text(text: str, max_chars: int = ENRICH_CHUNK_CHARS) -> str:
     """텍스트가 너무 길면 자릅니다."""
     if len(text) <= max_chars:
         return text
     return text[:max_chars] + "\n\n[... 내용이 길어 일부만 표시 ...]"
 
 
-def enrich_tweet(tweet_text: str, author_handle: str, author_name: str) -> dict:
-    """트윗을 분석해서 씨앗 노트용 메타데이터를 생성합니다."""
+def _build_payload(tweet_text: str, author_handle: str, route: dict | None = None) -> dict:
+    """/api/chat 요청 본문을 만듭니다. route가 없으면 입력으로 모델 경로를 고릅니다."""
     # 텍스트가 너무 길면 자르기
     truncated_text = _truncate_text(tweet_text)
 
-    prompt = PROMPT_TEMPLATE.format(
+    user = USER_TEMPLATE.format(
         author_handle=author_handle,
         text=truncated_text,
     )
+    return _chat_payload(
+        _system_prompt(), user, stream=OLLAMA_STREAM, schema=ENRICH_SCHEMA,
+        route=route or _route_for(tweet_text),
+    )
 
-    try:
-        response = httpx.post(
-            f"{OLLAMA_URL}/api/generate",
-            json={
-                "model": OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,
-                    "num_predict": 8000,  # thinking 모델은 더 많은 토큰 필요
-                }
-            },
-            timeout=300.0,
+
+_DEFAULT_ROUTE = {"name": "default", "model": OLLAMA_MODEL}
+
+
+def _route_for(text: str) -> dict:
+    """
+    model_routes에서 text에 맞는 첫 경로를 고릅니다. 맞는 경로가 없으면 기본 모델.
+
+    경로 조건: max_chars(이 길이 이하만), threads(false면 쓰레드 구분선이 있는 글 제외).
+    """
+    for route in MODEL_ROUTES:
+        if route.get("max_chars") is not None and len(text) > route["max_chars"]:
+            continue
+        if not route.get("threads", True) and _THREAD_SEPARATOR in text:
+            continue
+        return route
+    return _DEFAULT_ROUTE
+
+
+def _route_name(route: dict) -> str:
+    return route.get("name") or route.get("model") or OLLAMA_MODEL
+
+
+def _fallback_model(route: dict) -> str | None:
+    """경로 모델이 실패했을 때 다시 시도할 모델 (기본: ollama_model, 같으면 없음)."""
+    fallback = route.get("fallback", OLLAMA_MODEL)
+    return fallback if fallback and fallback != route.get("model", OLLAMA_MODEL) else None
+
+
+def _fallback_payload(payload: dict, model: str) -> dict:
+    """대체 모델 요청 본문. 경로별 think/num_predict 덮어쓰기 없이 기본 설정으로 보냅니다."""
+    prompt = "".join(m["content"] for m in payload["messages"])
+    fallback = {
+        **payload,
+        "model": model,
+        "options": _options(_estimate_tokens(prompt), _ENRICH_ANSWER_TOKENS, OLLAMA_THINK, _DEFAULT_ROUTE),
+    }
+    fallback.pop("think", None)
+    if OLLAMA_THINK is not None:
+        fallback["think"] = OLLAMA_THINK
+    return fallback
+
+
+def _options(prompt_tokens: int, answer_tokens: int, think, route: dict) -> dict:
+    """
+    요청 옵션. 요청마다 달라지는 것은 num_predict뿐입니다.
+
+    num_ctx는 경로(모델)마다 고정입니다 — Ollama는 num_ctx가 바뀌면 모델을 다시 올리므로,
+    길이에 따라 바꾸면 keep_alive와 지침 프롬프트 앞부분의 KV 캐시 재사용이 매번 깨집니다.
+    num_predict는 답변 예상치에 추론 예산(think_token_budget, 추론을 끄면 0)을 더한 값으로,
+    프롬프트와 함께 num_ctx 안에 들어가도록 줄입니다 (답변 예상치보다 작게는 줄이지 않음).
+    """
+    num_ctx = route.get("num_ctx", route.get("max_ctx", OLLAMA_NUM_CTX))
+    if "num_predict" in route:
+        num_predict = route["num_predict"]
+    elif think is False:
+        num_predict = answer_tokens
+    else:
+        num_predict = min(answer_tokens + (THINK_TOKEN_BUDGET or _MAX_PREDICT_TOKENS), _MAX_PREDICT_TOKENS)
+        num_predict = max(min(num_predict, num_ctx - prompt_tokens), answer_tokens)
+    return {
+        "temperature": 0.3,
+        "num_predict": num_predict,
+        "num_ctx": num_ctx,
+    }
+
+
+def _system_prompt() -> str:
+    return JSON_SYSTEM_PROMPT if ENRICH_OUTPUT_FORMAT == "json" else SYSTEM_PROMPT
+
+
+def _batch_system_prompt() -> str:
+    return BATCH_JSON_SYSTEM_PROMPT if ENRICH_OUTPUT_FORMAT == "json" else BATCH_SYSTEM_PROMPT
+
+
+def _chat_payload(
+    system: str, user: str, stream: bool, schema: dict | None = None,
+    route: dict = _DEFAULT_ROUTE, answer_tokens: int = _ENRICH_ANSWER_TOKENS,
+) -> dict:
+    think = route.get("think", OLLAMA_THINK)
+    payload = {
+        "model": route.get("model", OLLAMA_MODEL),
+        # 고정된 system이 앞, 요청마다 다른 user가 뒤 — 앞부분 평가 결과를 Ollama가 재사용
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        "stream": stream,
+        "options": _options(_estimate_tokens(system + user), answer_tokens, think, route),
+    }
+    if OLLAMA_KEEP_ALIVE is not None:
+        payload["keep_alive"] = OLLAMA_KEEP_ALIVE
+    if ENRICH_OUTPUT_FORMAT == "json" and schema is not None:
+        payload["format"] = schema
+    if think is not None:
+        payload["think"] = think
+    return payload
+
+
+def _response_text(json_response: dict) -> str:
+    """/api/chat 응답(또는 스트림 청크)의 답변 텍스트."""
+    return (json_response.get("message") or {}).get("content", "")
+
+
+def _new_stream_parser() -> _StreamParser:
+    return _JsonStreamParser() if ENRICH_OUTPUT_FORMAT == "json" else _StreamParser()
+
+
+def _record_response(raw: str, model: str):
+    """record_responses 설정 시 응답 원문을 파싱 벤치마크용 말뭉치로 남깁니다 (model은 실제로 답한 모델)."""
+    if not RECORD_RESPONSES:
+        return
+    line = json.dumps({"format": ENRICH_OUTPUT_FORMAT, "model": model, "response": raw}, ensure_ascii=False)
+    with open(RESPONSES_FILE, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def _finish(result: dict, tweet_text: str) -> dict:
+    """파싱 결과를 검증하고, TITLE이 없으면 폴백을 반환합니다."""
+    if result["title"]:
+        _log(f"  파싱 성공: TITLE='{result['title']}'")
+        return result
+
+    print("  파싱 실패 — TITLE 없음, 폴백 사용")
+    return _fallback_enrichment(tweet_text)
+
+
+def _parse_full_response(json_response: dict) -> dict:
+    """stream=False 응답 JSON을 파싱합니다."""
+    _log(f"  API 응답 JSON: {json_response}", level=2)
+
+    raw = _response_text(json_response)
+    _log(f"  모델 응답 (전체):\n{raw}\n{'─'*40}", level=2)
+
+    _record_response(raw, json_response.get("model", OLLAMA_MODEL))
+    return _parse_response(raw)
+
+
+def _log(message: str, level: int = 1):
+    """verbosity 설정이 level 이상일 때만 출력합니다."""
+    if VERBOSITY >= level:
+        print(message)
+
+
+def _report_llm(started: float, stats: dict, parser: _StreamParser | None = None, items: int = 1):
+    """
+    Ollama 요청 한 번의 토큰 수·소요 시간을 측정값으로 남기고 한 줄로 출력합니다.
+
+    stats는 Ollama 응답의 prompt_eval_count/eval_count/*_duration(나노초) 필드입니다.
+    스트림을 조기 종료해 마지막 통계 청크를 못 받은 경우, 생성 토큰 수는 받은 청크 수로 어림합니다
+    (Ollama는 토큰 하나당 청크 하나를 보냄).
+    """
+    fields = {"seconds": time.perf_counter() - started, "items": items}
+    if parser is not None and parser.first_token_at is not None:
+        fields["ttft"] = parser.first_token_at - started
+    if parser is not None and parser.thinking_tokens:
+        fields["thinking_tokens"] = parser.thinking_tokens
+    if "eval_count" in stats:
+        fields["prompt_eval_count"] = stats.get("prompt_eval_count", 0)
+        fields["prompt_eval_seconds"] = stats.get("prompt_eval_duration", 0) / 1e9
+        fields["eval_count"] = stats["eval_count"]
+        fields["eval_seconds"] = stats.get("eval_duration", 0) / 1e9
+        fields["load_seconds"] = stats.get("load_duration", 0) / 1e9
+    elif parser is not None and parser.chunks:
+        fields["eval_count"] = parser.chunks
+        fields["eval_seconds"] = fields["seconds"] - fields.get("ttft", 0.0)
+        fields["estimated"] = True
+    if fields.get("prompt_eval_seconds"):
+        fields["prompt_tokens_per_sec"] = fields["prompt_eval_count"] / fields["prompt_eval_seconds"]
+    if fields.get("eval_seconds"):
+        fields["tokens_per_sec"] = fields["eval_count"] / fields["eval_seconds"]
+    metrics.record("llm", **fields)
+
+    if "tokens_per_sec" in fields:
+        prompt = (
+            f"프롬프트 {fields['prompt_eval_count']}토큰 {fields['prompt_eval_seconds']:.2f}s, "
+            if "prompt_eval_count" in fields else ""
+        )
+        _log(
+            f"  LLM {fields['seconds']:.1f}s — {prompt}생성 {fields['eval_count']}토큰 "
+            f"({fields['tokens_per_sec']:.1f} tok/s{', 추정' if fields.get('estimated') else ''})"
         )
-        response.raise_for_status()
-        json_response = response.json()
-        print(f"  API 응답 JSON: {json_response}")
 
-        raw = json_response.get("response", "")
-        print(f"  모델 응답 (전체):\n{raw}\n{'─'*40}")
 
-        result = _parse(raw)
-        if result["title"]:
-            print(f"  파싱 성공: TITLE='{result['title']}'")
-            return result
+def _client_options() -> dict:
+    """동기/비동기 클라이언트가 공유하는 연결 풀·타임아웃 설정 (엔드포인트마다 적용)."""
+    return {
+        "timeout": httpx.Timeout(OLLAMA_READ_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=OLLAMA_MAX_CONNECTIONS,
+            max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+            keepalive_expiry=60.0,
+        ),
+        # HTTP/2는 h2 패키지가 있고 https 엔드포인트일 때만 실제로 사용됨
+        "http2": importlib.util.find_spec("h2") is not None,
+    }
+
+
+def _cache_key(tweet_text: str, author_handle: str, payload: dict) -> str:
+    """모델·프롬프트 템플릿·입력 전체·옵션이 같으면 같은 키."""
+    return make_key(
+        payload["model"],
+        _system_prompt(),
+        USER_TEMPLATE,
+        tweet_text,
+        author_handle,
+        payload["options"],
+        payload.get("think"),
+        payload.get("format"),
+    )
+
+
+def _batch_cache_key(tweet_text: str, author_handle: str, payload: dict) -> str:
+    """
+    배치 요청으로 얻은 결과의 키. 배치 프롬프트 템플릿이 들어가므로 단건 키와 겹치지 않습니다.
+
+    배치의 num_predict는 항목 수에 따라 달라지므로 옵션 대신 모델·추론 설정만 넣습니다.
+    """
+    return make_key(
+        "batch",
+        payload["model"],
+        _batch_system_prompt(),
+        BATCH_USER_TEMPLATE,
+        BATCH_ITEM_TEMPLATE,
+        tweet_text,
+        author_handle,
+        payload.get("think"),
+        payload.get("format"),
+    )
+
+
+class _EnricherBase:
+    """동기/비동기 클라이언트 공통: 분석 캐시 조회·저장, 모델 경로 통계."""
+
+    def __init__(self, cache: EnrichmentCache | None = None):
+        self.cache = cache
+        self.routes: dict[str, dict] = {}  # 경로 이름 → 분석 수·지연·대체 모델 사용 수
+
+    def route_summary(self) -> str:
+        parts = []
+        for name, r in self.routes.items():
+            seconds = sorted(r["seconds"])
+            p50 = seconds[len(seconds) // 2] if seconds else 0.0
+            part = f"{name} {r['count']}건 p50 {p50:.1f}s"
+            if r["fallbacks"]:
+                part += f" (대체 모델 {r['fallbacks']}건)"
+            if r["failures"]:
+                part += f" (실패 {r['failures']}건)"
+            parts.append(part)
+        return "모델 경로: " + ", ".join(parts)
+
+    def _lookup(self, tweet_text: str, author_handle: str, payload: dict) -> tuple[str | None, dict | None]:
+        if self.cache is None:
+            return None, None
+        key = _cache_key(tweet_text, author_handle, payload)
+        # 같은 모델로 배치 요청에서 얻은 결과도 재사용 (저장은 단건 키로 하지 않음)
+        cached = self.cache.get_any([key, _batch_cache_key(tweet_text, author_handle, payload)])
+        if cached is not None:
+            print(f"  캐시 적중: TITLE='{cached['title']}'")
+        return key, cached
+
+    def _remember(self, key: str | None, result: dict):
+        # 폴백 결과는 저장하지 않음 (다음 실행에서 다시 시도)
+        if key is not None and result["title"]:
+            self.cache.put(key, result)
+
+    def _cached_summary(self, key: str) -> str | None:
+        cached = self.cache.get(key) if self.cache is not None else None
+        return cached["summary"] if cached is not None else None
+
+    def _remember_summary(self, key: str, summary: str):
+        if self.cache is not None and summary:
+            self.cache.put(key, {"summary": summary})
+
+    def _checked(self, result: dict) -> dict | None:
+        """TITLE을 얻은 결과만 통과시킵니다 (없으면 대체 모델로 다시 시도할 수 있게 None)."""
+        if not result["title"]:
+            print("  파싱 실패 — TITLE 없음")
+            return None
+        return result
+
+    def _settle(
+        self, tweet_text: str, key: str | None, route: dict, model: str,
+        started: float, fallback: bool, result: dict | None,
+    ) -> dict:
+        """경로 통계를 남기고 결과를 캐시합니다. 대체 모델까지 실패했으면 기본값."""
+        self._record_route(route, model, time.perf_counter() - started, fallback, result is not None)
+        if result is None:
+            return _fallback_enrichment(tweet_text)
+        self._remember(key, result)
+        return _finish(result, tweet_text)
+
+    def _record_route(self, route: dict, model: str, seconds: float, fallback: bool, ok: bool):
+        name = _route_name(route)
+        stats = self.routes.setdefault(name, {"count": 0, "fallbacks": 0, "failures": 0, "seconds": []})
+        stats["count"] += 1
+        stats["fallbacks"] += fallback
+        stats["failures"] += not ok
+        stats["seconds"].append(seconds)
+        metrics.record("llm_route", route=name, model=model, seconds=seconds, fallback=fallback, ok=ok)
+
+
+class Enricher(_EnricherBase):
+    """
+    연결을 재사용하는 동기 Ollama 클라이언트. 엔드포인트가 여러 개여도 첫 번째만 씁니다.
+
+    사용 예:
+        with Enricher() as enricher:
+            enrichment = enricher.enrich(text, handle, name)
+    """
+
+    def __init__(self, cache: EnrichmentCache | None = None):
+        super().__init__(cache)
+        self._client = httpx.Client(base_url=OLLAMA_URLS[0], **_client_options())
+
+    def __enter__(self) -> "Enricher":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if MODEL_ROUTES and self.routes:
+            print(f"  {self.route_summary()}")
+        self._client.close()
+
+    def enrich(self, tweet_text: str, author_handle: str, author_name: str) -> dict:
+        """트윗을 분석해서 씨앗 노트용 메타데이터를 생성합니다."""
+        payload = _build_payload(tweet_text, author_handle)
+        key, cached = self._lookup(tweet_text, author_handle, payload)
+        if cached is not None:
+            return cached
+        route = _route_for(tweet_text)
+        if len(tweet_text) > ENRICH_CHUNK_CHARS:
+            reduced, complete = self._reduce(tweet_text, author_handle)
+            payload = _build_payload(reduced, author_handle, route)
+            if not complete:
+                key = None  # 조각 요약이 실패한 결과는 캐시하지 않음 (다음 실행에서 다시)
+        return self._enrich_uncached(tweet_text, payload, key, route)
+
+    def _enrich_uncached(self, tweet_text: str, payload: dict, key: str | None, route: dict) -> dict:
+        """경로 모델로 분석하고, 실패하면 대체 모델로 한 번 더 시도합니다."""
+        started = time.perf_counter()
+        result = self._attempt(payload)
+        fallback = _fallback_model(route)
+        used_fallback = result is None and fallback is not None
+        if used_fallback:
+            print(f"  ↳ {payload['model']} 분석 실패 — {fallback}로 재시도")
+            result = self._attempt(_fallback_payload(payload, fallback))
+        return self._settle(tweet_text, key, route, payload["model"], started, used_fallback, result)
+
+    def _attempt(self, payload: dict) -> dict | None:
+        """요청 한 번. 오류가 나거나 TITLE을 못 얻으면 None."""
+        try:
+            result = self._request(payload)
+        except Exception as e:
+            print(f"  Ollama 오류: {e}")
+            return None
+        return self._checked(result)
+
+    def _reduce(self, tweet_text: str, author_handle: str) -> tuple[str, bool]:
+        """
+        긴 글을 조각별로 요약해 종합 단계에 넣을 텍스트를 만듭니다 (조각은 차례로 요청).
+        두 번째 값은 모든 조각 요약이 성공했는지.
+        """
+        text = tweet_text
+        complete = True
+        for _ in range(_MAX_REDUCE_LEVELS):
+            chunks = split_text(text, ENRICH_CHUNK_CHARS)
+            summaries = [self._summarize(chunk, author_handle) for chunk in chunks]
+            _report_map(text, summaries)
+            complete = complete and all(ok for _, _, ok in summaries)
+            text = _reduce_text([summary for summary, _, _ in summaries])
+            if len(text) <= ENRICH_CHUNK_CHARS:
+                break
+        return REDUCE_TEXT_TEMPLATE.format(summaries=text), complete
+
+    def _summarize(self, chunk: str, author_handle: str) -> tuple[str, bool, bool]:
+        """조각 하나의 요약, 캐시 적중 여부, 요약 성공 여부."""
+        payload, key = _chunk_payload(chunk, author_handle)
+        summary = self._cached_summary(key)
+        if summary is not None:
+            return summary, True, True
+        try:
+            started = time.perf_counter()
+            response = self._client.post("/api/chat", json=payload)
+            response.raise_for_status()
+            json_response = response.json()
+            _report_llm(started, json_response)
+            summary = _summary_from(json_response)
+        except Exception as e:
+            print(f"  조각 요약 오류: {e}")
+            summary = ""
+        self._remember_summary(key, summary)
+        # 요약에 실패한 조각은 앞부분을 그대로 넣음
+        return summary or _truncate_text(chunk, 500), False, bool(summary)
+
+    def _request(self, payload: dict) -> dict:
+        if not OLLAMA_STREAM:
+            started = time.perf_counter()
+            response = self._client.post("/api/chat", json=payload)
+            response.raise_for_status()
+            json_response = response.json()
+            _report_llm(started, json_response)
+            return _parse_full_response(json_response)
+
+        try:
+            return self._stream(payload)
+        except _ThinkingBudgetExceeded:
+            print(f"  추론 토큰 {THINK_TOKEN_BUDGET}개 초과 — thinking 없이 재요청")
+            return self._stream({**payload, "think": False})
+
+    def _stream(self, payload: dict) -> dict:
+        """스트림을 읽으며 파싱하고, TAGS까지 채워지면 바로 연결을 끊습니다."""
+        parser = _new_stream_parser()
+        started = time.perf_counter()
+        with self._client.stream("POST", "/api/chat", json=payload) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                # 블록을 빠져나가면 연결이 닫히고 Ollama도 생성을 멈춤
+                if line and parser.feed_chunk(json.loads(line)):
+                    break
+        _report_llm(started, parser.stats, parser)
+        _record_response(parser.raw, payload["model"])
+        return parser.finish()
+
+
+class AsyncEnricher(_EnricherBase):
+    """
+    연결을 재사용하는 비동기 Ollama 클라이언트. 생성 중에도 이벤트 루프를 막지 않습니다.
+
+    요청은 OllamaPool을 거쳐 설정된 엔드포인트 중 가장 한가한 곳으로 갑니다.
+
+    사용 예:
+        async with AsyncEnricher() as enricher:
+            enrichment = await enricher.enrich(text, handle, name)
+    """
+
+    def __init__(self, cache: EnrichmentCache | None = None):
+        super().__init__(cache)
+        self._pool = OllamaPool(
+            OLLAMA_URLS,
+            concurrency=OLLAMA_ENDPOINT_CONCURRENCY,
+            options=_client_options(),
+            probe_interval=OLLAMA_HEALTH_INTERVAL,
+        )
+        self._map_slots = asyncio.Semaphore(max(1, ENRICH_MAP_CONCURRENCY))  # 조각 요약 동시 요청 수
+
+    async def __aenter__(self) -> "AsyncEnricher":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        if len(self._pool.endpoints) > 1:
+            print(f"  {self._pool.summary()}")
+        if MODEL_ROUTES and self.routes:
+            print(f"  {self.route_summary()}")
+        await self._pool.aclose()
+
+    async def enrich(self, tweet_text: str, author_handle: str, author_name: str) -> dict:
+        """트윗을 분석해서 씨앗 노트용 메타데이터를 생성합니다."""
+        payload = _build_payload(tweet_text, author_handle)
+        key, cached = self._lookup(tweet_text, author_handle, payload)
+        if cached is not None:
+            return cached
+        return await self._enrich_fresh(tweet_text, author_handle, payload, key)
+
+    async def enrich_batch(self, items: list[tuple[str, str, str]]) -> list[dict]:
+        """
+        (tweet_text, author_handle, author_name) 목록을 분석합니다. 결과는 입력 순서와 같습니다.
+
+        짧은 트윗은 토큰 예산 안에서 한 요청으로 묶어 지침 프롬프트를 한 번만 평가하게 하고,
+        긴 트윗이나 배치 응답에서 파싱되지 않은 항목은 단건 요청으로 다시 분석합니다.
+        """
+        results: list[dict | None] = [None] * len(items)
+        pending = []  # (index, payload, cache key)
+        for i, (text, handle, _name) in enumerate(items):
+            payload = _build_payload(text, handle)
+            key, cached = self._lookup(text, handle, payload)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, payload, key))
+
+        groups = plan_batches(
+            [items[i][0] for i, _, _ in pending],
+            token_budget=ENRICH_BATCH_TOKEN_BUDGET,
+            max_items=ENRICH_BATCH_MAX_ITEMS,
+            short_chars=ENRICH_BATCH_SHORT_CHARS,
+        )
+        for group in groups:
+            members = [pending[g] for g in group]
+            if len(members) > 1:
+                parsed = await self._request_batch([items[i] for i, _, _ in members])
+                for (i, _, _), result in zip(members, parsed):
+                    if result is not None:
+                        results[i] = result
+
+            for i, payload, key in members:
+                if results[i] is None:
+                    results[i] = await self._enrich_fresh(items[i][0], items[i][1], payload, key)
+
+        return results
+
+    async def _enrich_fresh(self, tweet_text: str, author_handle: str, payload: dict, key: str | None) -> dict:
+        """캐시에 없는 트윗 하나를 분석합니다. 긴 글은 조각 요약을 모아 분석합니다."""
+        route = _route_for(tweet_text)
+        if len(tweet_text) > ENRICH_CHUNK_CHARS:
+            reduced, complete = await self._reduce(tweet_text, author_handle)
+            payload = _build_payload(reduced, author_handle, route)
+            if not complete:
+                key = None  # 조각 요약이 실패한 결과는 캐시하지 않음 (다음 실행에서 다시)
+        return await self._enrich_uncached(tweet_text, payload, key, route)
+
+    async def _reduce(self, tweet_text: str, author_handle: str) -> tuple[str, bool]:
+        """긴 글을 조각별로 동시에 요약해 종합 단계에 넣을 텍스트를 만듭니다. 두 번째 값은 모든 조각 요약이 성공했는지."""
+        text = tweet_text
+        complete = True
+        for _ in range(_MAX_REDUCE_LEVELS):
+            chunks = split_text(text, ENRICH_CHUNK_CHARS)
+            summaries = await asyncio.gather(*(self._summarize(chunk, author_handle) for chunk in chunks))
+            _report_map(text, summaries)
+            complete = complete and all(ok for _, _, ok in summaries)
+            text = _reduce_text([summary for summary, _, _ in summaries])
+            if len(text) <= ENRICH_CHUNK_CHARS:
+                break
+        return REDUCE_TEXT_TEMPLATE.format(summaries=text), complete
+
+    async def _summarize(self, chunk: str, author_handle: str) -> tuple[str, bool, bool]:
+        """조각 하나의 요약, 캐시 적중 여부, 요약 성공 여부."""
+        payload, key = _chunk_payload(chunk, author_handle)
+        summary = self._cached_summary(key)
+        if summary is not None:
+            return summary, True, True
+        try:
+            async with self._map_slots:
+                started = time.perf_counter()
+                response = await self._pool.post("/api/chat", json=payload)
+                response.raise_for_status()
+                json_response = response.json()
+            _report_llm(started, json_response)
+            summary = _summary_from(json_response)
+        except Exception as e:
+            print(f"  조각 요약 오류: {e}")
+            summary = ""
+        self._remember_summary(key, summary)
+        # 요약에 실패한 조각은 앞부분을 그대로 넣음
+        return summary or _truncate_text(chunk, 500), False, bool(summary)
+
+    async def _enrich_uncached(self, tweet_text: str, payload: dict, key: str | None, route: dict) -> dict:
+        """경로 모델로 분석하고, 실패하면 대체 모델로 한 번 더 시도합니다."""
+        started = time.perf_counter()
+        result = await self._attempt(payload)
+        fallback = _fallback_model(route)
+        used_fallback = result is None and fallback is not None
+        if used_fallback:
+            print(f"  ↳ {payload['model']} 분석 실패 — {fallback}로 재시도")
+            result = await self._attempt(_fallback_payload(payload, fallback))
+        return self._settle(tweet_text, key, route, payload["model"], started, used_fallback, result)
+
+    async def _attempt(self, payload: dict) -> dict | None:
+        """요청 한 번. 오류가 나거나 TITLE을 못 얻으면 None."""
+        try:
+            result = await self._request(payload)
+        except Exception as e:
+            print(f"  Ollama 오류: {e}")
+            return None
+        return self._checked(result)
+
+    async def _request_batch(self, items: list[tuple[str, str, str]]) -> list[dict | None]:
+        """여러 트윗을 한 요청으로 분석합니다. 요청 자체가 실패하면 모두 None. 결과는 배치 키로 캐시합니다."""
+        system = _batch_system_prompt()
+        user = BATCH_USER_TEMPLATE.format(
+            count=len(items),
+            items="\n\n".join(
+                BATCH_ITEM_TEMPLATE.format(index=n, author_handle=handle, text=_truncate_text(text))
+                for n, (text, handle, _name) in enumerate(items, 1)
+            ),
+        )
+        payload = _chat_payload(
+            system, user, stream=False, schema=BATCH_SCHEMA,
+            route=_route_for(max((text for text, _, _ in items), key=len)),
+            answer_tokens=_ENRICH_ANSWER_TOKENS * len(items),
+        )
+        try:
+            started = time.perf_counter()
+            response = await self._pool.post("/api/chat", json=payload)
+            response.raise_for_status()
+            json_response = response.json()
+            _report_llm(started, json_response, items=len(items))
+            raw = _response_text(json_response)
+            _record_response(raw, payload["model"])
+            parsed = _parse_batch_response(raw, len(items))
+        except Exception as e:
+            print(f"  배치 분석 오류, 단건으로 재시도: {e}")
+            return [None] * len(items)
+
+        for (text, handle, _name), result in zip(items, parsed):
+            if result is not None and self.cache is not None:
+                self._remember(_batch_cache_key(text, handle, payload), result)
+        ok = sum(r is not None for r in parsed)
+        print(f"  배치 분석: {len(items)}개 중 {ok}개 파싱 성공")
+        return parsed
+
+    async def _request(self, payload: dict) -> dict:
+        if not OLLAMA_STREAM:
+            started = time.perf_counter()
+            response = await self._pool.post("/api/chat", json=payload)
+            response.raise_for_status()
+            json_response = response.json()
+            _report_llm(started, json_response)
+            return _parse_full_response(json_response)
+
+        try:
+            return await self._stream(payload)
+        except _ThinkingBudgetExceeded:
+            print(f"  추론 토큰 {THINK_TOKEN_BUDGET}개 초과 — thinking 없이 재요청")
+            return await self._stream({**payload, "think": False})
+
+    async def _stream(self, payload: dict) -> dict:
+        """스트림을 읽으며 파싱하고, TAGS까지 채워지면 바로 연결을 끊습니다."""
+        parser = _new_stream_parser()
+        started = time.perf_counter()
+        async with self._pool.stream("POST", "/api/chat", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line and parser.feed_chunk(json.loads(line)):
+                    break
+        _report_llm(started, parser.stats, parser)
+        _record_response(parser.raw, payload["model"])
+        return parser.finish()
+
+
+_default_enricher: Enricher | None = None
+
+
+def enrich_tweet(tweet_text: str, author_handle: str, author_name: str) -> dict:
+    """트윗을 분석해서 씨앗 노트용 메타데이터를 생성합니다. (모듈 공용 Enricher 사용)"""
+    global _default_enricher
+    if _default_enricher is None:
+        _default_enricher = Enricher()
+    return _default_enricher.enrich(tweet_text, author_handle, author_name)
+
+
+_FALLBACK_CLAIM = "(LLM 처리 실패 — 직접 작성 필요)"
 
-        print("  파싱 실패 — TITLE 없음, 폴백 사용")
-        return _fallback_enrichment(tweet_text)
 
-    except Exception as e:
-        print(f"  Ollama 오류: {e}")
-        return _fallback_enrichment(tweet_text)
+def is_fallback(enrichment: dict) -> bool:
+    """LLM 실패로 채운 기본값인지 (재사용하거나 색인하면 안 되는 결과)."""
+    return enrichment.get("core_claim") == _FALLBACK_CLAIM
 
 
 def _fallback_enrichment(text: str) -> dict:
@@ -136,7 +1280,7 @@ def _fallback_enrichment(text: str) -> dict:
     title = single_line[:35].rstrip() + ("..." if len(single_line) > 35 else "")
     return {
         "title":          title,
-        "core_claim":     "(LLM 처리 실패 — 직접 작성 필요)",
+        "core_claim":     _FALLBACK_CLAIM,
         "seed_questions": [
             "이 내용이 왜 중요한가?",
             "어떤 맥락에서 성립하는가?",
@@ -3,9 +3,18 @@ X.com 북마크를 쿠키 기반으로 가져옵니다 (공식 API 키 불필요
 """
 
 import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 
-import httpx
+import metrics
+from article import ArticleExtractor
+from config import ARTICLE_PAGE_POOL, THREAD_MAX_TWEETS, X_RATE_LIMITS, X_RATE_LIMIT_MAX_WAIT
+from payload_store import PayloadStore
+from ratelimit import AuthError, RateLimited, ScheduledClient
+from state import State
+from thread import ThreadAssembler
 
 
 @dataclass
@@ -19,28 +28,146 @@ class Tweet:
     media_urls: list[str]
 
 
-async def fetch_bookmarks(cookies: dict, count: int = 20, verify_ssl: bool = True) -> list[Tweet]:
+def make_client(cookies: dict, verify_ssl: bool = True) -> ScheduledClient:
+    """쿠키로 인증된 twikit Client를 요청 한도 스케줄러로 감싸 만듭니다."""
+    from twikit import Client
+
+    # SSL 검증 비활성화가 필요한 경우 (나머지 인자는 twikit이 httpx.AsyncClient로 넘김)
+    if not verify_ssl:
+        client = Client("en-US", verify=False)
+    else:
+        client = Client("en-US")
+
+    client.set_cookies(cookies)
+    return ScheduledClient(client, X_RATE_LIMITS, max_wait=X_RATE_LIMIT_MAX_WAIT)
+
+
+def _tweet_text(tweet) -> str:
+    """Long tweet(note_tweet) 본문이 있으면 그것을, 없으면 full_text/text를 반환합니다."""
+    if hasattr(tweet, "note_tweet") and tweet.note_tweet:
+        text = tweet.note_tweet.get("note_tweet_results", {}).get("result", {}).get("text", "")
+        if text:
+            return text
+    return tweet.full_text if hasattr(tweet, "full_text") and tweet.full_text else tweet.text
+
+
+async def fetch_bookmarks(
+    cookies: dict,
+    count: int = 20,
+    verify_ssl: bool = True,
+    concurrency: int = 4,
+    extractor: ArticleExtractor | None = None,
+    state: State | None = None,
+    stop_after_known: int = 3,
+    max_pages: int = 50,
+    client=None,
+    payloads: PayloadStore | None = None,
+) -> AsyncIterator[Tweet]:
     """
-    X.com 북마크를 가져옵니다.
+    X.com 북마크를 비동기 스트림으로 가져옵니다.
+
+    state가 주어지면 북마크 커서를 따라 다음 페이지로 넘어가며, 이미 처리된 북마크는
+    상세 조회 없이 건너뜁니다. 처리된 북마크가 stop_after_known개 연속으로 나오면
+    (지난 실행 지점까지 따라잡은 것) 페이지 넘김을 멈춥니다. 평소에는 요청 한 번으로 끝나고,
+    실행 사이에 북마크가 몰린 경우에도 빠짐없이 가져옵니다. 지난 실행이 따라잡기를 다 못 끝냈으면
+    (최대 페이지 수, 페이지 조회 실패, 요청 한도·인증 실패로 중단) State에 남은 지점부터 이어서 봅니다. state가 비어 있으면(첫 실행)
+    첫 페이지만 가져옵니다 — 전체 이력은 백필로 가져오세요.
+
+    쓰레드는 작성자 본인의 답글 체인을 대화 커서를 따라 끝까지 이어 붙입니다. 이번 실행에서 본
+    트윗은 ID로 기억해 두어, 같은 쓰레드의 여러 트윗을 북마크해도 다시 요청하지 않습니다.
+
+    북마크별 상세/쓰레드/미디어 조회는 최대 concurrency개까지 동시에 진행되며,
+    완성된 트윗은 북마크 순서대로 바로 yield 됩니다. 소비 측이 느리면 조회도
+    concurrency개 앞에서 멈추므로 메모리 사용량이 북마크 수와 무관하게 유지됩니다.
+    한 북마크의 실패는 나머지에 영향을 주지 않습니다.
 
     Args:
         cookies: X.com 인증 쿠키
-        count: 가져올 북마크 수
+        count: 한 페이지에 가져올 북마크 수 (state가 없으면 전체 개수)
         verify_ssl: SSL 인증서 검증 여부 (프록시 환경에서 False 필요)
+        concurrency: 동시에 상세 조회할 북마크 수
+        extractor: Article 추출기. 없으면 이번 실행용으로 만들고 끝나면 닫습니다.
+        state: 처리 상태. 주어지면 커서 기반 증분 동기화
+        stop_after_known: 이 수만큼 처리된 북마크가 연속되면 중단 (0이면 max_pages까지)
+        max_pages: 한 실행에서 넘길 최대 페이지 수
+        client: 재사용할 twikit Client (데몬 모드). 없으면 cookies로 새로 만듭니다.
+        payloads: 주어지면 북마크마다 상세/쓰레드/Article 원본을 저장 (replay_bookmarks로 재생)
+
+    Raises:
+        AuthError: 쿠키가 만료되는 등 인증에 실패한 경우
+        RuntimeError: 그 밖의 이유로 북마크 목록을 가져오지 못한 경우
     """
-    from twikit import Client
+    if client is None:
+        client = make_client(cookies, verify_ssl)
 
-    # SSL 검증 비활성화가 필요한 경우
-    if not verify_ssl:
-        httpx_client = httpx.AsyncClient(verify=False)
-        client = Client("en-US", httpx_client=httpx_client)
-    else:
-        client = Client("en-US")
+    first_page = await get_bookmark_page(client, count)
+    if state is not None and len(state) == 0:
+        state = None  # 첫 실행 — 전체 이력은 백필로 가져오므로 이어보기 지점도 남기지 않음
+    if state is None:
+        max_pages = 1
+    items = _iter_new_items(client, first_page, count, state, stop_after_known, max_pages)
 
-    client.set_cookies(cookies)
+    owns_extractor = extractor is None
+    if owns_extractor:
+        extractor = ArticleExtractor(cookies, pool_size=ARTICLE_PAGE_POOL)
 
+    tweets = build_tweets(client, items, extractor, concurrency, payloads)
     try:
-        result = await client.get_bookmarks(count=count)
+        async for tweet in tweets:
+            yield tweet
+    finally:
+        await tweets.aclose()
+        await items.aclose()
+        if owns_extractor:
+            await extractor.close()
+
+
+async def build_tweets(
+    client,
+    items: AsyncIterator,
+    extractor: ArticleExtractor,
+    concurrency: int = 4,
+    payloads: PayloadStore | None = None,
+) -> AsyncIterator[Tweet]:
+    """
+    북마크 항목 스트림의 상세/쓰레드/Article을 최대 concurrency개까지 동시에 조회해, 완성된
+    Tweet을 입력 순서대로 내보냅니다. 실패한 항목은 출력만 하고 건너뜁니다 (인증 실패와 요청 한도
+    초과는 AuthError / RateLimited로 스트림을 멈춤).
+
+    fetch_bookmarks와 백필(backfill.py)이 함께 씁니다. 쓰레드 캐시는 스트림 하나 동안 유지됩니다.
+    """
+    threads = ThreadAssembler(client, max_tweets=THREAD_MAX_TWEETS)
+
+    # 앞에서부터 완료를 기다리는 슬라이딩 윈도우 — 순서 유지 + 동시 조회 수 제한
+    window = max(1, concurrency)
+    pending: deque[tuple[object, asyncio.Task]] = deque()
+    try:
+        async for item in items:
+            pending.append((item, asyncio.create_task(_build_tweet(threads, item, extractor, payloads))))
+            if len(pending) >= window:
+                tweet = await _take_next(pending)
+                if tweet is not None:
+                    yield tweet
+
+        while pending:
+            tweet = await _take_next(pending)
+            if tweet is not None:
+                yield tweet
+    finally:
+        # 소비 측이 중간에 멈춘 경우 남은 조회 취소
+        tasks = [task for _, task in pending]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def get_bookmark_page(client, count: int, cursor: str | None = None):
+    """북마크 한 페이지를 가져옵니다. 실패 원인을 알 수 있는 RuntimeError로 바꿔 던집니다."""
+    try:
+        with metrics.timer("bookmark_page", first=cursor is None) as m:
+            page = await client.get_bookmarks(count=count, cursor=cursor)
+            m["items"] = len(page)
+        return page
     except Exception as e:
         error_msg = str(e)
         if "CERTIFICATE_VERIFY_FAILED" in error_msg or "SSL" in error_msg:
@@ -48,122 +175,217 @@ async def fetch_bookmarks(cookies: dict, count: int = 20, verify_ssl: bool = Tru
                 f"SSL 인증서 오류: {e}\n"
                 "프록시/VPN 환경인 경우 settings.json에서 'verify_ssl': false로 설정하세요."
             )
+        if isinstance(e, (AuthError, RateLimited)):
+            raise
         raise RuntimeError(f"북마크 가져오기 실패: {e}\n쿠키가 만료되었을 수 있습니다.")
 
-    tweets = []
-    for item in result:
-        # 1. 북마크된 트윗 원본 조회 (Long tweet 등 상세 정보 확보)
+
+async def _iter_new_items(client, page, count: int, state: State | None, stop_after_known: int, max_pages: int):
+    """
+    북마크 페이지를 커서로 넘기며 아직 처리되지 않은 항목만 내보냅니다.
+
+    max_pages에 닿거나, 다음 페이지 조회가 실패하거나, 소비 측이 중간에 멈춰 따라잡기를 다 끝내지
+    못하면 이어서 볼 커서를 State에 이어보기 지점으로 남깁니다. 다음 실행은 처리된 북마크를 만나
+    멈출 자리에서 끝내지 않고 그 지점으로 건너가 계속 가져옵니다 (지점의 pages만큼은 처리된
+    북마크가 이어져도 멈추지 않고 끝까지 훑음).
+    """
+    points = list(state.resume_points) if state is not None else []
+    scan = points.pop(0)["pages"] if points and points[0]["cursor"] is None else 0  # 멈추지 않고 훑을 페이지 수
+    cursor = None  # 지금 페이지를 가져온 커서 (첫 페이지는 None)
+    previous = None  # 바로 앞에 이어진 페이지가 있으면 (그 페이지의 커서,)
+    pages, known_run, new = 1, 0, 0
+    seen: set[str] = set()  # 앞쪽을 훑다 이어보기 지점까지 내려온 경우 같은 항목을 다시 내보내지 않음
+    stopped = None  # 따라잡기를 다 못 끝냈으면 다음 실행이 이어서 볼 지점
+    finished = False
+    try:
+        while True:
+            caught_up = False
+            for item in page:
+                if item.id in seen or state is not None and state.is_processed(item.id):
+                    if scan:
+                        continue
+                    known_run += 1
+                    if stop_after_known and known_run >= stop_after_known:
+                        caught_up = True
+                        break
+                    continue
+                known_run = 0
+                new += 1
+                seen.add(item.id)
+                yield item
+            scan = max(scan - 1, 0)
+
+            contiguous = not caught_up and len(page) and page.next_cursor
+            if contiguous:
+                next_cursor = page.next_cursor
+            elif points:
+                # 앞쪽은 따라잡음 — 지난 실행이 다 못 본 자리로 건너감
+                point = points.pop(0)
+                next_cursor, scan, known_run = point["cursor"], point["pages"], 0
+            else:
+                finished = True
+                return
+            if pages >= max_pages:
+                stopped = {"cursor": next_cursor, "pages": scan}
+                print(f"  ↳ 최대 {max_pages}페이지까지만 확인 — 나머지는 다음 실행에서 이어서 확인")
+                return
+            try:
+                next_page = await get_bookmark_page(client, count, next_cursor)
+            except RuntimeError as e:
+                stopped = {"cursor": next_cursor, "pages": scan}
+                if isinstance(e, (AuthError, RateLimited)):
+                    raise  # 호출 측이 쿠키를 다시 읽거나 한도가 풀린 뒤 다시 실행하게 함
+                print(f"  ↳ 다음 북마크 페이지 조회 실패, 여기까지만 처리 (다음 실행에서 이어서 확인): {e}")
+                return
+            previous = (cursor,) if contiguous else None
+            cursor, page = next_cursor, next_page
+            pages += 1
+    finally:
+        if stopped is None and not finished:
+            # 소비 측이 중간에 멈춤 — 동시 조회 중이던 항목이 앞 페이지에 걸쳐 있을 수 있어 그 페이지부터
+            if previous is not None:
+                stopped = {"cursor": previous[0], "pages": max(scan, 1) + 1}
+            else:
+                stopped = {"cursor": cursor, "pages": max(scan, 1)}
+        if state is not None:
+            state.set_resume_points(([stopped] if stopped else []) + points)
+        print(f"✓ 북마크 {pages}페이지 확인, 신규 {new}개")
+
+
+async def _take_next(pending: deque) -> Tweet | None:
+    """
+    윈도우 맨 앞 북마크의 결과를 기다립니다. 실패하면 None.
+
+    인증 실패와 요청 한도 초과는 나머지 북마크도 모두 실패하므로 스트림을 멈춥니다. 그 북마크는
+    처리 완료로 표시되지 않아, 다음 실행이 이미 처리된 북마크에서 멈추기 전에 다시 만납니다.
+    """
+    item, task = pending.popleft()
+    try:
+        return await task
+    except (AuthError, RateLimited):
+        raise  # 호출 측이 쿠키를 다시 읽거나 한도가 풀린 뒤 다시 실행하게 함
+    except Exception as e:
+        print(f"  ↳ 북마크 처리 실패 ({item.id}): {e}")
+        return None
+
+
+async def replay_bookmarks(payloads: PayloadStore, limit: int = 0) -> AsyncIterator[Tweet]:
+    """
+    저장해 둔 원본 응답으로 Tweet을 다시 만듭니다. 네트워크 요청은 하지 않습니다.
+
+    fetch_bookmarks와 같은 평탄화 코드를 거치므로, 결과는 원본을 받았을 때와 같습니다.
+    최근에 받은 북마크부터 최대 limit개(0이면 전체)를 돌려줍니다.
+    """
+    for tweet_id, payload in payloads.items(limit):
         try:
-            detailed_tweet = await client.get_tweet_by_id(item.id)
-            if not detailed_tweet:
-                detailed_tweet = item
-        except Exception as e:
-            print(f"  ↳ 개별 트윗 상세 조회 실패: {e}")
+            detailed_tweet = _from_raw(payload["tweet"])
+            thread = [_from_raw(raw) for raw in payload.get("thread", [])]
+        except (KeyError, TypeError) as e:
+            print(f"  ↳ 저장된 원본을 읽지 못함 ({tweet_id}): {e}")
+            continue
+        yield _to_tweet(detailed_tweet, thread, payload.get("article"))
+
+
+def _from_raw(data: dict):
+    """저장된 GraphQL 원본으로 twikit Tweet을 만듭니다 (클라이언트 없이 속성 조회만 가능)."""
+    from twikit.tweet import Tweet as XTweet
+    from twikit.user import User
+
+    return XTweet(None, data, User(None, data["core"]["user_results"]["result"]))
+
+
+async def _build_tweet(
+    threads: ThreadAssembler,
+    item,
+    extractor: ArticleExtractor,
+    payloads: PayloadStore | None = None,
+) -> Tweet:
+    """북마크 항목 하나의 상세/쓰레드/Article/미디어를 조회해 Tweet으로 만듭니다."""
+    # 1. 북마크된 트윗 원본 조회 (Long tweet 등 상세 정보 확보)
+    try:
+        detailed_tweet = await threads.get(item.id)
+        if not detailed_tweet:
             detailed_tweet = item
+    except (AuthError, RateLimited):
+        raise  # 얇은 북마크 항목으로 노트를 만들지 않고 다음 실행에서 다시 시도
+    except Exception as e:
+        print(f"  ↳ 개별 트윗 상세 조회 실패: {e}")
+        detailed_tweet = item
+
+    # 2. 쓰레드(작성자 본인의 답글 체인) 가져오기
+    thread = []
+    try:
+        thread = await threads.self_replies(detailed_tweet)
+    except (AuthError, RateLimited):
+        raise  # 잘린 쓰레드로 노트를 만들지 않고 다음 실행에서 다시 시도
+    except Exception as e:
+        print(f"  ↳ 쓰레드 답글 조회 실패: {e}")
 
-        # 텍스트 추출 (note_tweet, full_text 우선 탐색)
-        raw_text = ""
-        if hasattr(detailed_tweet, "note_tweet") and detailed_tweet.note_tweet:
-            raw_text = detailed_tweet.note_tweet.get("note_tweet_results", {}).get("result", {}).get("text", "")
+    # Article 형식 확인 (t.co 링크만 있는 경우)
+    raw_text = _tweet_text(detailed_tweet)
+    is_article = raw_text and raw_text.strip().startswith("https://t.co/")
+    article_text = None
 
-        if not raw_text:
-            raw_text = detailed_tweet.full_text if hasattr(detailed_tweet, "full_text") and detailed_tweet.full_text else detailed_tweet.text
+    if is_article and hasattr(item, "urls") and item.urls:
+        # Article ID 추출
+        for url_info in item.urls:
+            expanded_url = url_info.get("expanded_url", "")
+            if "/i/article/" in expanded_url:
+                article_id = expanded_url.split("/i/article/")[-1].split("?")[0]
+                article_url = f"https://x.com/i/article/{article_id}"
+                print(f"  ↳ Article 감지, Playwright로 내용 가져오는 중...")
 
-        # Thread(쓰레드) 텍스트 수집 (답글들)
-        author_screen_name = detailed_tweet.user.screen_name
-        thread_texts = []
-        current_tweet = detailed_tweet
+                try:
+                    started = time.perf_counter()
+                    text = await extractor.extract(article_url)
+                    elapsed = time.perf_counter() - started
+                    metrics.record("article", seconds=elapsed, tweet_id=item.id, chars=len(text or ""))
 
-        # 2. 쓰레드(답글) 가져오기 로직
+                    if text and len(text) > 50:
+                        print(f"    ✓ Article 내용 가져옴 ({len(text)}자, {elapsed:.1f}s)")
+                        article_text = text
+
+                except ImportError:
+                    print(f"    ✗ Playwright 미설치: 'pip install playwright && playwright install chromium'")
+                except Exception as e:
+                    print(f"    ✗ Article 가져오기 실패: {e}")
+                break
+
+    # 원본 보관 (twikit 객체일 때만 — GraphQL 원본이 _data에 있음). 압축·커밋은 이벤트 루프 밖에서
+    if payloads is not None and hasattr(detailed_tweet, "_data"):
         try:
-            # client.get_tweet_by_id(...) 호출 시 replies 에 접근 가능한 경우가 있음
-            if hasattr(current_tweet, "replies") and current_tweet.replies:
-                replies = current_tweet.replies
-                for reply in replies:
-                    if reply.user.screen_name == author_screen_name:
-                        reply_text = reply.full_text if hasattr(reply, "full_text") and reply.full_text else reply.text
-                        thread_texts.append(reply_text)
+            await asyncio.to_thread(payloads.put, detailed_tweet.id, {
+                "tweet": detailed_tweet._data,
+                "thread": [reply._data for reply in thread if hasattr(reply, "_data")],
+                "article": article_text,
+            })
         except Exception as e:
-            print(f"  ↳ 쓰레드 답글 조회 실패: {e}")
-
-        # Article 형식 확인 (t.co 링크만 있는 경우)
-        is_article = raw_text and raw_text.strip().startswith("https://t.co/")
-
-        if is_article and hasattr(item, "urls") and item.urls:
-            # Article ID 추출
-            for url_info in item.urls:
-                expanded_url = url_info.get("expanded_url", "")
-                if "/i/article/" in expanded_url:
-                    article_id = expanded_url.split("/i/article/")[-1].split("?")[0]
-                    article_url = f"https://x.com/i/article/{article_id}"
-                    print(f"  ↳ Article 감지, Playwright로 내용 가져오는 중...")
-
-                    try:
-                        from playwright.async_api import async_playwright
-
-                        async with async_playwright() as p:
-                            browser = await p.chromium.launch(headless=True)
-                            context = await browser.new_context(
-                                storage_state={
-                                    "cookies": [
-                                        {"name": "auth_token", "value": cookies.get("auth_token", ""), "domain": ".x.com", "path": "/"},
-                                        {"name": "ct0", "value": cookies.get("ct0", ""), "domain": ".x.com", "path": "/"},
-                                    ]
-                                }
-                            )
-                            page = await context.new_page()
-                            try:
-                                await page.goto(article_url, wait_until="domcontentloaded", timeout=60000)
-                                await page.wait_for_selector('[data-testid="tweetText"]', timeout=10000)
-                            except Exception:
-                                pass  # 요소 대기 실패해도 계속 진행
-
-                            # Article 텍스트 추출
-                            article_text = await page.evaluate("""() => {
-                                const selectors = [
-                                    '[data-testid="tweetText"]',
-                                    '[data-testid="article"]',
-                                    'article [data-testid="tweetText"]',
-                                ];
-                                for (const selector of selectors) {
-                                    const elements = document.querySelectorAll(selector);
-                                    if (elements.length > 0) {
-                                        return Array.from(elements).map(el => el.innerText).join('\\n\\n');
-                                    }
-                                }
-                                return null;
-                            }""")
-
-                            await browser.close()
-
-                            if article_text and len(article_text) > 50:
-                                print(f"    ✓ Article 내용 가져옴 ({len(article_text)}자)")
-                                raw_text = article_text
-
-                    except ImportError:
-                        print(f"    ✗ Playwright 미설치: 'pip install playwright && playwright install chromium'")
-                    except Exception as e:
-                        print(f"    ✗ Article 가져오기 실패: {e}")
-                    break
-
-        if thread_texts:
-            print(f"    ✓ 쓰레드(답글) {len(thread_texts)}개 병합")
-            raw_text = raw_text + "\n\n---\n\n" + "\n\n---\n\n".join(thread_texts)
-
-        media_urls = []
-        if hasattr(detailed_tweet, "media") and detailed_tweet.media:
-            for m in detailed_tweet.media:
-                if hasattr(m, "media_url_https"):
-                    media_urls.append(m.media_url_https)
-
-        tweets.append(Tweet(
-            id=detailed_tweet.id,
-            text=raw_text,
-            author_name=detailed_tweet.user.name,
-            author_handle=detailed_tweet.user.screen_name,
-            url=f"https://x.com/{detailed_tweet.user.screen_name}/status/{detailed_tweet.id}",
-            created_at=str(detailed_tweet.created_at),
-            media_urls=media_urls,
-        ))
-
-    return tweets
\ No newline at end of file
+            print(f"  ↳ 원본 저장 실패 ({detailed_tweet.id}): {e}")
+
+    return _to_tweet(detailed_tweet, thread, article_text)
+
+
+def _to_tweet(detailed_tweet, thread: list, article_text: str | None = None) -> Tweet:
+    """상세 트윗, 쓰레드 답글, Article 본문을 노트에 쓸 Tweet 하나로 평탄화합니다."""
+    raw_text = article_text or _tweet_text(detailed_tweet)
+
+    thread_texts = [_tweet_text(reply) for reply in thread]
+    if thread_texts:
+        print(f"    ✓ 쓰레드(답글) {len(thread_texts)}개 병합")
+        raw_text = raw_text + "\n\n---\n\n" + "\n\n---\n\n".join(thread_texts)
+
+    media_urls = []
+    if hasattr(detailed_tweet, "media") and detailed_tweet.media:
+        for m in detailed_tweet.media:
+            if hasattr(m, "media_url_https"):
+                media_urls.append(m.media_url_https)
+
+    return Tweet(
+        id=detailed_tweet.id,
+        text=raw_text,
+        author_name=detailed_tweet.user.name,
+        author_handle=detailed_tweet.user.screen_name,
+        url=f"https://x.com/{detailed_tweet.user.screen_name}/status/{detailed_tweet.id}",
+        created_at=str(detailed_tweet.created_at),
+        media_urls=media_urls,
+    )
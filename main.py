@@ -3,6 +3,9 @@
 X.com 북마크 → Obsidian 씨앗 노트 동기화
 
 실행: python3 main.py
+상주 모드: python3 main.py --daemon (종료 신호를 받을 때까지 주기적으로 동기화)
+백필: python3 main.py --backfill [N] (북마크 전체 이력, 중단 후 다시 실행하면 이어서 진행)
+재처리: python3 main.py --replay [N] (저장된 원본으로 X 요청 없이 다시 분석, N=최근 N개)
 스케줄: setup_cron.sh 로 자동 등록 (15분마다)
 """
 
@@ -12,12 +15,31 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-from config import DEFAULT_OUTPUT_DIR, BOOKMARK_FETCH_COUNT, VERIFY_SSL, STATE_FILE
+from config import (
+    DEFAULT_OUTPUT_DIR, BOOKMARK_FETCH_COUNT, FETCH_CONCURRENCY, VERIFY_SSL, STATE_FILE,
+    SYNC_STOP_AFTER_KNOWN, SYNC_MAX_PAGES,
+    ENRICH_CONCURRENCY, WRITE_CONCURRENCY, PIPELINE_QUEUE_SIZE, ENRICH_BATCH_MAX_ITEMS,
+    ENRICH_CACHE_ENABLED, ENRICH_CACHE_FILE, ENRICH_CACHE_MAX_ENTRIES, ENRICH_CACHE_MAX_AGE_DAYS,
+    VAULT_INDEX_FILE, UPDATE_EXISTING_NOTES,
+    MEDIA_DOWNLOAD, MEDIA_DIR, MEDIA_CONCURRENCY, MEDIA_MAX_DIMENSION, MEDIA_MANIFEST_FILE,
+    PAYLOAD_STORE_ENABLED, PAYLOAD_STORE_FILE, PAYLOAD_STORE_MAX_AGE_DAYS,
+    DEDUP_ENABLED, DEDUP_FILE, DEDUP_MAX_DISTANCE, DEDUP_MIN_CHARS,
+    LINK_RESOLVE, VAULT_DIR, LINK_FUZZY_THRESHOLD, LINK_UNRESOLVED, TITLE_INDEX_FILE,
+)
+import metrics
 from auth import get_x_cookies
-from fetcher import fetch_bookmarks
-from enricher import enrich_tweet
-from writer import write_note
+from backfill import Backfill
+from cache import EnrichmentCache
+from daemon import Daemon
+from dedup import NearDuplicateIndex
+from enricher import AsyncEnricher
+from fetcher import RateLimited, fetch_bookmarks, replay_bookmarks
+from media import MediaDownloader
+from payload_store import PayloadStore
+from pipeline import run_pipeline
 from state import State
+from title_index import TitleIndex, find_vault_root
+from vault_index import VaultIndex
 
 
 async def run(output_dir: Path, fetch_count: int):
@@ -26,48 +48,149 @@ async def run(output_dir: Path, fetch_count: int):
     print(f"저장 경로: {output_dir}")
 
     state = State(STATE_FILE)
+    index = VaultIndex.load(output_dir, VAULT_INDEX_FILE)
+    metrics.start_run()
+    new_count = 0
+    try:
+        new_count = await _sync(output_dir, fetch_count, state, index)
+    finally:
+        metrics.finish_run(notes=new_count)
+        index.save()
+        state.update_last_run()
+        state.close()
+
+    if new_count == 0:
+        print("  새 북마크 없음")
+    else:
+        print(f"\n완료: {new_count}개 노트 생성 (누적 {state.total_notes}개)")
+
+
+async def replay(output_dir: Path, limit: int = 0):
+    """저장된 원본으로 Tweet을 다시 만들어 분석합니다. X에는 요청하지 않습니다."""
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"\n[{ts}] 저장된 원본으로 재처리 시작 (X 요청 없음)")
+    print(f"저장 경로: {output_dir}")
+    if not PAYLOAD_STORE_FILE.exists():
+        print("✗ 저장된 원본이 없습니다. 먼저 일반 동기화를 실행하세요.")
+        sys.exit(1)
 
+    state = State(STATE_FILE)
+    index = VaultIndex.load(output_dir, VAULT_INDEX_FILE)
+    payloads = PayloadStore(PAYLOAD_STORE_FILE, max_age_days=PAYLOAD_STORE_MAX_AGE_DAYS)
+    print(f"  저장된 원본 {len(payloads)}개" + (f" 중 최근 {limit}개" if limit else ""))
+    metrics.start_run()
+    new_count = 0
+    try:
+        new_count = await _process(replay_bookmarks(payloads, limit), output_dir, state, index, replay=True)
+    finally:
+        metrics.finish_run(notes=new_count, replay=True)
+        index.save()
+        payloads.close()
+        state.close()
+    print(f"\n완료: {new_count}개 노트 다시 생성")
+
+
+async def _sync(output_dir: Path, fetch_count: int, state: State, index: VaultIndex) -> int:
     # 1. 쿠키 추출
     try:
-        cookies = get_x_cookies()
+        with metrics.timer("cookies"):
+            cookies = get_x_cookies()
     except RuntimeError as e:
         print(f"✗ {e}")
         sys.exit(1)
 
-    # 2. 북마크 가져오기
+    # 2. 북마크 스트림 → 분석 → 저장 (단계별 동시 실행, 신규 북마크만 처리)
+    payloads = None
+    if PAYLOAD_STORE_ENABLED:
+        payloads = PayloadStore(PAYLOAD_STORE_FILE, max_age_days=PAYLOAD_STORE_MAX_AGE_DAYS)
+    tweets = fetch_bookmarks(
+        cookies,
+        count=fetch_count,
+        verify_ssl=VERIFY_SSL,
+        concurrency=FETCH_CONCURRENCY,
+        state=state,
+        stop_after_known=SYNC_STOP_AFTER_KNOWN,
+        max_pages=SYNC_MAX_PAGES,
+        payloads=payloads,
+    )
+    try:
+        return await _process(tweets, output_dir, state, index)
+    finally:
+        if payloads is not None:
+            payloads.close()
+
+
+async def _process(tweets, output_dir: Path, state: State, index: VaultIndex, replay: bool = False) -> int:
+    """Tweet 스트림을 분석/저장합니다. replay면 처리 여부와 관계없이 다시 분석해 기존 노트를 갱신합니다."""
+    notes_before = state.total_notes
+    cache = None
+    if ENRICH_CACHE_ENABLED:
+        cache = EnrichmentCache(
+            ENRICH_CACHE_FILE,
+            max_entries=ENRICH_CACHE_MAX_ENTRIES,
+            max_age_days=ENRICH_CACHE_MAX_AGE_DAYS,
+        )
+    media = None
+    if MEDIA_DOWNLOAD:
+        media = MediaDownloader(
+            output_dir / MEDIA_DIR,
+            MEDIA_MANIFEST_FILE,
+            max_connections=MEDIA_CONCURRENCY,
+            max_dimension=MEDIA_MAX_DIMENSION,
+            verify_ssl=VERIFY_SSL,
+            offline=replay,
+        )
+    titles = None
+    if LINK_RESOLVE:
+        titles = TitleIndex.load(
+            VAULT_DIR or find_vault_root(output_dir),
+            TITLE_INDEX_FILE,
+            fuzzy_threshold=LINK_FUZZY_THRESHOLD,
+            unresolved=LINK_UNRESOLVED,
+        )
+    dedup = None
+    if DEDUP_ENABLED and not replay:  # 다시 분석하려는 것이므로 재사용하지 않음
+        dedup = NearDuplicateIndex(DEDUP_FILE, max_distance=DEDUP_MAX_DISTANCE, min_chars=DEDUP_MIN_CHARS)
+
     try:
-        tweets = await fetch_bookmarks(cookies, count=fetch_count, verify_ssl=VERIFY_SSL)
-        print(f"✓ 북마크 {len(tweets)}개 가져옴")
+        async with AsyncEnricher(cache=cache) as enricher:
+            new_count = await run_pipeline(
+                tweets,
+                state,
+                output_dir,
+                enricher,
+                enrich_workers=ENRICH_CONCURRENCY,
+                write_workers=WRITE_CONCURRENCY,
+                queue_size=PIPELINE_QUEUE_SIZE,
+                batch_size=ENRICH_BATCH_MAX_ITEMS,
+                index=index,
+                update_existing=UPDATE_EXISTING_NOTES or replay,
+                media=media,
+                skip_processed=not replay,
+                dedup=dedup,
+                titles=titles,
+            )
+    except RateLimited as e:
+        # 이미 쓴 노트는 State에 남았으므로 여기서 멈추고 나머지는 다음 실행에 이어서 처리
+        print(f"✗ {e}")
+        print("  ↳ 남은 북마크는 한도가 풀린 뒤 다음 실행에서 이어서 처리합니다")
+        new_count = state.total_notes - notes_before
     except RuntimeError as e:
         print(f"✗ {e}")
         sys.exit(1)
-
-    # 3. 신규 북마크만 처리
-    new_count = 0
-    for tweet in tweets:
-        if state.is_processed(tweet.id):
-            continue
-
-        short = tweet.text[:50].replace("\n", " ")
-        print(f"  ↳ 처리: @{tweet.author_handle} — {short}...")
-
-        enrichment = enrich_tweet(
-            tweet_text=tweet.text,
-            author_handle=tweet.author_handle,
-            author_name=tweet.author_name,
-        )
-
-        note_path = write_note(tweet, enrichment, output_dir)
-        state.mark_processed(tweet.id)
-        new_count += 1
-        print(f"    ✓ {note_path.name}")
-
-    state.update_last_run()
-
-    if new_count == 0:
-        print("  새 북마크 없음")
-    else:
-        print(f"\n완료: {new_count}개 노트 생성 (누적 {state.total_notes}개)")
+    finally:
+        if media is not None:
+            await media.close()
+        if cache is not None:
+            print(f"  {cache.summary()}")
+            cache.close()
+        if dedup is not None:
+            print(f"  {dedup.summary()}")
+            dedup.close()
+        if titles is not None:
+            print(f"  {titles.summary()}")
+            titles.save()
+    return new_count
 
 
 if __name__ == "__main__":
@@ -82,8 +205,36 @@ if __name__ == "__main__":
         "--count",
         type=int,
         default=BOOKMARK_FETCH_COUNT,
-        help="가져올 북마크 개수 (기본값: settings.json 혹은 5)"
+        help="북마크 페이지당 개수 (기본값: settings.json 혹은 5)"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="종료 신호(SIGTERM/SIGINT)를 받을 때까지 주기적으로 동기화하는 상주 모드"
+    )
+    parser.add_argument(
+        "--replay",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="N",
+        help="저장된 X 원본으로 다시 분석해 노트를 갱신 (X 요청 없음, N을 주면 최근 N개만)"
+    )
+    parser.add_argument(
+        "--backfill",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="N",
+        help="북마크 전체 이력을 가져오는 백필 (중단 후 다시 실행하면 이어서 진행, N=예상 북마크 수로 남은 시간 표시)"
     )
     args = parser.parse_args()
 
-    asyncio.run(run(output_dir=args.output_dir, fetch_count=args.count))
+    if args.backfill is not None:
+        asyncio.run(Backfill(output_dir=args.output_dir, expected_total=args.backfill).run())
+    elif args.replay is not None:
+        asyncio.run(replay(output_dir=args.output_dir, limit=args.replay))
+    elif args.daemon:
+        asyncio.run(Daemon(output_dir=args.output_dir, fetch_count=args.count).run())
+    else:
+        asyncio.run(run(output_dir=args.output_dir, fetch_count=args.count))
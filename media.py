@@ -0,0 +1,206 @@
+"""
+트윗 첨부 미디어를 저장 경로의 attachments 폴더로 내려받습니다.
+
+- 연결을 재사용하는 비동기 클라이언트 하나로 여러 파일을 동시에 받습니다.
+- 파일 이름은 내용의 sha256 앞부분이라, 같은 이미지는 URL이 달라도 한 번만 저장됩니다.
+- 받은 URL마다 ETag/Last-Modified를 기록해 두고, 다시 요청할 때 조건부 요청을 보내 304면
+  기존 파일을 그대로 씁니다.
+- max_dimension이 있고 Pillow가 설치되어 있으면 긴 변이 그 크기를 넘는 이미지를 줄여 저장합니다.
+- offline이면 요청 없이 이미 받아 둔 파일만 돌려줍니다 (저장된 원본 재생용).
+
+파이프라인은 트윗이 분석 대기열에 들어갈 때 다운로드를 시작하므로, 분석과 동시에 진행됩니다.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import httpx
+
+import metrics
+
+_CONTENT_TYPE_SUFFIX = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+    "video/mp4": ".mp4",
+}
+
+
+class MediaDownloader:
+    """
+    첨부 미디어 다운로더.
+
+    사용 예:
+        async with MediaDownloader(output_dir / "attachments", manifest_file) as media:
+            paths = await media.download_all(tweet.media_urls)
+
+    Args:
+        attachments_dir: 파일을 저장할 디렉토리
+        manifest_file: URL → 파일 이름/ETag/Last-Modified 기록 (조건부 요청용)
+        max_connections: 동시에 받을 파일 수
+        max_dimension: 이미지 긴 변의 최대 픽셀 (0이면 원본 그대로)
+        verify_ssl: SSL 인증서 검증 여부
+        offline: 요청 없이 이미 받아 둔 파일만 돌려줌 (main.py --replay)
+    """
+
+    def __init__(
+        self,
+        attachments_dir: Path,
+        manifest_file: Path,
+        max_connections: int = 8,
+        max_dimension: int = 0,
+        verify_ssl: bool = True,
+        offline: bool = False,
+    ):
+        self.attachments_dir = attachments_dir
+        self.manifest_file = manifest_file
+        self.max_dimension = max_dimension
+        self.offline = offline
+        self.downloaded = 0  # 새로 저장한 파일 수
+        self.reused = 0  # 304 또는 같은 내용이라 기존 파일을 쓴 수
+        self.failed = 0
+
+        self._client = httpx.AsyncClient(
+            verify=verify_ssl,
+            follow_redirects=True,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=max(1, max_connections), max_keepalive_connections=max(1, max_connections)),
+        )
+        self._manifest: dict[str, dict] = self._load_manifest()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._can_resize = max_dimension > 0 and importlib.util.find_spec("PIL") is not None
+        if max_dimension > 0 and not self._can_resize:
+            print("  ↳ Pillow 미설치: 이미지 축소 없이 원본 저장 ('pip install pillow')")
+
+    async def __aenter__(self) -> "MediaDownloader":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def download_all(self, urls: list[str]) -> list[Path | None]:
+        """URL 목록을 동시에 받습니다. 결과는 입력 순서와 같고, 실패한 항목은 None."""
+        return list(await asyncio.gather(*(self.download(url) for url in urls)))
+
+    async def download(self, url: str) -> Path | None:
+        """URL 하나를 받아 로컬 경로를 반환합니다. 같은 URL을 동시에 요청하면 한 번만 받습니다."""
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.create_task(self._download(url))
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def close(self):
+        await self._client.aclose()
+        self.save()
+        if self.downloaded or self.reused or self.failed:
+            print(f"  미디어: 새로 저장 {self.downloaded} / 재사용 {self.reused} / 실패 {self.failed}")
+
+    # ── 내부 ─────────────────────────────────────────
+
+    async def _download(self, url: str) -> Path | None:
+        known = self._manifest.get(url)
+        local = self.attachments_dir / known["file"] if known else None
+        headers = {}
+        if local is not None and local.exists():
+            if known.get("etag"):
+                headers["If-None-Match"] = known["etag"]
+            if known.get("last_modified"):
+                headers["If-Modified-Since"] = known["last_modified"]
+        elif self.offline:
+            return None  # 받아 둔 파일이 없으면 원격 URL 유지
+        if self.offline:
+            self.reused += 1
+            return local
+
+        started = time.perf_counter()
+        try:
+            response = await self._client.get(url, headers=headers)
+            if response.status_code == 304 and known:
+                self.reused += 1
+                metrics.record("media", seconds=time.perf_counter() - started, status=304)
+                return self.attachments_dir / known["file"]
+            response.raise_for_status()
+            data = response.content
+            path, stored = await asyncio.to_thread(self._store, data, _suffix(url, response))
+        except Exception as e:
+            self.failed += 1
+            print(f"    ✗ 미디어 다운로드 실패 ({url}): {e}")
+            return None
+
+        if stored:
+            self.downloaded += 1
+        else:
+            self.reused += 1
+        self._manifest[url] = {
+            "file": path.name,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        metrics.record("media", seconds=time.perf_counter() - started, status=response.status_code, bytes=len(data))
+        return path
+
+    def _store(self, data: bytes, suffix: str) -> tuple[Path, bool]:
+        """내용 해시로 이름을 정해 저장합니다. 이미 있으면 (경로, False)."""
+        # 이름은 원본 내용 기준 — 축소 여부와 관계없이 같은 원본은 같은 파일
+        path = self.attachments_dir / f"{hashlib.sha256(data).hexdigest()[:20]}{suffix}"
+        if path.exists():
+            return path, False
+        if self._can_resize and suffix in (".jpg", ".png", ".webp"):
+            data = _downscale(data, self.max_dimension)
+        self.attachments_dir.mkdir(parents=True, exist_ok=True)
+        # 같은 내용을 다른 URL로 동시에 받는 경우가 있어 임시 파일 이름은 스레드마다 다르게
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        return path, True
+
+    def _load_manifest(self) -> dict[str, dict]:
+        if not self.manifest_file.exists():
+            return {}
+        try:
+            return json.loads(self.manifest_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        """URL 기록을 저장합니다 (상주 모드에서는 동기화마다 호출)."""
+        tmp = self.manifest_file.with_name(self.manifest_file.name + ".tmp")
+        tmp.write_text(json.dumps(self._manifest, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.manifest_file)
+
+
+def _suffix(url: str, response: httpx.Response) -> str:
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+    if content_type in _CONTENT_TYPE_SUFFIX:
+        return _CONTENT_TYPE_SUFFIX[content_type]
+    suffix = Path(urlparse(url).path).suffix.lower()
+    return ".jpg" if suffix == ".jpeg" else suffix or ".bin"
+
+
+def _downscale(data: bytes, max_dimension: int) -> bytes:
+    """긴 변이 max_dimension을 넘으면 비율을 유지해 줄입니다. 실패하면 원본 그대로."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if max(img.size) <= max_dimension:
+                return data
+            fmt = img.format
+            img.thumbnail((max_dimension, max_dimension))
+            out = io.BytesIO()
+            options = {"quality": 85} if fmt in ("JPEG", "WEBP") else {}
+            img.save(out, format=fmt, **options)
+            return out.getvalue()
+    except Exception:
+        return data
@@ -0,0 +1,228 @@
+"""
+실행 단위/트윗 단위 측정값을 기록합니다.
+
+각 측정값은 METRICS_FILE(sync.log 옆의 metrics.jsonl)에 JSON 한 줄로 쌓이고, 실행이 끝나면
+이벤트별 횟수·합계·p50·p95를 담은 "run" 요약 줄을 남깁니다. prometheus_textfile 설정이 있으면
+같은 요약을 node_exporter textfile 수집기 형식(.prom)으로도 씁니다.
+
+이벤트 이름:
+  cookies        쿠키 로드
+  bookmark_page  북마크 목록 한 페이지 조회
+  tweet_detail   트윗 상세 조회
+  article        X Article 본문 추출
+  llm            Ollama 요청 한 번 (prompt_eval/eval 토큰 수·시간, tokens/sec)
+  llm_route      트윗 하나의 분석을 맡은 모델 경로 (경로·모델·소요 시간, 대체 모델 사용·성공 여부)
+  llm_endpoint   Ollama 엔드포인트별 요청·오류 수와 지연 p50/p95 (실행 끝에 한 번)
+  enrich         트윗 분석 (캐시 적중 포함)
+  enrich_map     긴 글의 조각 요약 단계 (글자 수, 조각 수, 캐시 적중 조각 수)
+  dedup          거의 같은 글의 분석 재사용 (원래 tweet_id, 지문 해밍 거리)
+  note_write     노트 파일 저장
+
+사용 예:
+    metrics.start_run()
+    with metrics.timer("tweet_detail", tweet_id=tid) as m:
+        tweet = await client.get_tweet_by_id(tid)
+        m["replies"] = len(tweet.replies or [])
+    metrics.finish_run(notes=3)
+
+실행 중이 아니거나 metrics 설정이 꺼져 있으면 모든 호출은 아무 일도 하지 않습니다.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from config import METRICS_ENABLED, METRICS_FILE, PROMETHEUS_TEXTFILE
+
+
+class Metrics:
+    """
+    한 번의 동기화 실행 동안 측정값을 모읍니다.
+
+    Args:
+        path: JSON lines 파일 경로 (이어 씀)
+        prometheus_path: 실행 요약을 쓸 .prom 파일 경로 (None이면 생략)
+    """
+
+    def __init__(self, path: Path, prometheus_path: Path | None = None):
+        self.path = path
+        self.prometheus_path = prometheus_path
+        self.run_id = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self.started = time.perf_counter()
+        self._seconds: dict[str, list[float]] = defaultdict(list)
+        self._tokens: dict[str, int] = defaultdict(int)  # prompt / eval 토큰 합계
+        self._token_seconds: dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, event: str, **fields):
+        """측정값 한 줄을 기록합니다. seconds 필드는 이벤트별 분포에 더해집니다."""
+        line = {"ts": round(time.time(), 3), "run": self.run_id, "event": event}
+        line.update({k: round(v, 4) if isinstance(v, float) else v for k, v in fields.items()})
+        with self._lock:
+            if isinstance(fields.get("seconds"), (int, float)):
+                self._seconds[event].append(fields["seconds"])
+            if event == "llm":
+                for kind in ("prompt_eval", "eval"):
+                    self._tokens[kind] += fields.get(f"{kind}_count", 0)
+                    self._token_seconds[kind] += fields.get(f"{kind}_seconds", 0.0)
+            self._file.write(json.dumps(line, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    @contextmanager
+    def timer(self, event: str, **fields):
+        """블록 실행 시간을 seconds로 기록합니다. yield된 dict에 필드를 더 넣을 수 있습니다."""
+        started = time.perf_counter()
+        try:
+            yield fields
+        except BaseException as e:
+            fields["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(event, seconds=time.perf_counter() - started, **fields)
+
+    def summary(self) -> dict:
+        """이벤트별 횟수·합계·p50·p95와 LLM 토큰 처리량."""
+        with self._lock:
+            stages = {
+                event: {
+                    "count": len(values),
+                    "sum": round(sum(values), 4),
+                    "p50": round(percentile(values, 50), 4),
+                    "p95": round(percentile(values, 95), 4),
+                }
+                for event, values in self._seconds.items()
+            }
+            tokens = {
+                kind: {
+                    "count": self._tokens[kind],
+                    "seconds": round(self._token_seconds[kind], 4),
+                    "per_sec": round(self._tokens[kind] / self._token_seconds[kind], 2)
+                    if self._token_seconds[kind] else 0.0,
+                }
+                for kind in ("prompt_eval", "eval")
+            }
+        return {"stages": stages, "tokens": tokens}
+
+    def close(self, **fields) -> dict:
+        """실행 요약을 기록하고 파일을 닫습니다."""
+        summary = self.summary()
+        if fields.get("notes"):
+            # 노트 하나당 프롬프트 평가 시간 — 지침 KV 캐시 재사용 효과를 실행끼리 비교
+            summary["prompt_eval_seconds_per_note"] = round(
+                summary["tokens"]["prompt_eval"]["seconds"] / fields["notes"], 4
+            )
+        self.record("run", seconds=time.perf_counter() - self.started, **fields, **summary)
+        with self._lock:
+            self._file.close()
+        if self.prometheus_path is not None:
+            try:
+                self._write_prometheus(summary, fields)
+            except OSError as e:
+                print(f"  ✗ Prometheus 파일 저장 실패: {e}")
+        return summary
+
+    def _write_prometheus(self, summary: dict, fields: dict):
+        lines = [
+            "# HELP xto_stage_seconds 마지막 실행의 단계별 소요 시간",
+            "# TYPE xto_stage_seconds summary",
+        ]
+        for event, s in sorted(summary["stages"].items()):
+            lines += [
+                f'xto_stage_seconds{{stage="{event}",quantile="0.5"}} {s["p50"]}',
+                f'xto_stage_seconds{{stage="{event}",quantile="0.95"}} {s["p95"]}',
+                f'xto_stage_seconds_sum{{stage="{event}"}} {s["sum"]}',
+                f'xto_stage_seconds_count{{stage="{event}"}} {s["count"]}',
+            ]
+        lines += [
+            "# HELP xto_llm_tokens 마지막 실행에서 Ollama가 평가/생성한 토큰 수",
+            "# TYPE xto_llm_tokens gauge",
+        ]
+        for kind, t in summary["tokens"].items():
+            lines.append(f'xto_llm_tokens{{kind="{kind}"}} {t["count"]}')
+        lines += [
+            "# HELP xto_llm_tokens_per_second 마지막 실행의 평균 토큰 처리 속도",
+            "# TYPE xto_llm_tokens_per_second gauge",
+        ]
+        for kind, t in summary["tokens"].items():
+            lines.append(f'xto_llm_tokens_per_second{{kind="{kind}"}} {t["per_sec"]}')
+        if "prompt_eval_seconds_per_note" in summary:
+            lines += [
+                "# HELP xto_llm_prompt_eval_seconds_per_note 마지막 실행의 노트당 프롬프트 평가 시간",
+                "# TYPE xto_llm_prompt_eval_seconds_per_note gauge",
+                f"xto_llm_prompt_eval_seconds_per_note {summary['prompt_eval_seconds_per_note']}",
+            ]
+        lines += [
+            "# HELP xto_last_run_notes 마지막 실행에서 만든 노트 수",
+            "# TYPE xto_last_run_notes gauge",
+            f"xto_last_run_notes {fields.get('notes', 0)}",
+            "# HELP xto_last_run_timestamp_seconds 마지막 실행 종료 시각",
+            "# TYPE xto_last_run_timestamp_seconds gauge",
+            f"xto_last_run_timestamp_seconds {time.time():.0f}",
+        ]
+        # 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일에 쓰고 교체
+        tmp = self.prometheus_path.with_name(self.prometheus_path.name + ".tmp")
+        tmp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp, self.prometheus_path)
+
+
+def percentile(values, pct: float) -> float:
+    """nearest-rank 백분위수 (값이 없으면 0)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1]
+
+
+def duration(seconds: float) -> str:
+    """사람이 읽을 남은/걸린 시간 (N초, N분 N초, N시간 N분)."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}시간 {minutes}분"
+    return f"{minutes}분 {secs}초" if minutes else f"{secs}초"
+
+
+# ── 모듈 공용 기록기 ─────────────────────────────────
+
+_current: Metrics | None = None
+
+
+def start_run() -> Metrics | None:
+    """실행 단위 기록을 시작합니다. metrics 설정이 꺼져 있으면 None."""
+    global _current
+    if not METRICS_ENABLED:
+        return None
+    if _current is not None:
+        _current.close()
+    _current = Metrics(METRICS_FILE, PROMETHEUS_TEXTFILE)
+    return _current
+
+
+def finish_run(**fields) -> dict | None:
+    """실행 요약을 남기고 기록을 마칩니다."""
+    global _current
+    if _current is None:
+        return None
+    current, _current = _current, None
+    return current.close(**fields)
+
+
+def record(event: str, **fields):
+    if _current is not None:
+        _current.record(event, **fields)
+
+
+@contextmanager
+def timer(event: str, **fields):
+    if _current is None:
+        yield fields
+        return
+    with _current.timer(event, **fields) as f:
+        yield f
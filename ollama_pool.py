@@ -0,0 +1,234 @@
+"""
+여러 Ollama 엔드포인트에 LLM 요청을 나눠 보내는 연결 풀.
+
+ollama_url에 주소를 여러 개 주면 AsyncEnricher가 이 풀로 요청을 보냅니다.
+  - 라우팅: 지금 처리 중인 요청이 가장 적은 엔드포인트 (같으면 최근 지연이 짧은 쪽)
+  - 동시 요청 제한: 엔드포인트마다 concurrency개까지. 모두 차 있으면 자리가 날 때까지 기다림
+  - 장애 전환: 연결 실패·타임아웃·5xx가 나면 그 엔드포인트를 빼고 다른 엔드포인트로 다시 보냄
+  - 상태 확인: 빠진 엔드포인트는 백그라운드에서 /api/version으로 확인해, 응답하면 다시 넣음
+  - 통계: 엔드포인트별 요청·오류 수와 지연 p50/p95
+
+스트림 요청은 응답 헤더를 받기 전에 난 오류만 다른 엔드포인트로 넘깁니다. 이미 받던 스트림이
+끊기면 예외를 그대로 올려 호출 측(AsyncEnricher)의 폴백 처리를 따릅니다.
+
+모든 엔드포인트가 빠졌으면 가장 먼저 빠진 엔드포인트로라도 보내므로, 주소가 하나일 때는 풀이
+없을 때와 똑같이 동작합니다.
+"""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+
+import httpx
+
+import metrics
+
+# 다른 엔드포인트로 다시 보낼 오류 (HTTPStatusError는 5xx일 때만 직접 던짐)
+_RETRYABLE = (httpx.TransportError, httpx.HTTPStatusError)
+_MAX_PROBE_INTERVAL = 300.0  # 상태 확인 간격 상한(초)
+
+
+class Endpoint:
+    """엔드포인트 하나의 연결·부하·통계."""
+
+    def __init__(self, url: str, concurrency: int, client: httpx.AsyncClient):
+        self.url = url
+        self.concurrency = max(1, concurrency)
+        self.client = client
+        self.outstanding = 0
+        self.healthy = True
+        self.failed_at = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.latencies: deque[float] = deque(maxlen=1000)
+        self._ewma: float | None = None  # 최근 지연 (라우팅 동점 처리용)
+
+    def record(self, seconds: float):
+        self.latencies.append(seconds)
+        self._ewma = seconds if self._ewma is None else 0.8 * self._ewma + 0.2 * seconds
+
+    def rank(self) -> tuple[int, float]:
+        return self.outstanding, self._ewma or 0.0
+
+    def stats(self) -> dict:
+        return {
+            "endpoint": self.url,
+            "requests": self.requests,
+            "errors": self.errors,
+            "healthy": self.healthy,
+            "p50": round(metrics.percentile(self.latencies, 50), 3),
+            "p95": round(metrics.percentile(self.latencies, 95), 3),
+        }
+
+
+class OllamaPool:
+    """
+    여러 Ollama 엔드포인트에 걸친 비동기 요청 풀. httpx.AsyncClient의 post/stream과 같은 모양으로 씁니다.
+
+    사용 예:
+        pool = OllamaPool(["http://box1:11434", "http://box2:11434"], concurrency=2, options={...})
+        response = await pool.post("/api/chat", json=payload)
+        async with pool.stream("POST", "/api/chat", json=payload) as response:
+            ...
+        await pool.aclose()
+
+    Args:
+        urls: 엔드포인트 주소 목록
+        concurrency: 엔드포인트 하나에 동시에 보낼 최대 요청 수
+        options: 엔드포인트마다 만드는 httpx.AsyncClient 옵션 (base_url 제외)
+        probe_interval: 빠진 엔드포인트를 처음 다시 확인할 때까지의 시간(초), 실패할수록 두 배
+    """
+
+    def __init__(self, urls: list[str], concurrency: int = 2, options: dict | None = None, probe_interval: float = 15.0):
+        if not urls:
+            raise ValueError("Ollama 엔드포인트가 없습니다")
+        self.endpoints = [
+            Endpoint(url.rstrip("/"), concurrency, httpx.AsyncClient(base_url=url, **(options or {})))
+            for url in urls
+        ]
+        self.probe_interval = probe_interval
+        self._changed = asyncio.Condition()
+        self._probes: dict[str, asyncio.Task] = {}
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        tried: list[Endpoint] = []
+        while True:
+            endpoint = await self._acquire(tried)
+            started = time.perf_counter()
+            try:
+                response = await endpoint.client.post(path, **kwargs)
+                _raise_for_server_error(response)
+            except _RETRYABLE as e:
+                tried.append(endpoint)
+                self._failed(endpoint, e, retry=len(tried) < len(self.endpoints))
+                if len(tried) >= len(self.endpoints):
+                    raise
+                continue
+            else:
+                self._succeeded(endpoint, time.perf_counter() - started)
+                return response
+            finally:
+                await self._release(endpoint)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method: str, path: str, **kwargs):
+        tried: list[Endpoint] = []
+        while True:
+            endpoint = await self._acquire(tried)
+            started = time.perf_counter()
+            try:
+                async with contextlib.AsyncExitStack() as stack:
+                    try:
+                        response = await stack.enter_async_context(endpoint.client.stream(method, path, **kwargs))
+                        if response.status_code >= 500:
+                            await response.aread()
+                        _raise_for_server_error(response)
+                    except _RETRYABLE as e:
+                        tried.append(endpoint)
+                        self._failed(endpoint, e, retry=len(tried) < len(self.endpoints))
+                        if len(tried) >= len(self.endpoints):
+                            raise
+                        continue
+                    try:
+                        yield response
+                    except httpx.TransportError as e:  # 받던 스트림이 끊김 — 다시 보내지 않음
+                        self._failed(endpoint, e, retry=False)
+                        raise
+                    self._succeeded(endpoint, time.perf_counter() - started)
+                    return
+            finally:
+                await self._release(endpoint)
+
+    def stats(self) -> list[dict]:
+        return [e.stats() for e in self.endpoints]
+
+    def summary(self) -> str:
+        parts = [
+            f"{s['endpoint']} {s['requests']}건"
+            + (f" (오류 {s['errors']})" if s["errors"] else "")
+            + f" p50 {s['p50']:.1f}s p95 {s['p95']:.1f}s"
+            + ("" if s["healthy"] else " ✗")
+            for s in self.stats()
+        ]
+        return "Ollama 엔드포인트: " + ", ".join(parts)
+
+    async def aclose(self):
+        # 상태 확인이 닫힌 클라이언트를 쓰지 않도록 취소가 끝날 때까지 기다린 뒤 닫음
+        probes = list(self._probes.values())
+        self._probes.clear()
+        for task in probes:
+            task.cancel()
+        await asyncio.gather(*probes, return_exceptions=True)
+        for s in self.stats():
+            metrics.record("llm_endpoint", **s)
+        for endpoint in self.endpoints:
+            await endpoint.client.aclose()
+
+    # ── 내부 ─────────────────────────────────────────
+
+    async def _acquire(self, tried: list[Endpoint]) -> Endpoint:
+        """보낼 엔드포인트를 골라 자리 하나를 차지합니다. 모두 차 있으면 기다립니다."""
+        async with self._changed:
+            while True:
+                candidates = [e for e in self.endpoints if e not in tried]
+                healthy = [e for e in candidates if e.healthy]
+                if not healthy:
+                    # 모두 빠졌으면 가장 먼저 빠진 것으로라도 시도 (주소가 하나일 때와 같은 동작)
+                    healthy = sorted(candidates, key=lambda e: e.failed_at)[:1]
+                free = [e for e in healthy if e.outstanding < e.concurrency]
+                if free:
+                    endpoint = min(free, key=Endpoint.rank)
+                    endpoint.outstanding += 1
+                    endpoint.requests += 1
+                    return endpoint
+                await self._changed.wait()
+
+    async def _release(self, endpoint: Endpoint):
+        async with self._changed:
+            endpoint.outstanding -= 1
+            self._changed.notify_all()
+
+    def _succeeded(self, endpoint: Endpoint, seconds: float):
+        endpoint.record(seconds)
+        if not endpoint.healthy:
+            self._restore(endpoint)
+
+    def _failed(self, endpoint: Endpoint, error: Exception, retry: bool):
+        endpoint.errors += 1
+        endpoint.failed_at = time.monotonic()
+        if len(self.endpoints) == 1:
+            return  # 넘길 곳이 없으니 상태 확인도 하지 않음
+        if endpoint.healthy:
+            endpoint.healthy = False
+            print(f"  ✗ Ollama {endpoint.url} 오류: {error!r}" + (" — 다른 엔드포인트로 전환" if retry else ""))
+        if endpoint.url not in self._probes:
+            self._probes[endpoint.url] = asyncio.create_task(self._probe(endpoint))
+
+    def _restore(self, endpoint: Endpoint):
+        endpoint.healthy = True
+        print(f"  ✓ Ollama {endpoint.url} 복구")
+        task = self._probes.pop(endpoint.url, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _probe(self, endpoint: Endpoint):
+        """빠진 엔드포인트가 다시 응답할 때까지 간격을 늘려 가며 확인합니다."""
+        delay = self.probe_interval
+        while not endpoint.healthy:
+            await asyncio.sleep(delay)
+            try:
+                response = await endpoint.client.get("/api/version", timeout=5.0)
+                response.raise_for_status()
+            except httpx.HTTPError:
+                delay = min(delay * 2, _MAX_PROBE_INTERVAL)
+                continue
+            async with self._changed:
+                self._restore(endpoint)
+                self._changed.notify_all()
+
+
+def _raise_for_server_error(response: httpx.Response):
+    """5xx면 HTTPStatusError (4xx는 호출 측의 raise_for_status에 맡김)."""
+    if response.status_code >= 500:
+        response.raise_for_status()
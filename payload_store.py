@@ -0,0 +1,120 @@
+"""
+X에서 받은 원본 응답(트윗 상세, 쓰레드 답글, Article 본문)을 압축해 디스크에 보관합니다.
+
+노트에는 Tweet으로 평탄화된 결과만 남기 때문에, 모델이나 프롬프트를 바꿔 다시 분석하려면
+X를 다시 불러야 했습니다. 이 저장소가 있으면 main.py --replay가 네트워크 요청 없이 같은
+Tweet을 다시 만들어 내므로, 재처리 속도는 LLM에만 좌우됩니다. 벤치마크에 실제 데이터를
+쓰는 용도로도 씁니다.
+
+원본은 JSON을 zlib으로 압축해 tweet_id 키로 SQLite 한 파일에 저장하고, max_age_days가 지난
+항목은 지웁니다.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+
+
+class PayloadStore:
+    """
+    tweet_id → 원본 응답 저장소.
+
+    값은 {"tweet": 상세 원본, "thread": [답글 원본, ...], "article": Article 본문 또는 None} 형태입니다.
+
+    Args:
+        path: 저장 파일 경로
+        max_age_days: 저장 후 이 기간이 지난 항목은 삭제 (0이면 무제한)
+    """
+
+    VERSION = 1
+    # put 몇 번마다 정리할지
+    EVICT_EVERY = 200
+
+    def __init__(self, path: Path, max_age_days: float = 180):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.stored = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS payloads ("
+            " tweet_id TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS payloads_fetched ON payloads (fetched_at)")
+        self.evict()
+
+    def put(self, tweet_id: str, payload: dict):
+        """원본 하나를 압축해 저장합니다. 압축과 커밋이 막히므로 비동기 코드에서는 스레드로 부르세요."""
+        raw = json.dumps({"v": self.VERSION, **payload}, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO payloads (tweet_id, data, fetched_at) VALUES (?, ?, ?)",
+                (str(tweet_id), zlib.compress(raw.encode("utf-8"), 6), time.time()),
+            )
+            self._db.commit()
+            self.stored += 1
+            self._puts += 1
+        if self._puts % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def get(self, tweet_id: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, fetched_at FROM payloads WHERE tweet_id = ?", (str(tweet_id),)
+            ).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+        return _decode(row[0])
+
+    def items(self, limit: int = 0) -> Iterator[tuple[str, dict]]:
+        """저장된 (tweet_id, 원본)을 최근에 받은 것부터 돌려줍니다. 한 번에 하나씩 풀어 메모리 일정."""
+        cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days else 0
+        with self._lock:
+            ids = [
+                row[0]
+                for row in self._db.execute(
+                    "SELECT tweet_id FROM payloads WHERE fetched_at >= ? ORDER BY fetched_at DESC LIMIT ?",
+                    (cutoff, limit or -1),
+                )
+            ]
+        for tweet_id in ids:
+            payload = self.get(tweet_id)
+            if payload is not None:
+                yield tweet_id, payload
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM payloads").fetchone()[0]
+
+    def evict(self):
+        """기간이 지난 항목을 삭제합니다."""
+        if not self.max_age_days:
+            return
+        with self._lock:
+            cutoff = time.time() - self.max_age_days * 86400
+            self._db.execute("DELETE FROM payloads WHERE fetched_at < ?", (cutoff,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _expired(self, fetched_at: float) -> bool:
+        return bool(self.max_age_days) and fetched_at < time.time() - self.max_age_days * 86400
+
+
+def _decode(blob: bytes) -> dict | None:
+    try:
+        payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+    except (zlib.error, ValueError):
+        return None
+    return payload if payload.get("v") == PayloadStore.VERSION else None
@@ -0,0 +1,222 @@
+"""
+수집 → 분석 → 저장 단계를 동시에 돌리는 파이프라인.
+
+각 단계는 크기가 제한된 큐로 연결되어 있어, 가장 느린 단계가 전체 속도를 결정하고
+앞 단계는 큐가 차면 자연스럽게 기다립니다 (메모리 사용량 일정).
+
+    fetch_bookmarks (스트림) ──▶ [enrich_q] ──▶ 분석 워커 × N ──▶ [write_q] ──▶ 저장 워커 × M
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import metrics
+from dedup import NearDuplicateIndex
+from enricher import AsyncEnricher, is_fallback
+from fetcher import Tweet
+from media import MediaDownloader
+from state import State
+from title_index import TitleIndex
+from vault_index import VaultIndex
+from writer import write_note
+
+_DONE = object()  # 단계 종료 신호
+
+
+async def run_pipeline(
+    tweets: AsyncIterator[Tweet],
+    state: State,
+    output_dir: Path,
+    enricher: AsyncEnricher,
+    enrich_workers: int = 1,
+    write_workers: int = 2,
+    queue_size: int = 8,
+    batch_size: int = 1,
+    stop: asyncio.Event | None = None,
+    index: VaultIndex | None = None,
+    update_existing: bool = False,
+    media: MediaDownloader | None = None,
+    skip_processed: bool = True,
+    dedup: NearDuplicateIndex | None = None,
+    titles: TitleIndex | None = None,
+) -> int:
+    """
+    트윗 스트림을 분석해 노트로 저장합니다. 생성한 노트 수를 반환합니다.
+
+    batch_size가 1보다 크면 분석 워커가 대기열에 쌓인 트윗을 최대 batch_size개까지 모아
+    enricher.enrich_batch로 한 번에 보냅니다. 이미 처리된 트윗은 건너뜁니다 (skip_processed가
+    False면 처리 여부와 관계없이 모두 다시 분석 — 저장된 원본을 재생할 때).
+    stop이 설정되면 새 트윗을 더 받지 않고, 이미 대기열에 들어간 작업만 마친 뒤 끝냅니다.
+    index가 주어지면 상태 파일에 없더라도 이미 노트가 있는 트윗은 분석하지 않고 처리 완료로
+    표시합니다 (update_existing이면 다시 분석해 기존 노트를 갱신).
+    media가 주어지면 트윗이 분석 대기열에 들어갈 때 첨부 미디어 다운로드를 시작하고,
+    저장 단계에서 결과를 기다려 노트가 로컬 파일을 링크하게 합니다.
+    dedup이 주어지면 이미 노트로 만든 글과 거의 같은 트윗은 LLM을 부르지 않고 그 노트의 분석
+    결과를 재사용하며 (연결 후보 맨 앞에 원래 노트 링크), 새로 분석해 저장한 트윗은 색인에 넣습니다.
+    titles가 주어지면 연결 후보를 볼트의 실제 노트 제목·별칭에 맞춰 링크합니다.
+    개별 트윗의 분석/저장 실패는 출력만 하고 계속 진행하며,
+    스트림 자체의 오류(북마크 목록 조회 실패 등)는 진행 중인 작업을 마친 뒤 다시 발생시킵니다.
+    """
+    enrich_workers = max(1, enrich_workers)
+    write_workers = max(1, write_workers)
+    enrich_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    write_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    written = 0
+    media_tasks: dict[str, asyncio.Task] = {}  # tweet_id → 미디어 다운로드 (분석과 동시에 진행)
+    reused: set[str] = set()  # 거의 같은 글의 분석을 재사용한 tweet_id (색인에 다시 넣지 않음)
+
+    async def feed():
+        try:
+            async for tweet in tweets:
+                if stop is not None and stop.is_set():
+                    print("  종료 요청 — 진행 중인 작업만 마무리합니다")
+                    break
+                if skip_processed and state.is_processed(tweet.id):
+                    continue
+                existing = index.get(tweet.id) if index is not None else None
+                if existing is not None and not update_existing:
+                    print(f"  ↳ 이미 노트 있음: {existing.name}")
+                    state.mark_processed(tweet.id)
+                    continue
+                if media is not None and tweet.media_urls:
+                    media_tasks[tweet.id] = asyncio.create_task(media.download_all(tweet.media_urls))
+                await enrich_q.put(tweet)
+        finally:
+            if hasattr(tweets, "aclose"):
+                await tweets.aclose()
+            for _ in range(enrich_workers):
+                await enrich_q.put(_DONE)
+
+    def reuse(tweet: Tweet) -> dict | None:
+        """거의 같은 글의 노트가 이미 있으면 그 분석 결과 (원래 노트 링크를 연결 후보 맨 앞에)."""
+        exists = (lambda tweet_id: index.get(tweet_id) is not None) if index is not None else None
+        match = dedup.find(tweet.id, tweet.text, exists=exists)
+        if match is None:
+            return None
+        enrichment = dict(match["enrichment"])
+        original = index.get(match["tweet_id"]) if index is not None else None
+        if original is not None:
+            links = [link for link in enrichment.get("wiki_links", []) if link != original.stem]
+            enrichment["wiki_links"] = [original.stem, *links]
+        short = tweet.text[:50].replace("\n", " ")
+        source = original.name if original is not None else match["tweet_id"]
+        print(f"  ↳ 처리: @{tweet.author_handle} — {short}...")
+        print(f"    ↳ 거의 같은 글: {source}의 분석 재사용 (거리 {match['distance']})")
+        metrics.record("dedup", tweet_id=tweet.id, original=match["tweet_id"], distance=match["distance"])
+        reused.add(tweet.id)
+        return enrichment
+
+    async def enrich():
+        while (tweet := await enrich_q.get()) is not _DONE:
+            # 배치 모드: 이미 대기 중인 트윗을 기다리지 않고 함께 가져감
+            batch = [tweet]
+            finished = False
+            while len(batch) < batch_size and not enrich_q.empty():
+                queued = enrich_q.get_nowait()
+                if queued is _DONE:
+                    finished = True
+                    break
+                batch.append(queued)
+
+            # 워커 하나가 예외로 죽으면 저장 단계가 종료 신호를 못 받으므로 배치 단위로 막음
+            try:
+                await analyze(batch)
+            except Exception as e:
+                print(f"    ✗ 분석 실패 ({', '.join(t.id for t in batch)}): {e}")
+            if finished:
+                break
+
+    async def analyze(batch: list[Tweet]):
+        """배치 하나를 분석해 저장 대기열에 넣습니다 (거의 같은 글은 LLM 없이 재사용)."""
+        if dedup is not None:
+            fresh = []
+            for tweet in batch:
+                try:
+                    enrichment = reuse(tweet)
+                except Exception as e:
+                    print(f"  ↳ 거의 같은 글 조회 실패 ({tweet.id}): {e}")
+                    enrichment = None
+                if enrichment is None:
+                    fresh.append(tweet)
+                else:
+                    await write_q.put((tweet, enrichment))
+            batch = fresh
+            if not batch:
+                return
+
+        for tweet in batch:
+            short = tweet.text[:50].replace("\n", " ")
+            print(f"  ↳ 처리: @{tweet.author_handle} — {short}...")
+        with metrics.timer("enrich", tweet_id=batch[0].id, items=len(batch)):
+            if len(batch) == 1:
+                enrichments = [await enricher.enrich(
+                    tweet_text=batch[0].text,
+                    author_handle=batch[0].author_handle,
+                    author_name=batch[0].author_name,
+                )]
+            else:
+                enrichments = await enricher.enrich_batch(
+                    [(t.text, t.author_handle, t.author_name) for t in batch]
+                )
+
+        for tweet, enrichment in zip(batch, enrichments):
+            await write_q.put((tweet, enrichment))
+
+    async def write(executor: ThreadPoolExecutor):
+        while (job := await write_q.get()) is not _DONE:
+            # 대기열에 쌓여 있던 만큼(최대 queue_size개) 이어서 저장하고, 처리 표시는 한 번의 fsync로 기록
+            with state.batch():
+                await save(executor, job)
+                for _ in range(queue_size - 1):
+                    if write_q.empty():
+                        break
+                    job = write_q.get_nowait()
+                    if job is _DONE:
+                        return
+                    await save(executor, job)
+
+    async def save(executor: ThreadPoolExecutor, job: tuple[Tweet, dict]):
+        nonlocal written
+        tweet, enrichment = job
+        media_paths = None
+        if tweet.id in media_tasks:
+            media_paths = await media_tasks.pop(tweet.id)
+        try:
+            with metrics.timer("note_write", tweet_id=tweet.id):
+                note_path = await asyncio.get_running_loop().run_in_executor(
+                    executor, write_note, tweet, enrichment, output_dir, index, media_paths, titles
+                )
+        except Exception as e:
+            print(f"    ✗ 노트 저장 실패 ({tweet.id}): {e}")
+            return
+        # State는 이벤트 루프 스레드에서만 갱신
+        state.mark_processed(tweet.id)
+        if dedup is not None and tweet.id not in reused and not is_fallback(enrichment):
+            dedup.add(tweet.id, tweet.text, enrichment)
+        written += 1
+        print(f"    ✓ {note_path.name}")
+
+    async def enrich_stage():
+        try:
+            await asyncio.gather(*(enrich() for _ in range(enrich_workers)))
+        finally:
+            # 분석 단계가 어떻게 끝나든 저장 워커가 기다리다 멈추지 않게
+            for _ in range(write_workers):
+                await write_q.put(_DONE)
+
+    with ThreadPoolExecutor(max_workers=write_workers, thread_name_prefix="writer") as executor:
+        results = await asyncio.gather(
+            feed(),
+            enrich_stage(),
+            *(write(executor) for _ in range(write_workers)),
+            return_exceptions=True,
+        )
+    # 분석에 실패해 저장 단계까지 오지 않은 트윗의 다운로드도 끝나길 기다림
+    await asyncio.gather(*media_tasks.values(), return_exceptions=True)
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return written
@@ -0,0 +1,230 @@
+"""
+X(twikit) 요청 앞에서 엔드포인트별 요청 한도를 지키는 스케줄러.
+
+X는 엔드포인트마다 15분 창 단위로 요청 수를 제한하고, 넘으면 429를 돌려줍니다. 예전에는 429가
+북마크 목록에서 나면 "쿠키 만료"로 실행 전체가 멈췄고, 상세 조회에서 나면 얇은 북마크 항목으로
+노트를 만들어 품질이 조용히 떨어졌습니다.
+
+ScheduledClient는 twikit Client를 감싸서
+  - 엔드포인트마다 토큰 버킷(한도 / 창)으로 요청 간격을 맞추고,
+  - 응답 헤더(x-rate-limit-remaining/reset)로 버킷을 서버 값에 맞추며,
+  - 429를 받으면 재설정 시각까지 그 엔드포인트만 멈췄다가 같은 요청을 다시 보냅니다.
+기다리는 요청은 우선순위 순으로 풀려나므로, 북마크 본문 상세 조회가 쓰레드 이어 받기보다
+먼저 나갑니다. 재설정까지 max_wait보다 오래 남았으면 기다리지 않고 RateLimited를 던집니다.
+
+요청 한도(RateLimited)와 인증 실패(AuthError)는 서로 다른 예외로 구분합니다.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+
+import metrics
+
+WINDOW = 15 * 60  # X 요청 한도 창(초)
+
+# httpx 요청 URL 경로 → 버킷 이름
+_ENDPOINTS = {
+    "/Bookmarks": "bookmarks",
+    "/TweetDetail": "tweet_detail",
+}
+
+
+class AuthError(RuntimeError):
+    """X.com 인증 실패 (쿠키 만료 등). 쿠키를 다시 읽어야 합니다."""
+
+
+class RateLimited(RuntimeError):
+    """요청 한도 초과. 재설정까지 max_wait보다 오래 남아 기다리지 않은 경우."""
+
+    def __init__(self, endpoint: str, wait: float):
+        super().__init__(f"X 요청 한도 초과 ({endpoint}) — {wait / 60:.0f}분 뒤 재설정")
+        self.endpoint = endpoint
+        self.wait = wait
+
+
+def is_auth_error(e: Exception) -> bool:
+    try:
+        from twikit.errors import Unauthorized
+        if isinstance(e, Unauthorized):
+            return True
+    except ImportError:
+        pass
+    return "401" in str(e) or "Could not authenticate" in str(e)
+
+
+def is_rate_limit(e: Exception) -> bool:
+    try:
+        from twikit.errors import TooManyRequests
+        if isinstance(e, TooManyRequests):
+            return True
+    except ImportError:
+        pass
+    return "status: 429" in str(e)
+
+
+class TokenBucket:
+    """
+    엔드포인트 하나의 토큰 버킷. 토큰은 limit / window 속도로 차고, 최대 limit개까지 모입니다.
+
+    acquire는 토큰이 생길 때까지 기다리며, 기다리는 요청은 (우선순위, 도착 순)으로 풀려납니다.
+    """
+
+    def __init__(self, name: str, limit: int, window: float = WINDOW, max_wait: float = WINDOW):
+        self.name = name
+        self.limit = max(1, limit)
+        self.window = window
+        self.rate = self.limit / window
+        self.max_wait = max_wait
+        self.tokens = float(self.limit)
+        self.blocked_until = 0.0  # monotonic — 429/남은 요청 0 이후 재설정 시각
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def acquire(self, priority: int = 0):
+        now = time.monotonic()
+        if self.blocked_until - now > self.max_wait:
+            raise RateLimited(self.name, self.blocked_until - now)
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        if self._timer is None:
+            self._grant()
+        await fut
+
+    def block(self, reset_at: float | None):
+        """429를 받았을 때: 재설정 시각(epoch 초, 없으면 창 하나 뒤)까지 이 엔드포인트를 멈춥니다."""
+        wait = (reset_at - time.time()) if reset_at else WINDOW
+        wait = max(1.0, wait)
+        until = time.monotonic() + wait
+        self.tokens = 0.0
+        if until > self.blocked_until + 1:
+            self.blocked_until = until
+            print(f"  ↳ X 요청 한도 도달 ({self.name}) — {metrics.duration(wait)} 뒤 재개")
+            metrics.record("rate_limit", endpoint=self.name, wait=round(wait, 1))
+        if wait > self.max_wait:
+            # 너무 오래 기다려야 함 — 대기 중인 요청도 바로 실패시켜 호출 측이 판단하게
+            while self._waiters:
+                fut = heapq.heappop(self._waiters)[2]
+                if not fut.done():
+                    fut.set_exception(RateLimited(self.name, wait))
+        self._reschedule()
+
+    def sync(self, remaining: int, limit: int | None, reset_at: float | None):
+        """응답 헤더의 남은 요청 수에 맞춥니다 (다른 실행이 쓴 몫까지 반영)."""
+        self._refill(time.monotonic())
+        if limit:
+            self.limit = limit
+            self.rate = limit / self.window
+        self.tokens = min(self.tokens, float(remaining))
+        if remaining <= 0 and reset_at:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + max(0.0, reset_at - time.time()))
+            self._reschedule()
+
+    # ── 내부 ─────────────────────────────────────────
+
+    def _refill(self, now: float):
+        self.tokens = min(float(self.limit), self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _grant(self):
+        self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            if self._waiters[0][2].done():  # 기다리다 취소된 요청
+                heapq.heappop(self._waiters)
+                continue
+            if now < self.blocked_until:
+                delay = self.blocked_until - now
+            elif self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+            else:
+                self.tokens -= 1
+                heapq.heappop(self._waiters)[2].set_result(None)
+                continue
+            self._timer = asyncio.get_running_loop().call_later(delay, self._grant)
+            return
+
+    def _reschedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._waiters:
+            self._grant()
+
+
+class ScheduledClient:
+    """
+    twikit Client 중 fetcher가 쓰는 호출을 요청 한도 스케줄러를 거쳐 보내는 래퍼.
+
+    그 밖의 속성(http 등)은 감싼 클라이언트의 것을 그대로 돌려줍니다.
+
+    Args:
+        client: twikit Client
+        limits: 버킷 이름 → 15분 창당 요청 수
+        max_wait: 재설정까지 이보다 오래 남았으면 기다리지 않고 RateLimited
+        retries: 429를 받은 요청을 다시 보내는 횟수
+    """
+
+    def __init__(self, client, limits: dict[str, int], max_wait: float = WINDOW, retries: int = 3):
+        self.client = client
+        self.retries = retries
+        self.buckets = {
+            name: TokenBucket(name, limit, max_wait=max_wait) for name, limit in limits.items()
+        }
+        http = getattr(client, "http", None)
+        if http is not None and hasattr(http, "event_hooks"):
+            hooks = http.event_hooks
+            hooks.setdefault("response", []).append(self._on_response)
+            http.event_hooks = hooks
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    async def get_bookmarks(self, count: int = 20, cursor: str | None = None, priority: int = 0):
+        return await self._call("bookmarks", priority, self.client.get_bookmarks, count=count, cursor=cursor)
+
+    async def get_tweet_by_id(self, tweet_id: str, priority: int = 0):
+        return await self._call("tweet_detail", priority, self.client.get_tweet_by_id, tweet_id)
+
+    async def next_page(self, result, priority: int = 1):
+        """twikit Result의 다음 페이지 (쓰레드 "더 보기", 대화 다음 페이지 — TweetDetail 엔드포인트)."""
+        return await self._call("tweet_detail", priority, result.next)
+
+    async def _call(self, endpoint: str, priority: int, fn, *args, **kwargs):
+        bucket = self.buckets.get(endpoint)
+        for attempt in range(self.retries + 1):
+            if bucket is not None:
+                await bucket.acquire(priority)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit(e):
+                    if is_auth_error(e):
+                        raise AuthError(f"X.com 인증 실패: {e}\n쿠키가 만료되었을 수 있습니다.") from e
+                    raise
+                if bucket is None:
+                    raise
+                if attempt == self.retries:
+                    raise RateLimited(endpoint, WINDOW) from e
+                bucket.block(getattr(e, "rate_limit_reset", None))
+
+    async def _on_response(self, response):
+        """응답마다 요청 한도 헤더를 읽어 버킷에 반영합니다 (httpx 이벤트 훅)."""
+        remaining = response.headers.get("x-rate-limit-remaining")
+        if remaining is None:
+            return
+        path = response.request.url.path
+        for suffix, name in _ENDPOINTS.items():
+            if path.endswith(suffix) and name in self.buckets:
+                limit = response.headers.get("x-rate-limit-limit")
+                reset = response.headers.get("x-rate-limit-reset")
+                self.buckets[name].sync(
+                    int(remaining),
+                    int(limit) if limit else None,
+                    float(reset) if reset else None,
+                )
+                return
@@ -16,6 +16,7 @@ DEFAULTS = {
     "ollama_url": "http://localhost:11434",
     "ollama_model": "llama3.2",
     "bookmark_fetch_count": 5,
+    "fetch_concurrency": 4,
     "verify_ssl": True,
 }
 
@@ -42,7 +43,13 @@ CONFIG_ITEMS = [
     {
         "key": "bookmark_fetch_count",
         "label": "북마크 가져오기 개수",
-        "description": "한 번에 가져올 X.com 북마크 수",
+        "description": "한 페이지에 가져올 X.com 북마크 수 (신규가 더 많으면 다음 페이지로 이어감)",
+        "type": "int",
+    },
+    {
+        "key": "fetch_concurrency",
+        "label": "동시 상세 조회 수",
+        "description": "북마크 상세/쓰레드/미디어를 동시에 조회할 최대 개수",
         "type": "int",
     },
     {
@@ -211,21 +218,24 @@ def show_status():
     if inbox_path.exists():
         print(f"  → {inbox_path}")
 
-    # Ollama 확인
-    ollama_url = settings.get("ollama_url", DEFAULTS["ollama_url"])
-    try:
-        import httpx
-        r = httpx.get(f"{ollama_url}/api/tags", timeout=5)
-        if r.status_code == 200:
-            print(f"\nOllama 서버: ✓ 연결됨 ({ollama_url})")
-            models = [m["name"] for m in r.json().get("models", [])]
-            if models:
-                print(f"  로컬 모델: {', '.join(models)}")
-        else:
-            print(f"\nOllama 서버: ✗ 응답 없음 ({ollama_url})")
-    except Exception as e:
-        print(f"\nOllama 서버: ✗ 연결 실패 ({ollama_url})")
-        print(f"  오류: {e}")
+    # Ollama 확인 (주소 목록이면 각각)
+    ollama_urls = settings.get("ollama_url", DEFAULTS["ollama_url"])
+    if isinstance(ollama_urls, str):
+        ollama_urls = [ollama_urls]
+    for ollama_url in ollama_urls:
+        try:
+            import httpx
+            r = httpx.get(f"{ollama_url}/api/tags", timeout=5)
+            if r.status_code == 200:
+                print(f"\nOllama 서버: ✓ 연결됨 ({ollama_url})")
+                models = [m["name"] for m in r.json().get("models", [])]
+                if models:
+                    print(f"  로컬 모델: {', '.join(models)}")
+            else:
+                print(f"\nOllama 서버: ✗ 응답 없음 ({ollama_url})")
+        except Exception as e:
+            print(f"\nOllama 서버: ✗ 연결 실패 ({ollama_url})")
+            print(f"  오류: {e}")
 
 
 if __name__ == "__main__":
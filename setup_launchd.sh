@@ -1,6 +1,7 @@
 #!/bin/bash
 # X.com → Obsidian 자동 동기화 launchd 등록 스크립트
-# 실행: bash setup_launchd.sh
+# 실행: bash setup_launchd.sh            # 1시간마다 실행
+#       bash setup_launchd.sh --daemon   # 상주 모드 (main.py --daemon, 종료되면 재시작)
 #
 # launchd는 macOS 권장 방식:
 # - 컴퓨터 시작 시 자동 로드
@@ -15,6 +16,22 @@ LOG_FILE="$SCRIPT_DIR/sync.log"
 PLIST_NAME="com.user.x-to-obsidian"
 PLIST_PATH="$HOME/Library/LaunchAgents/$PLIST_NAME.plist"
 
+DAEMON=false
+if [ "$1" = "--daemon" ]; then
+    DAEMON=true
+fi
+
+if [ "$DAEMON" = true ]; then
+    EXTRA_ARGS="        <string>--daemon</string>"
+    SCHEDULE=""
+    KEEP_ALIVE="<true/>"
+else
+    EXTRA_ARGS=""
+    SCHEDULE="    <key>StartInterval</key>
+    <integer>3600</integer>"
+    KEEP_ALIVE="<false/>"
+fi
+
 echo "=== X.com → Obsidian launchd 설정 ==="
 echo "스크립트 경로: $SCRIPT_DIR"
 echo "Python: $PYTHON"
@@ -33,10 +50,10 @@ cat > "$PLIST_PATH" << EOF
     <array>
         <string>$PYTHON</string>
         <string>$SCRIPT_DIR/main.py</string>
+$EXTRA_ARGS
     </array>
 
-    <key>StartInterval</key>
-    <integer>3600</integer>
+$SCHEDULE
 
     <key>StandardOutPath</key>
     <string>$LOG_FILE</string>
@@ -48,7 +65,7 @@ cat > "$PLIST_PATH" << EOF
     <true/>
 
     <key>KeepAlive</key>
-    <false/>
+    $KEEP_ALIVE
 
     <key>WorkingDirectory</key>
     <string>$SCRIPT_DIR</string>
@@ -73,7 +90,11 @@ echo ""
 echo "✓ launchd 서비스 등록 완료!"
 echo ""
 echo "설정:"
-echo "  - 1시간마다 실행 (3600초)"
+if [ "$DAEMON" = true ]; then
+    echo "  - 상주 모드 (새 북마크 빈도에 따라 폴링 간격 자동 조정, 종료되면 재시작)"
+else
+    echo "  - 1시간마다 실행 (3600초)"
+fi
 echo "  - 컴퓨터 시작/로그인 시 자동 시작"
 echo ""
 echo "관리 명령어:"
@@ -1,44 +1,202 @@
 """
 처리된 북마크 ID를 추적해 중복 생성을 방지합니다.
+
+저장 구조 (STATE_FILE = .state.json 기준):
+  .state.json     — last_run, 동기화 이어보기 지점 등 가벼운 메타데이터
+  .state.ids      — 압축 스냅샷: 헤더(매직, 누적 노트 수) + 정렬된 uint64 ID 배열
+  .state.journal  — 스냅샷 이후 처리한 ID를 8바이트씩 덧붙이는 append-only 저널
+
+처리 표시 한 번은 저널에 8바이트를 쓰고 fsync 하는 비용뿐이며, 저널이 커지면 스냅샷으로
+합쳐 비웁니다 (compaction). ID 개수 제한은 없습니다. 예전 형식(.state.json의 processed_ids
+리스트)은 처음 열 때 자동으로 옮겨집니다.
 """
 
 import json
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+_SNAPSHOT_MAGIC = b"XTOIDS01"
+_HEADER = struct.Struct("<8sQ")  # 매직, 누적 노트 수
+_RECORD = struct.Struct("<Q")
+
 
 class State:
+    # 저널 항목이 이만큼 쌓이면 스냅샷으로 합침
+    COMPACT_THRESHOLD = 1000
+
     def __init__(self, state_file: Path):
         self.path = state_file
-        self._data = self._load()
+        self.snapshot_path = state_file.with_suffix(".ids")
+        self.journal_path = state_file.with_suffix(".journal")
+
+        self._meta = self._load_meta()
+        self._snapshot, self._snapshot_total = self._load_snapshot()
+        self._journal_ids = self._load_journal()
+        self._journal = None
+        self._pending: list[int] | None = None  # batch() 중 모아둔 ID
+
+        legacy_ids = self._meta.pop("processed_ids", None)
+        if legacy_ids is not None:
+            self._migrate(legacy_ids)
+        elif len(self._journal_ids) >= self.COMPACT_THRESHOLD:
+            self.compact()
+
+    # ── 조회 ─────────────────────────────────────────
+
+    def is_processed(self, tweet_id: str) -> bool:
+        key = int(tweet_id)
+        return key in self._journal_ids or self._in_snapshot(key)
+
+    @property
+    def resume_points(self) -> list[dict]:
+        """지난 동기화가 다 못 본 북마크 위치 ({"cursor", "pages"}, 앞쪽부터)."""
+        return self._meta.get("sync_resume", [])
+
+    @property
+    def total_notes(self) -> int:
+        return self._snapshot_total + len(self._journal_ids)
+
+    def __len__(self) -> int:
+        return len(self._snapshot) + len(self._journal_ids)
+
+    # ── 기록 ─────────────────────────────────────────
+
+    def mark_processed(self, tweet_id: str):
+        key = int(tweet_id)
+        if key in self._journal_ids or self._in_snapshot(key):
+            return
+        self._journal_ids.add(key)
+
+        if self._pending is not None:
+            self._pending.append(key)
+            return
+        self._append([key])
+        if len(self._journal_ids) >= self.COMPACT_THRESHOLD:
+            self.compact()
 
-    def _load(self) -> dict:
+    @contextmanager
+    def batch(self):
+        """블록 안의 mark_processed를 모아 한 번의 append + fsync로 기록합니다."""
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = []
+        try:
+            yield self
+        finally:
+            pending, self._pending = self._pending, None
+            if pending:
+                self._append(pending)
+                if len(self._journal_ids) >= self.COMPACT_THRESHOLD:
+                    self.compact()
+
+    def set_resume_points(self, points: list[dict]):
+        """다음 동기화가 이어서 볼 위치를 바로 기록합니다 (비우면 따라잡기 완료)."""
+        if points == self.resume_points:
+            return
+        if points:
+            self._meta["sync_resume"] = points
+        else:
+            self._meta.pop("sync_resume", None)
+        self._save_meta()
+
+    def update_last_run(self):
+        self._meta["last_run"] = datetime.now().isoformat(timespec="seconds")
+        self._meta["total_notes"] = self.total_notes  # 사람이 보기 위한 값
+        self._save_meta()
+
+    def compact(self):
+        """저널을 스냅샷에 합치고 저널을 비웁니다."""
+        merged = sorted(set(self._snapshot).union(self._journal_ids))
+        total = self.total_notes
+
+        ids = array("Q", merged)
+        _atomic_write(self.snapshot_path, _HEADER.pack(_SNAPSHOT_MAGIC, total) + ids.tobytes())
+
+        self._close_journal()
+        self.journal_path.write_bytes(b"")
+        self._snapshot, self._snapshot_total = ids, total
+        self._journal_ids = set()
+
+    def close(self):
+        self._close_journal()
+
+    # ── 내부 ─────────────────────────────────────────
+
+    def _save_meta(self):
+        _atomic_write(self.path, json.dumps(self._meta, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def _in_snapshot(self, key: int) -> bool:
+        i = bisect_left(self._snapshot, key)
+        return i < len(self._snapshot) and self._snapshot[i] == key
+
+    def _append(self, keys: list[int]):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "ab")
+        self._journal.write(b"".join(_RECORD.pack(k) for k in keys))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _load_meta(self) -> dict:
         if self.path.exists():
             try:
                 return json.loads(self.path.read_text())
             except Exception:
                 pass
-        return {"processed_ids": [], "last_run": None, "total_notes": 0}
+        return {"last_run": None}
 
-    def is_processed(self, tweet_id: str) -> bool:
-        return tweet_id in self._data["processed_ids"]
+    def _load_snapshot(self) -> tuple[array, int]:
+        ids = array("Q")
+        if not self.snapshot_path.exists():
+            return ids, 0
+        data = self.snapshot_path.read_bytes()
+        if len(data) < _HEADER.size:
+            return ids, 0
+        magic, total = _HEADER.unpack_from(data)
+        if magic != _SNAPSHOT_MAGIC:
+            raise RuntimeError(f"알 수 없는 상태 스냅샷 형식: {self.snapshot_path}")
+        body = data[_HEADER.size:]
+        ids.frombytes(body[: len(body) - len(body) % ids.itemsize])
+        return ids, total
 
-    def mark_processed(self, tweet_id: str):
-        ids = self._data["processed_ids"]
-        if tweet_id not in ids:
-            ids.append(tweet_id)
-            # 최근 2000개만 유지
-            self._data["processed_ids"] = ids[-2000:]
-            self._data["total_notes"] = self._data.get("total_notes", 0) + 1
-        self._save()
+    def _load_journal(self) -> set[int]:
+        if not self.journal_path.exists():
+            return set()
+        data = self.journal_path.read_bytes()
+        usable = len(data) - len(data) % _RECORD.size  # 기록 도중 끊긴 마지막 항목은 무시
+        # 스냅샷에 이미 합쳐진 ID는 제외 (compaction 중 중단된 경우)
+        return {
+            key for (key,) in _RECORD.iter_unpack(data[:usable])
+            if not self._in_snapshot(key)
+        }
 
-    def update_last_run(self):
-        self._data["last_run"] = datetime.now().isoformat(timespec="seconds")
-        self._save()
+    def _migrate(self, legacy_ids: list):
+        """예전 .state.json의 processed_ids 리스트를 새 저장소로 옮깁니다."""
+        legacy_total = self._meta.get("total_notes", 0)
+        self._journal_ids.update(int(i) for i in legacy_ids if str(i).isdigit())
+        # 예전 누적 수는 리스트 길이와 무관하므로 스냅샷 헤더에 그대로 반영
+        self._snapshot_total = max(legacy_total - len(self._journal_ids), 0)
+        self.compact()
+        self._meta["total_notes"] = self.total_notes
+        self._save_meta()
+        print(f"  상태 파일 변환 완료: ID {len(self)}개 → {self.snapshot_path.name}")
 
-    def _save(self):
-        self.path.write_text(json.dumps(self._data, ensure_ascii=False, indent=2))
 
-    @property
-    def total_notes(self) -> int:
-        return self._data.get("total_notes", 0)
+def _atomic_write(path: Path, data: bytes):
+    """임시 파일에 쓰고 fsync 후 교체합니다."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
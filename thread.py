@@ -0,0 +1,183 @@
+"""
+북마크한 트윗에 이어지는 작성자 본인의 답글 체인(쓰레드)을 조립합니다.
+
+트윗 상세 응답에는 대화가 모듈 단위로 들어 있고, 긴 쓰레드는 첫 응답에 일부만 실려 옵니다.
+ThreadAssembler는 본 트윗을 모두 ID로 기억해 두고 (in_reply_to로 부모 → 자식 관계 기록),
+체인의 끝에서 더 이어지는 트윗을 모르면 다음 순서로 가장 적은 요청만 보냅니다.
+
+  1. 체인 끝 트윗이 들어 있던 대화 모듈의 "답글 더 보기" 커서
+  2. 아직 작성자 답글을 하나도 찾지 못했다면 대화의 다음 페이지 커서 (최대 몇 페이지)
+  3. 체인 끝 트윗의 상세 조회 — 그 트윗 아래의 대화가 새로 실려 옴
+
+더 보기 커서 없이 끝난 대화 모듈 안의 트윗은 뒤의 답글을 이미 다 본 것이므로, 쓰레드 끝을
+확인하려고 요청을 더 보내지 않습니다.
+
+같은 실행 안에서 한 쓰레드의 여러 트윗을 북마크했거나 쓰레드끼리 트윗을 공유하면, 이미 본
+트윗과 상세 응답은 다시 요청하지 않습니다. 동시에 같은 트윗을 요청하면 한 번만 보냅니다.
+"""
+
+import asyncio
+
+import metrics
+from ratelimit import AuthError, RateLimited
+
+_MAX_REPLY_PAGES = 3  # 작성자 답글을 찾기 위해 넘길 대화 페이지 수 (작성자 답글은 보통 맨 앞)
+
+
+class ThreadAssembler:
+    """
+    실행 하나 동안 쓰는 쓰레드 조립기 (fetch_bookmarks가 실행마다 하나 만듦).
+
+    사용 예:
+        threads = ThreadAssembler(client)
+        tweet = await threads.get(tweet_id)
+        chain = await threads.self_replies(tweet)
+
+    Args:
+        client: 요청 한도 스케줄러로 감싼 twikit Client (ratelimit.ScheduledClient)
+        max_tweets: 쓰레드에 붙일 최대 답글 수
+    """
+
+    def __init__(self, client, max_tweets: int = 100):
+        self.client = client
+        self.max_tweets = max_tweets
+        self.requests = 0  # X에 보낸 상세/커서 요청 수
+        self.hits = 0  # 캐시로 대신한 상세 조회 수
+        self._tweets: dict[str, object] = {}  # ID → 이번 실행에서 본 트윗
+        self._children: dict[str, list[str]] = {}  # 부모 ID → 답글 ID (본 순서)
+        self._details: dict[str, asyncio.Task] = {}  # ID → 상세 조회 (진행 중이거나 끝난 것)
+        self._settled: set[str] = set()  # 뒤에 이어지는 답글을 이미 다 본 트윗 ID
+        self._more: dict[str, object] = {}  # 트윗 ID → 그 트윗이 든 대화 모듈의 남은 답글 (Result)
+        self._expansions: dict[str, asyncio.Task] = {}  # 트윗 ID → 그 뒤 답글 이어 받기 (한 번만)
+
+    async def get(self, tweet_id: str):
+        """
+        트윗 상세를 가져옵니다. 이번 실행에서 이미 본 트윗이면 요청하지 않습니다.
+
+        대화 모듈에서 본 트윗도 상세 응답과 같은 데이터(note_tweet, 미디어 등)를 담고 있어 그대로
+        쓰고, 그 뒤의 답글은 self_replies가 필요할 때 이어서 가져옵니다.
+        """
+        tweet_id = str(tweet_id)
+        if tweet_id not in self._details and tweet_id in self._tweets:
+            self.hits += 1
+            return self._tweets[tweet_id]
+        return await self._detail(tweet_id)
+
+    async def self_replies(self, tweet) -> list:
+        """tweet 바로 아래로 이어지는 작성자 본인의 답글을 순서대로 반환합니다."""
+        author = tweet.user.screen_name
+        chain = []
+        tail = tweet
+        while len(chain) < self.max_tweets:
+            nxt = self._next_in_chain(tail, author)
+            if nxt is None and await self._expand(tail, author, not chain):
+                nxt = self._next_in_chain(tail, author)
+            if nxt is None:
+                break
+            chain.append(nxt)
+            tail = nxt
+        return chain
+
+    # ── 내부 ─────────────────────────────────────────
+
+    async def _detail(self, tweet_id: str, priority: int = 0):
+        """상세 조회. 같은 트윗을 동시에 요청하면 한 번만 보내고, 결과는 실행 끝까지 기억합니다."""
+        task = self._details.get(tweet_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_detail(tweet_id, priority))
+            self._details[tweet_id] = task
+        else:
+            self.hits += 1
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            # 실패한 조회는 기억하지 않음 — 다른 북마크에서 다시 시도할 수 있게
+            if self._details.get(tweet_id) is task:
+                del self._details[tweet_id]
+            raise
+
+    async def _fetch_detail(self, tweet_id: str, priority: int):
+        self.requests += 1
+        with metrics.timer("tweet_detail", tweet_id=tweet_id):
+            tweet = await self.client.get_tweet_by_id(tweet_id, priority=priority)
+        self._remember(tweet)
+        for ancestor in getattr(tweet, "reply_to", None) or []:
+            self._remember(ancestor)
+        replies = getattr(tweet, "replies", None) or []
+        if not getattr(replies, "next_cursor", None):
+            self._settled.add(str(tweet.id))
+        for entry in replies:
+            self._remember(entry)
+            module = getattr(entry, "replies", None) or []
+            for reply in module:
+                self._remember(reply)
+            # 모듈 안의 트윗은 다음 답글이 같은 모듈에 있음. 모듈이 더 이어지면 끝 트윗만 예외로
+            # 두고, 체인이 거기서 멈추면 이 모듈의 "더 보기"로 이어감
+            last = module[len(module) - 1] if len(module) else entry
+            self._settled.update(str(t.id) for t in (entry, *module))
+            if getattr(module, "next_cursor", None):
+                self._settled.discard(str(last.id))
+                self._more[str(last.id)] = module
+        return tweet
+
+    def _remember(self, tweet):
+        tweet_id = str(tweet.id)
+        if tweet_id not in self._tweets:
+            parent = getattr(tweet, "in_reply_to", None)
+            if parent:
+                self._children.setdefault(str(parent), []).append(tweet_id)
+        # 상세 응답의 트윗이 replies 등 더 많은 정보를 담고 있으므로 덮어씀
+        if tweet_id not in self._tweets or getattr(tweet, "replies", None) is not None:
+            self._tweets[tweet_id] = tweet
+
+    def _next_in_chain(self, tail, author: str):
+        """tail에 단 답글 중 작성자 본인의 것 (여럿이면 먼저 본 것)."""
+        for child_id in self._children.get(str(tail.id), ()):
+            child = self._tweets[child_id]
+            if child.user.screen_name == author:
+                return child
+        return None
+
+    async def _expand(self, tail, author: str, first: bool) -> bool:
+        """tail 뒤의 답글을 더 가져옵니다. 새로 받은 것이 있으면 True (트윗마다 한 번만 요청)."""
+        tail_id = str(tail.id)
+        task = self._expansions.get(tail_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_more(tail, author, first))
+            self._expansions[tail_id] = task
+        return await asyncio.shield(task)
+
+    async def _fetch_more(self, tail, author: str, first: bool) -> bool:
+        tail_id = str(tail.id)
+        try:
+            # 1. 같은 대화 모듈의 나머지 ("답글 더 보기")
+            module = self._more.pop(tail_id, None)
+            if module is not None:
+                self.requests += 1
+                for reply in await self.client.next_page(module):
+                    self._remember(reply)
+                if self._next_in_chain(tail, author) is not None:
+                    return True
+
+            # 2. 작성자 답글이 첫 페이지에 없으면 대화의 다음 페이지
+            if first:
+                replies = getattr(self._tweets.get(tail_id, tail), "replies", None)
+                pages = 0
+                while replies is not None and getattr(replies, "next_cursor", None) and pages < _MAX_REPLY_PAGES:
+                    self.requests += 1
+                    pages += 1
+                    replies = await self.client.next_page(replies)
+                    for entry in replies:
+                        self._remember(entry)
+                    if self._next_in_chain(tail, author) is not None:
+                        return True
+
+            # 3. 체인 끝 트윗의 상세 — 그 아래 대화가 실려 옴 (더 이어지지 않는 것이 확실하면 생략)
+            if tail_id not in self._details and tail_id not in self._settled:
+                await self._detail(tail_id, priority=1)  # 북마크 본문 조회보다 뒤로
+                return True
+        except (AuthError, RateLimited):
+            raise  # 쓰레드를 잘라 낸 채 노트를 쓰지 않고 스케줄러의 대기·중단에 맡김
+        except Exception as e:
+            print(f"  ↳ 쓰레드 이어 받기 실패 ({tail_id}): {e}")
+        return False
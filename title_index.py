@@ -0,0 +1,376 @@
+"""
+볼트 전체 노트의 제목·별칭 색인. LLM이 제안한 연결 후보를 실제로 있는 노트로 잇습니다.
+
+예전에는 LINKS를 그대로 [[개념]]으로 써서 대부분이 없는 노트를 가리켰습니다. write_note는 이제
+연결 후보마다 다음 순서로 가장 가까운 노트를 찾고, 찾으면 그 노트 이름으로 링크합니다.
+
+  1. 정확히 같은 파일 이름
+  2. 대소문자만 다른 이름 (유니코드 NFC 정규화 — macOS 파일 이름은 한글이 NFD로 올 수 있음)
+  3. frontmatter의 aliases/alias  →  [[노트|별칭]]
+  4. 공백·문장부호를 뺀 이름이 같음 ("분산 합의" ↔ "분산합의")
+  5. 접두어: 후보 뒤에 단어 경계로 더 이어지는 이름 중 가장 짧은 것 ("CRDT" → "CRDT (자료구조)")
+  6. 글자 3-gram 유사도(Dice)가 fuzzy_threshold 이상인 이름 중 가장 비슷한 것 (오타, 조사 차이)
+
+색인은 볼트의 디렉토리마다 (mtime, 하위 폴더, 노트 이름)을, 노트마다 (mtime, 크기, 별칭)을
+TITLE_INDEX_FILE에 저장합니다. 다음 실행부터는 디렉토리 stat만 훑어서 mtime이 바뀐 디렉토리만
+다시 나열하고, 그 안에서도 mtime/크기가 바뀐 노트의 앞부분만 다시 읽습니다. 노트 수만 개짜리
+볼트도 실행마다 폴더 수만큼의 stat으로 끝납니다. 별칭만 고친 노트는 vault_index와 같이 그
+디렉토리가 다음에 바뀔 때 반영됩니다.
+
+조회는 메모리의 사전(1~4), 정렬된 이름 목록의 이진 탐색(5), 3-gram 역색인(6, 처음 쓸 때 만듦)으로
+노트 수와 관계없이 빠릅니다.
+"""
+
+import bisect
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+
+_HEAD_BYTES = 4096  # frontmatter는 이 안에 들어 있음
+_ALIASES = re.compile(r"^(?:aliases|alias):[ \t]*(.*)$", re.MULTILINE | re.IGNORECASE)
+_NON_WORD = re.compile(r"[\W_]+")
+_BOUNDARY = re.compile(r"[\s\W_]")  # 접두어 일치 뒤에 와야 하는 글자 (단어 경계)
+_MAX_PREFIX_SCAN = 200  # 접두어가 같은 이름을 이만큼까지만 살펴봄
+
+
+def find_vault_root(path: Path) -> Path:
+    """path 또는 그 상위 중 .obsidian 폴더가 있는 가장 가까운 디렉토리 (없으면 path)."""
+    for candidate in (path, *path.parents):
+        if (candidate / ".obsidian").is_dir():
+            return candidate
+    return path
+
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFC", text).casefold().strip()
+
+
+def _key(text: str) -> str:
+    """공백·문장부호를 뺀 비교용 이름."""
+    return _NON_WORD.sub("", _fold(text))
+
+
+def _trigrams(key: str) -> set[str]:
+    return {key[i:i + 3] for i in range(len(key) - 2)} or {key}
+
+
+class TitleIndex:
+    """
+    볼트 노트 이름·별칭 → 링크 대상 색인. 저장 워커 스레드에서 함께 써도 안전합니다.
+
+    사용 예:
+        titles = TitleIndex.load(find_vault_root(output_dir), TITLE_INDEX_FILE)
+        titles.links(["분산합의", "CRDT"])   # ["[[분산 합의]]", "[[CRDT (자료구조)]]"]
+        titles.save()
+
+    Args:
+        vault: 볼트 루트 디렉토리 (숨김 폴더는 건너뜀)
+        index_file: 색인을 저장할 JSON 파일
+        fuzzy_threshold: 3-gram 유사도가 이 이상이어야 유사 연결 (1 이상이면 유사 연결 안 함)
+        unresolved: 맞는 노트가 없을 때 "keep"이면 [[후보]] 그대로, "text"면 링크 없이 글자만
+    """
+
+    VERSION = 1
+
+    def __init__(self, vault: Path, index_file: Path, fuzzy_threshold: float = 0.8, unresolved: str = "keep"):
+        self.vault = vault
+        self.index_file = index_file
+        self.fuzzy_threshold = fuzzy_threshold
+        self.unresolved = unresolved
+        self.scanned = 0  # 앞부분을 실제로 읽은 노트 수
+        self.resolved: Counter = Counter()  # 연결 방식 → 링크 수 (None = 미연결)
+        self._dirs: dict[str, tuple[int, list[str], list[str]]] = {}  # 상대 경로 → (mtime_ns, 하위 폴더, 노트 이름)
+        self._files: dict[str, tuple[int, int, list[str]]] = {}  # 노트 상대 경로 → (mtime_ns, 크기, 별칭)
+        self._built = False  # 조회용 사전을 만들었는지 (저장된 색인을 읽은 직후에는 아직)
+        self._lock = threading.Lock()
+        self._clear()
+
+    @classmethod
+    def load(cls, vault: Path, index_file: Path, **kwargs) -> "TitleIndex":
+        """저장된 색인을 읽고 바뀐 디렉토리만 다시 훑습니다."""
+        index = cls(vault, index_file, **kwargs)
+        index._load()
+        index.refresh()
+        return index
+
+    # ── 조회 ─────────────────────────────────────────
+
+    def resolve(self, link: str) -> tuple[str, str] | None:
+        """연결 후보에 가장 가까운 노트의 (링크 대상, 연결 방식). 없으면 None."""
+        folded = _fold(link)
+        if not folded:
+            return None
+        key = _key(link)
+        with self._lock:
+            if link in self._exact:
+                return self._exact[link], "exact"
+            if folded in self._folded:
+                return self._folded[folded], "case"
+            if folded in self._aliases:
+                return self._aliases[folded], "alias"
+            if key and key in self._keyed:
+                return self._keyed[key], "normalized"
+            target = self._prefix(folded)
+            if target is not None:
+                return target, "prefix"
+            target = self._fuzzy(key)
+            if target is not None:
+                return target, "fuzzy"
+        return None
+
+    def links(self, names: list[str]) -> list[str]:
+        """연결 후보들을 노트에 쓸 위키링크로 바꿉니다 (같은 노트로 모이면 한 번만)."""
+        rendered, seen = [], set()
+        for name in names:
+            name = name.strip().strip("[]").strip()
+            if not name:
+                continue
+            match = self.resolve(name)
+            with self._lock:
+                self.resolved[match[1] if match else None] += 1
+            if match is None:
+                target, text = name, (name if self.unresolved == "text" else f"[[{name}]]")
+            else:
+                target = match[0]
+                text = f"[[{target}|{name}]]" if match[1] == "alias" else f"[[{target}]]"
+            if _fold(target) not in seen:
+                seen.add(_fold(target))
+                rendered.append(text)
+        return rendered
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def summary(self) -> str:
+        linked = sum(n for kind, n in self.resolved.items() if kind is not None)
+        kinds = ", ".join(f"{kind} {n}" for kind, n in self.resolved.most_common() if kind is not None)
+        return (
+            f"위키링크: 연결 {linked}" + (f" ({kinds})" if kinds else "")
+            + f" / 미연결 {self.resolved[None]} — 노트 {len(self)}개 색인"
+        )
+
+    # ── 갱신 ─────────────────────────────────────────
+
+    def refresh(self):
+        """mtime이 바뀐 디렉토리만 다시 나열하고, 바뀐 노트의 별칭만 다시 읽습니다."""
+        with self._lock:
+            old_dirs, old_files = dict(self._dirs), dict(self._files)
+        dirs: dict[str, tuple[int, list[str], list[str]]] = {}
+        files: dict[str, tuple[int, int, list[str]]] = {}
+        changed = False
+        pending = [""]
+        while pending:
+            rel = pending.pop()
+            path = self.vault / rel if rel else self.vault
+            try:
+                mtime = path.stat().st_mtime_ns
+            except OSError:
+                changed = True
+                continue
+            old = old_dirs.get(rel)
+            if old is not None and old[0] == mtime:
+                dirs[rel] = old
+                for name in old[2]:
+                    note = _join(rel, name)
+                    if note in old_files:
+                        files[note] = old_files[note]
+            else:
+                changed = True
+                dirs[rel] = self._scan(rel, path, mtime, old_files, files)
+            pending.extend(_join(rel, sub) for sub in dirs[rel][1])
+
+        if not changed and len(files) == len(old_files) and self._built:
+            return
+        with self._lock:
+            self._dirs, self._files = dirs, files
+            removed = old_files.keys() - files.keys()
+            altered = [rel for rel in files if rel in old_files and files[rel][2] != old_files[rel][2]]
+            if not self._built or removed or altered:
+                self._rebuild()
+            else:  # 새 노트만 생김 — 있는 사전에 더함
+                for rel in sorted(files.keys() - old_files.keys()):
+                    self._add(rel, files[rel])
+
+    def register(self, path: Path):
+        """방금 쓴 노트를 색인에 넣습니다 (다음 실행에서 다시 읽지 않도록 mtime 기록)."""
+        try:
+            rel = path.relative_to(self.vault).as_posix()
+        except ValueError:
+            return  # 볼트 밖에 저장하는 경우
+        st = path.stat()
+        with self._lock:
+            entry = (st.st_mtime_ns, st.st_size, [])
+            if rel not in self._files:
+                self._add(rel, entry)
+            self._files[rel] = entry
+
+    def save(self):
+        """색인을 임시 파일에 쓰고 교체합니다."""
+        with self._lock:
+            data = {
+                "version": self.VERSION,
+                "vault": str(self.vault),
+                "dirs": {rel: list(entry) for rel, entry in self._dirs.items()},
+                "files": {rel: list(entry) for rel, entry in self._files.items()},
+            }
+        tmp = self.index_file.with_name(self.index_file.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+
+    # ── 내부 ─────────────────────────────────────────
+
+    def _scan(self, rel: str, path: Path, mtime: int, old_files: dict, files: dict) -> tuple[int, list[str], list[str]]:
+        subdirs, names = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue  # .obsidian, .trash 등
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    elif entry.name.endswith(".md") and entry.is_file():
+                        note = _join(rel, entry.name)
+                        st = entry.stat()
+                        old = old_files.get(note)
+                        if old is not None and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                            files[note] = old
+                        else:
+                            files[note] = (st.st_mtime_ns, st.st_size, _read_aliases(Path(entry.path)))
+                            self.scanned += 1
+                        names.append(entry.name)
+        except OSError:
+            pass
+        return mtime, sorted(subdirs), sorted(names)
+
+    def _load(self):
+        if not self.index_file.exists():
+            return
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        # 다른 볼트의 색인이면 처음부터 다시 만듦
+        if data.get("version") != self.VERSION or data.get("vault") != str(self.vault):
+            return
+        self._dirs = {rel: tuple(entry) for rel, entry in data.get("dirs", {}).items()}
+        self._files = {rel: tuple(entry) for rel, entry in data.get("files", {}).items()}
+
+    def _clear(self):
+        self._exact: dict[str, str] = {}  # 파일 이름 → 링크 대상
+        self._folded: dict[str, str] = {}  # 대소문자 무시 이름 → 링크 대상
+        self._aliases: dict[str, str] = {}  # 대소문자 무시 별칭 → 링크 대상
+        self._keyed: dict[str, str] = {}  # 공백·문장부호 뺀 이름 → 링크 대상
+        self._sorted: list[tuple[str, str]] = []  # (대소문자 무시 이름, 링크 대상) 정렬 — 접두어 탐색용
+        self._stems: Counter = Counter()  # 파일 이름 → 볼트 안의 같은 이름 수
+        self._grams: dict[str, list[str]] | None = None  # 3-gram → 비교용 이름 (처음 유사 조회 때 만듦)
+        self._key_targets: dict[str, str] = {}  # 비교용 이름 → 링크 대상 (유사 조회용)
+
+    def _rebuild(self):
+        self._clear()
+        self._built = True
+        self._stems = Counter(_stem(rel) for rel in self._files)
+        for rel in sorted(self._files):
+            self._add(rel, self._files[rel], rebuilding=True)
+        self._sorted.sort()
+
+    def _add(self, rel: str, entry: tuple, rebuilding: bool = False):
+        """노트 하나를 조회용 사전에 넣습니다. 먼저 들어간 노트가 이깁니다 (경로 이름순)."""
+        stem = _stem(rel)
+        if not rebuilding:
+            self._stems[stem] += 1
+        # 이름이 겹치는 노트는 경로로 링크해야 Obsidian이 헷갈리지 않음
+        target = stem if self._stems[stem] == 1 else rel[:-3]
+        folded = _fold(stem)
+        key = _NON_WORD.sub("", folded)
+        self._exact.setdefault(stem, target)
+        self._folded.setdefault(folded, target)
+        if key:
+            self._keyed.setdefault(key, target)
+            if key not in self._key_targets:
+                self._key_targets[key] = target
+                if self._grams is not None:
+                    for gram in _trigrams(key):
+                        self._grams.setdefault(gram, []).append(key)
+        for alias in entry[2]:
+            self._aliases.setdefault(_fold(alias), target)
+        item = (folded, target)
+        if rebuilding:
+            self._sorted.append(item)
+        else:
+            bisect.insort(self._sorted, item)
+
+    def _prefix(self, folded: str) -> str | None:
+        """folded 뒤에 단어 경계로 이어지는 이름 중 가장 짧은 것."""
+        if len(_key(folded)) < 2:
+            return None
+        best = None
+        start = bisect.bisect_left(self._sorted, (folded, ""))
+        for name, target in self._sorted[start:start + _MAX_PREFIX_SCAN]:
+            if not name.startswith(folded):
+                break
+            if len(name) > len(folded) and _BOUNDARY.match(name[len(folded)]):
+                if best is None or len(name) < len(best[0]):
+                    best = (name, target)
+        return best[1] if best else None
+
+    def _fuzzy(self, key: str) -> str | None:
+        """3-gram Dice 유사도가 가장 높은 이름 (fuzzy_threshold 미만이면 None)."""
+        if len(key) < 3 or self.fuzzy_threshold >= 1:
+            return None
+        if self._grams is None:
+            self._grams = {}
+            for other in self._key_targets:
+                for gram in _trigrams(other):
+                    self._grams.setdefault(gram, []).append(other)
+        grams = _trigrams(key)
+        shared = Counter(other for gram in grams for other in self._grams.get(gram, ()))
+        # 점수가 같으면 짧은 이름
+        best = max(
+            ((2 * count / (len(grams) + len(_trigrams(other))), -len(other), other) for other, count in shared.items()),
+            default=None,
+        )
+        if best is None or best[0] < self.fuzzy_threshold:
+            return None
+        return self._key_targets[best[2]]
+
+
+def _join(rel: str, name: str) -> str:
+    return f"{rel}/{name}" if rel else name
+
+
+def _stem(rel: str) -> str:
+    return rel.rsplit("/", 1)[-1][:-3]
+
+
+def _read_aliases(path: Path) -> list[str]:
+    """노트 앞부분 frontmatter의 aliases (인라인 [a, b], 한 값, 또는 "- a" 목록)."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            head = f.read(_HEAD_BYTES)
+    except OSError:
+        return []
+    if not head.startswith("---"):
+        return []
+    end = head.find("\n---", 3)
+    frontmatter = head[3:] if end == -1 else head[3:end]
+    m = _ALIASES.search(frontmatter)
+    if m is None:
+        return []
+    value = m.group(1).strip()
+    if value.startswith("["):
+        items = value.strip("[]").split(",")
+    elif value:
+        items = [value]
+    else:
+        items = []
+        for line in frontmatter[m.end():].splitlines()[1:]:
+            line = line.strip()
+            if not line.startswith("-"):
+                break
+            items.append(line[1:])
+    aliases = [item.strip().strip("\"'").strip() for item in items]
+    return [alias for alias in aliases if alias]
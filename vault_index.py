@@ -0,0 +1,172 @@
+"""
+출력 디렉토리의 노트를 tweet_id → 파일 이름으로 색인합니다.
+
+처음에는 노트마다 frontmatter 앞부분만 읽어 tweet_id를 찾고, 결과를 VAULT_INDEX_FILE에
+(파일 이름, mtime, 크기, tweet_id)로 저장합니다. 다음 실행부터는
+  - 디렉토리 mtime이 그대로면 스캔하지 않고,
+  - 바뀌었으면 stat만 훑어서 새로 생기거나 mtime/크기가 바뀐 노트만 다시 읽습니다.
+iCloud로 동기화되는 수천 개의 노트를 매번 열지 않기 위함입니다. 파일 추가/삭제/이름 변경은
+디렉토리 mtime에 반영되지만, 노트 내용만 고친 경우는 다음 디렉토리 변경 때 반영됩니다.
+
+write_note는 이 색인으로 이미 있는 노트를 찾아 제자리에서 갱신하고, 파일 이름 충돌은
+이름 집합과 접미사 카운터로 O(1)에 피합니다 ("제목.md" → "제목 2.md").
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+_TWEET_ID = re.compile(r'^tweet_id:\s*["\']?(\d+)', re.MULTILINE)
+_HEAD_BYTES = 4096  # frontmatter는 이 안에 들어 있음
+
+
+class VaultIndex:
+    """
+    tweet_id → 노트 파일 이름 색인. 저장 워커 스레드에서 함께 써도 안전합니다.
+
+    Args:
+        vault: 노트가 저장되는 디렉토리
+        index_file: 색인을 저장할 JSON 파일
+    """
+
+    VERSION = 1
+
+    def __init__(self, vault: Path, index_file: Path):
+        self.vault = vault
+        self.index_file = index_file
+        self.scanned = 0  # frontmatter를 실제로 읽은 파일 수
+        self._files: dict[str, tuple[int, int, str | None]] = {}  # 이름 → (mtime_ns, 크기, tweet_id)
+        self._by_id: dict[str, str] = {}
+        self._names: set[str] = set()  # casefold (macOS 기본 파일시스템은 대소문자 무시)
+        self._next_suffix: dict[str, int] = {}
+        self._dir_mtime = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, vault: Path, index_file: Path) -> "VaultIndex":
+        """저장된 색인을 읽고 디렉토리 변경분을 반영합니다."""
+        index = cls(vault, index_file)
+        index._load()
+        index.refresh()
+        return index
+
+    # ── 조회 ─────────────────────────────────────────
+
+    def get(self, tweet_id: str) -> Path | None:
+        """tweet_id의 노트 경로. 없으면 None."""
+        with self._lock:
+            name = self._by_id.get(str(tweet_id))
+        return self.vault / name if name else None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    # ── 갱신 ─────────────────────────────────────────
+
+    def refresh(self):
+        """디렉토리 mtime이 바뀌었으면 새로 생기거나 바뀐 노트만 다시 읽습니다."""
+        try:
+            dir_mtime = self.vault.stat().st_mtime_ns
+        except FileNotFoundError:
+            with self._lock:
+                self._files, self._dir_mtime = {}, 0
+                self._rebuild()
+            return
+        if dir_mtime == self._dir_mtime:
+            return
+
+        with self._lock:
+            known = dict(self._files)
+        files = {}
+        with os.scandir(self.vault) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                st = entry.stat()
+                old = known.get(entry.name)
+                if old is not None and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+                    files[entry.name] = old
+                else:
+                    files[entry.name] = (st.st_mtime_ns, st.st_size, _read_tweet_id(Path(entry.path)))
+                    self.scanned += 1
+
+        with self._lock:
+            self._files, self._dir_mtime = files, dir_mtime
+            self._rebuild()
+
+    def reserve(self, stem: str) -> Path:
+        """stem.md가 비어 있으면 그대로, 아니면 "stem N.md" 중 빈 이름을 예약해 반환합니다."""
+        with self._lock:
+            name = f"{stem}.md"
+            if name.casefold() in self._names:
+                key = stem.casefold()
+                n = self._next_suffix.get(key, 2)
+                while f"{stem} {n}.md".casefold() in self._names:
+                    n += 1
+                self._next_suffix[key] = n + 1
+                name = f"{stem} {n}.md"
+            self._names.add(name.casefold())
+        return self.vault / name
+
+    def register(self, tweet_id: str, path: Path):
+        """방금 쓴 노트를 색인에 반영합니다 (다음 실행에서 다시 읽지 않도록 mtime 기록)."""
+        st = path.stat()
+        with self._lock:
+            self._files[path.name] = (st.st_mtime_ns, st.st_size, str(tweet_id))
+            self._by_id[str(tweet_id)] = path.name
+            self._names.add(path.name.casefold())
+
+    def save(self):
+        """색인을 임시 파일에 쓰고 교체합니다."""
+        with self._lock:
+            data = {
+                "version": self.VERSION,
+                "vault": str(self.vault),
+                "dir_mtime": self._dir_mtime,
+                "files": {name: list(entry) for name, entry in self._files.items()},
+            }
+        tmp = self.index_file.with_name(self.index_file.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.index_file)
+
+    # ── 내부 ─────────────────────────────────────────
+
+    def _load(self):
+        if not self.index_file.exists():
+            return
+        try:
+            data = json.loads(self.index_file.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        # 다른 저장 경로의 색인이면 처음부터 다시 만듦
+        if data.get("version") != self.VERSION or data.get("vault") != str(self.vault):
+            return
+        self._files = {name: tuple(entry) for name, entry in data.get("files", {}).items()}
+        self._dir_mtime = data.get("dir_mtime", 0)
+        self._rebuild()
+
+    def _rebuild(self):
+        # 같은 tweet_id의 노트가 여럿이면 이름순으로 가장 앞(가장 먼저 만든) 노트를 사용
+        self._by_id = {}
+        for name in sorted(self._files):
+            tweet_id = self._files[name][2]
+            if tweet_id and tweet_id not in self._by_id:
+                self._by_id[tweet_id] = name
+        self._names = {name.casefold() for name in self._files}
+        self._next_suffix = {}
+
+
+def _read_tweet_id(path: Path) -> str | None:
+    """노트 앞부분의 frontmatter에서 tweet_id를 찾습니다."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            head = f.read(_HEAD_BYTES)
+    except OSError:
+        return None
+    if not head.startswith("---"):
+        return None
+    end = head.find("\n---", 3)
+    m = _TWEET_ID.search(head if end == -1 else head[:end])
+    return m.group(1) if m else None
@@ -2,11 +2,14 @@
 Obsidian inbox에 씨앗 노트(Markdown)를 생성합니다.
 """
 
+import os
 import re
 from datetime import datetime
 from pathlib import Path
 
 from fetcher import Tweet
+from title_index import TitleIndex
+from vault_index import VaultIndex
 
 
 NOTE_TEMPLATE = """\
@@ -43,7 +46,23 @@ tags:
 """
 
 
-def write_note(tweet: Tweet, enrichment: dict, inbox: Path) -> Path:
+def write_note(
+    tweet: Tweet,
+    enrichment: dict,
+    inbox: Path,
+    index: VaultIndex | None = None,
+    media_paths: list[Path | None] | None = None,
+    titles: TitleIndex | None = None,
+) -> Path:
+    """
+    노트를 저장하고 경로를 반환합니다.
+
+    index가 주어지면 같은 tweet_id의 노트가 이미 있을 때 그 파일을 제자리에서 갱신하고
+    (다른 노트의 링크가 깨지지 않도록 이름 유지), 새 노트는 겹치지 않는 이름을 예약해 씁니다.
+    media_paths는 tweet.media_urls와 같은 순서의 로컬 파일 경로로, 있는 항목은 원격 URL 대신
+    노트 기준 상대 경로로 링크합니다 (다운로드에 실패한 None 항목은 원격 URL 유지).
+    titles가 주어지면 연결 후보를 볼트에 있는 가장 가까운 노트로 바꿔 링크하고, 새 노트를 색인에 넣습니다.
+    """
     inbox.mkdir(parents=True, exist_ok=True)
 
     now = datetime.now()
@@ -55,7 +74,7 @@ def write_note(tweet: Tweet, enrichment: dict, inbox: Path) -> Path:
     safe_title = re.sub(r'[\n\r\t]', " ", raw_title)  # 줄바꿈 → 공백
     safe_title = re.sub(r'[\\/:*?"<>|]', "", safe_title)  # 금지 문자 제거
     safe_title = re.sub(r'\s+', " ", safe_title).strip()[:40]  # 연속 공백 정리
-    filename = f"{timestamp} {safe_title}.md"
+    stem = f"{timestamp} {safe_title}"
 
     # 태그 YAML
     base_tags = ["inbox", "🌱"] + enrichment.get("tags", [])
@@ -66,16 +85,23 @@ def write_note(tweet: Tweet, enrichment: dict, inbox: Path) -> Path:
         f"- {q}" for q in enrichment.get("seed_questions", [])
     )
 
-    # 위키링크
-    wiki_links = "  ".join(
-        f"[[{link}]]" for link in enrichment.get("wiki_links", [])
-    )
+    # 위키링크 (제목 색인이 있으면 볼트의 실제 노트로)
+    if titles is not None:
+        wiki_links = "  ".join(titles.links(enrichment.get("wiki_links", [])))
+    else:
+        wiki_links = "  ".join(
+            f"[[{link}]]" for link in enrichment.get("wiki_links", [])
+        )
 
     # 미디어
     media_section = ""
     if tweet.media_urls:
         lines = ["\n## 첨부 미디어\n"]
-        for url in tweet.media_urls:
+        local = media_paths or []
+        for i, url in enumerate(tweet.media_urls):
+            path = local[i] if i < len(local) else None
+            if path is not None:
+                url = Path(os.path.relpath(path, inbox)).as_posix().replace(" ", "%20")
             lines.append(f"![]({url})")
         media_section = "\n".join(lines) + "\n"
 
@@ -98,6 +124,29 @@ def write_note(tweet: Tweet, enrichment: dict, inbox: Path) -> Path:
         wiki_links=wiki_links,
     )
 
-    note_path = inbox / filename
+    existing = index.get(tweet.id) if index is not None else None
+    if existing is not None and existing.exists():
+        note_path = existing
+    elif index is not None:
+        note_path = index.reserve(stem)
+        while note_path.exists():  # 색인을 갱신한 뒤 다른 프로그램이 만든 파일
+            note_path = index.reserve(stem)
+    else:
+        note_path = _unique_path(inbox, stem)
+
     note_path.write_text(content, encoding="utf-8")
+    if index is not None:
+        index.register(tweet.id, note_path)
+    if titles is not None:
+        titles.register(note_path)
     return note_path
+
+
+def _unique_path(inbox: Path, stem: str) -> Path:
+    """색인 없이 쓸 때: 같은 이름이 있으면 "stem 2.md", "stem 3.md" ... 순으로 찾습니다."""
+    path = inbox / f"{stem}.md"
+    n = 2
+    while path.exists():
+        path = inbox / f"{stem} {n}.md"
+        n += 1
+    return path